@@ -0,0 +1,136 @@
+"""
+Admission control for AI-backed endpoints
+Each endpoint class has a concurrency limit, a bounded wait queue and a
+queue-time deadline. A request that finds the queue full, or waits past the
+deadline, is shed with Overloaded so the route can degrade to a rule-based
+answer or fail fast with 503 + Retry-After instead of piling onto Gemini and
+starving the catalog endpoints.
+
+Limits come from ADMISSION_<CLASS> env vars as "concurrency,queue,timeout_seconds".
+"""
+
+import asyncio
+import math
+import os
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Dict
+
+from fastapi import HTTPException
+
+from app.metrics import increment, set_gauge
+
+DEFAULT_LIMITS = {
+    "advisor": "4,16,5",
+    "chat": "8,32,3",
+    "gemini": "4,16,5",
+    "email": "4,8,5",
+}
+
+
+class Overloaded(Exception):
+    def __init__(self, endpoint_class: str, reason: str, retry_after: int):
+        super().__init__(f"{endpoint_class} is overloaded ({reason})")
+        self.endpoint_class = endpoint_class
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class AdmissionLimiter:
+    """Concurrency limit with a bounded FIFO queue, for one event loop"""
+
+    def __init__(self, name: str, max_concurrent: int, max_queue: int, queue_timeout: float):
+        self.name = name
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.active = 0
+        self._waiters = deque()
+
+    @property
+    def retry_after(self) -> int:
+        return max(1, math.ceil(self.queue_timeout))
+
+    def _publish(self):
+        set_gauge("admission_in_flight", self.active, endpoint_class=self.name)
+        set_gauge("admission_queue_depth", len(self._waiters), endpoint_class=self.name)
+
+    def _shed(self, reason: str):
+        increment("admission_shed_total", endpoint_class=self.name, reason=reason)
+        raise Overloaded(self.name, reason, self.retry_after)
+
+    async def acquire(self):
+        if self.active < self.max_concurrent and not self._waiters:
+            self.active += 1
+            increment("admission_admitted_total", endpoint_class=self.name)
+            self._publish()
+            return
+        if len(self._waiters) >= self.max_queue:
+            self._shed("queue_full")
+
+        future = asyncio.get_running_loop().create_future()
+        self._waiters.append(future)
+        self._publish()
+        try:
+            await asyncio.wait_for(future, self.queue_timeout)
+        except asyncio.TimeoutError:
+            self._shed("deadline")
+        except BaseException:
+            # Cancelled after a slot was handed over: pass it on
+            if future.done() and not future.cancelled():
+                self.release()
+            raise
+        finally:
+            try:
+                self._waiters.remove(future)
+            except ValueError:
+                pass
+            self._publish()
+        increment("admission_admitted_total", endpoint_class=self.name)
+
+    def release(self):
+        # Hand the slot straight to the oldest live waiter, else free it
+        while self._waiters:
+            future = self._waiters.popleft()
+            if not future.done():
+                future.set_result(None)
+                self._publish()
+                return
+        self.active -= 1
+        self._publish()
+
+    @asynccontextmanager
+    async def slot(self):
+        await self.acquire()
+        try:
+            yield
+        finally:
+            self.release()
+
+
+def _load_limiters() -> Dict[str, AdmissionLimiter]:
+    limiters = {}
+    for name, default in DEFAULT_LIMITS.items():
+        concurrency, queue, timeout = os.getenv(f"ADMISSION_{name.upper()}", default).split(",")
+        limiters[name] = AdmissionLimiter(name, int(concurrency), int(queue), float(timeout))
+    return limiters
+
+
+LIMITERS = _load_limiters()
+
+
+def get_limiter(endpoint_class: str) -> AdmissionLimiter:
+    return LIMITERS[endpoint_class]
+
+
+def service_unavailable(error: Overloaded) -> HTTPException:
+    return HTTPException(
+        status_code=503,
+        detail=f"The AI service is busy, please retry in {error.retry_after}s",
+        headers={"Retry-After": str(error.retry_after)}
+    )
+
+
+def record_degraded(error: Overloaded):
+    increment("admission_degraded_total", endpoint_class=error.endpoint_class)
+
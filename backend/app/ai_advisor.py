@@ -1,20 +1,15 @@
 # /Users/kushzingade/Documents/DS+X/backend/app/ai_advisor.py
 
 from typing import List, Dict, Optional
-from app.config import Config
+from app.config import Config, get_genai
 import json
 import re
 import traceback
 import os
 from fastapi import HTTPException
-import google.generativeai as genai
-
-# Configure the Google AI client
-if Config.GOOGLE_API_KEY:
-    genai.configure(api_key=Config.GOOGLE_API_KEY)
-    print("✅ Google AI configured successfully")
-else:
-    print("❌ GOOGLE_API_KEY not set - AI features will be disabled")
+from starlette.concurrency import run_in_threadpool
+from app.metrics import record_gemini_call
+from app.singleflight import AsyncSingleFlight, SingleFlight
 
 # Load all courses data from JSON file
 def load_all_courses() -> List[Dict]:
@@ -34,13 +29,48 @@ def load_all_courses() -> List[Dict]:
         print(f"❌ Error loading all_courses.json: {e}")
         return []
 
-# Global variable to store loaded courses
-ALL_COURSES = load_all_courses()
+# Loaded on first use rather than at import
+_all_courses: Optional[List[Dict]] = None
+
+def get_all_courses_data() -> List[Dict]:
+    """all_courses.json, read once"""
+    global _all_courses
+    if _all_courses is None:
+        _all_courses = load_all_courses()
+    return _all_courses
+
+# Identical concurrent prompts (a whole class asking about the same career)
+# share one Gemini call instead of each spending quota
+_gemini_calls = SingleFlight("gemini")
+_gemini_async_calls = AsyncSingleFlight("gemini_async")
+
+def _gemini_key(model_name: str, prompt: str, generation_config: Optional[Dict]):
+    return (model_name, prompt, tuple(sorted((generation_config or {}).items())))
+
+def generate_content_shared(model_name: str, prompt: str, generation_config: Optional[Dict] = None):
+    """Blocking generate_content, coalesced with identical in-flight calls"""
+    def call():
+        model = get_genai().GenerativeModel(model_name)
+        try:
+            response = model.generate_content(prompt, generation_config=generation_config)
+        except Exception:
+            record_gemini_call(model_name, False)
+            raise
+        record_gemini_call(model_name, True, response)
+        return response
+    return _gemini_calls.do(_gemini_key(model_name, prompt, generation_config), call)
+
+async def generate_content_shared_async(model_name: str, prompt: str, generation_config: Optional[Dict] = None):
+    """Async variant: the call runs in the threadpool and waiting callers hold no thread"""
+    return await _gemini_async_calls.do(
+        _gemini_key(model_name, prompt, generation_config),
+        run_in_threadpool, generate_content_shared, model_name, prompt, generation_config
+    )
 
 def get_available_models():
     """Get list of available models"""
     try:
-        models = genai.list_models()
+        models = get_genai().list_models()
         return [model.name for model in models]
     except Exception as e:
         print(f"Error getting available models: {e}")
@@ -57,9 +87,9 @@ def get_career_recommendations(
     
     print(f"🔍 Getting FAST recommendations for: {career_goal}")
     
-    # Use ALL_COURSES if no specific available_courses provided
+    # Use all_courses.json if no specific available_courses provided
     if available_courses is None:
-        available_courses = ALL_COURSES
+        available_courses = get_all_courses_data()
         print(f"📚 Using all {len(available_courses)} courses from all_courses.json")
     else:
         print(f"📚 Using provided {len(available_courses)} courses")
@@ -331,9 +361,8 @@ Base recommendations on course names and descriptions.
     for model_name in model_candidates:
         try:
             print(f"🔄 Trying model: {model_name}")
-            model = genai.GenerativeModel(model_name)
-            
-            response = model.generate_content(
+            response = generate_content_shared(
+                model_name,
                 prompt,
                 generation_config={
                     "temperature": 0.3,
@@ -414,7 +443,7 @@ def find_courses_by_topic(topic: str, max_results: int = 10) -> List[Dict]:
     topic_lower = topic.lower()
     matching_courses = []
     
-    for course in ALL_COURSES:
+    for course in get_all_courses_data():
         code = course.get('code', '').lower()
         name = course.get('name', '').lower()
         description = course.get('description', '').lower()
@@ -428,6 +457,21 @@ def find_courses_by_topic(topic: str, max_results: int = 10) -> List[Dict]:
     
     return matching_courses
 
+CHAT_MODEL = "models/gemini-2.0-flash"
+CHAT_GENERATION_CONFIG = {
+    "temperature": 0.3,
+    "max_output_tokens": 800,
+}
+
+def add_course_context(prompt: str) -> str:
+    """Append course database context when the prompt is about courses"""
+    course_keywords = ["course", "class", "take", "discrete math", "programming", "cs", "computer science"]
+    if any(keyword in prompt.lower() for keyword in course_keywords):
+        # Add course database context
+        course_context = f"\n\nAvailable courses database: {len(get_all_courses_data())} courses including CS, math, and related fields."
+        return prompt + course_context
+    return prompt
+
 async def generate_ai_response(prompt: str, model: Optional[str] = None) -> dict:
     """Generate AI response for chat functionality with course context"""
     
@@ -435,26 +479,16 @@ async def generate_ai_response(prompt: str, model: Optional[str] = None) -> dict
         return {"error": "GOOGLE_API_KEY not configured"}
     
     try:
-        model_name = model or "models/gemini-2.0-flash"
+        model_name = model or CHAT_MODEL
         print(f"🤖 Using model: {model_name} for chat")
         
         # If the prompt is about course recommendations, add course context
-        course_keywords = ["course", "class", "take", "discrete math", "programming", "cs", "computer science"]
-        if any(keyword in prompt.lower() for keyword in course_keywords):
-            # Add course database context
-            course_context = f"\n\nAvailable courses database: {len(ALL_COURSES)} courses including CS, math, and related fields."
-            prompt_with_context = prompt + course_context
-        else:
-            prompt_with_context = prompt
-        
-        genai_model = genai.GenerativeModel(model_name)
+        prompt_with_context = add_course_context(prompt)
         
-        response = genai_model.generate_content(
+        response = await generate_content_shared_async(
+            model_name,
             prompt_with_context,
-            generation_config={
-                "temperature": 0.3,
-                "max_output_tokens": 800,
-            }
+            generation_config=CHAT_GENERATION_CONFIG
         )
         
         if hasattr(response, 'text'):
@@ -466,6 +500,14 @@ async def generate_ai_response(prompt: str, model: Optional[str] = None) -> dict
         print(f"❌ Error in generate_ai_response: {e}")
         return {"error": f"AI service error: {str(e)}"}
 
+def stream_ai_response(prompt: str, model: Optional[str] = None):
+    """Streaming counterpart of generate_ai_response: async (model, text chunk) pairs"""
+    from app.streaming import stream_gemini
+    
+    model_name = model or CHAT_MODEL
+    print(f"🤖 Streaming model: {model_name} for chat")
+    return stream_gemini(add_course_context(prompt), [model_name], CHAT_GENERATION_CONFIG)
+
 # New function specifically for course queries
 async def get_course_recommendation(query: str) -> dict:
     """Get course recommendations based on specific queries like 'discrete math'"""
@@ -504,8 +546,7 @@ Recommend the best 3-5 courses and explain why they are relevant to the query.
 Focus on course content and how it matches what the user is looking for.
 """
         
-        model = genai.GenerativeModel("models/gemini-2.0-flash")
-        response = model.generate_content(prompt)
+        response = await generate_content_shared_async("models/gemini-2.0-flash", prompt)
         
         return {
             "query": query,
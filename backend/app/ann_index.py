@@ -0,0 +1,156 @@
+"""
+Approximate nearest-neighbor index over course vectors
+A pure-NumPy IVF index: spherical k-means centroids act as a coarse quantizer,
+each course lives in the inverted list of its nearest centroid, and a query is
+scored exactly only against the courses in its `nprobe` closest lists.
+
+Recall/latency knobs: `nlist` (number of lists, fixed at build time) and
+`nprobe` (lists scanned per query). Build offline alongside the catalog with:
+    python -m app.ann_index build [--nlist N]
+"""
+
+import argparse
+import time
+from pathlib import Path
+from typing import Optional, Tuple
+
+import numpy as np
+
+from app.config import Config
+from app.course_vectors import LSA_COMPONENTS, get_lsa_index, normalize_rows
+
+KMEANS_ITERATIONS = 20
+KMEANS_SEED = 0
+INDEX_FILENAME = "course_ann_index.npz"
+
+
+def default_nlist(n: int) -> int:
+    """Around 4 * sqrt(n) lists keeps both centroid scoring and list scans small"""
+    return int(max(1, min(n, round(4 * np.sqrt(n)))))
+
+
+class IVFIndex:
+    """Inverted-file index over unit-length float32 vectors"""
+
+    def __init__(self, vectors: np.ndarray, centroids: np.ndarray, list_offsets: np.ndarray, list_rows: np.ndarray):
+        self.vectors = vectors
+        self.centroids = centroids
+        self.list_offsets = list_offsets
+        self.list_rows = list_rows
+
+    @classmethod
+    def build(cls, vectors: np.ndarray, nlist: Optional[int] = None,
+              iterations: int = KMEANS_ITERATIONS, seed: int = KMEANS_SEED) -> "IVFIndex":
+        """Cluster vectors with spherical k-means and bucket rows by centroid"""
+        n = len(vectors)
+        nlist = min(nlist or default_nlist(n), n)
+        rng = np.random.default_rng(seed)
+        centroids = vectors[rng.choice(n, size=nlist, replace=False)].copy()
+
+        for _ in range(iterations):
+            assignment = np.argmax(vectors @ centroids.T, axis=1)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, assignment, vectors)
+            counts = np.bincount(assignment, minlength=nlist)
+            # Re-seed empty clusters from random points so no list goes unused
+            empty = counts == 0
+            if empty.any():
+                sums[empty] = vectors[rng.choice(n, size=int(empty.sum()), replace=False)]
+            centroids = normalize_rows(sums).astype(np.float32)
+
+        assignment = np.argmax(vectors @ centroids.T, axis=1)
+        list_rows = np.argsort(assignment, kind='stable').astype(np.int32)
+        list_offsets = np.zeros(nlist + 1, dtype=np.int64)
+        list_offsets[1:] = np.cumsum(np.bincount(assignment, minlength=nlist))
+        return cls(vectors, centroids, list_offsets, list_rows)
+
+    @property
+    def nlist(self) -> int:
+        return len(self.centroids)
+
+    def candidates(self, query: np.ndarray, nprobe: int) -> np.ndarray:
+        """Rows in the nprobe lists whose centroids are closest to the query"""
+        nprobe = max(1, min(nprobe, self.nlist))
+        centroid_scores = self.centroids @ query
+        probes = np.argpartition(-centroid_scores, nprobe - 1)[:nprobe]
+        return np.concatenate([self.list_rows[self.list_offsets[p]:self.list_offsets[p + 1]] for p in probes])
+
+    def search(self, query: np.ndarray, k: int, nprobe: Optional[int] = None,
+               allowed: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """Approximate top-k rows by cosine similarity, best first
+
+        allowed is an optional boolean mask over rows (e.g. a school filter).
+        """
+        rows = self.candidates(query, nprobe or Config.ANN_NPROBE)
+        if allowed is not None:
+            rows = rows[allowed[rows]]
+        if len(rows) == 0:
+            return rows, np.zeros(0, dtype=np.float32)
+        scores = self.vectors[rows] @ query
+        k = min(k, len(rows))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top], kind='stable')]
+        return rows[top], scores[top]
+
+    def save(self, path: Path, catalog_version: str):
+        np.savez(path, catalog_version=np.array(catalog_version), centroids=self.centroids,
+                 list_offsets=self.list_offsets, list_rows=self.list_rows)
+
+    @classmethod
+    def load(cls, path: Path, vectors: np.ndarray, catalog_version: str) -> Optional["IVFIndex"]:
+        """Load a prebuilt index, or None if it is missing or was built for another catalog"""
+        try:
+            with np.load(path) as data:
+                if str(data['catalog_version']) != catalog_version:
+                    return None
+                centroids = data['centroids']
+                if centroids.shape[1] != vectors.shape[1] or int(data['list_offsets'][-1]) != len(vectors):
+                    return None
+                return cls(vectors, centroids, data['list_offsets'], data['list_rows'])
+        except (OSError, KeyError, ValueError):
+            return None
+
+
+def index_path(catalog) -> Optional[Path]:
+    return catalog.path.parent / INDEX_FILENAME if catalog.path else None
+
+
+def get_ann_index(catalog) -> IVFIndex:
+    """The ANN index for a catalog version, loaded from disk when a matching build exists"""
+    def build():
+        vectors = get_lsa_index(catalog).vectors
+        path = index_path(catalog)
+        index = IVFIndex.load(path, vectors, catalog.version) if path and path.exists() else None
+        if index is None:
+            index = IVFIndex.build(vectors)
+            print(f"🗂️  Built ANN index in-process: {index.nlist} lists over {len(vectors)} courses")
+        else:
+            print(f"🗂️  Loaded ANN index from {path}: {index.nlist} lists")
+        return index
+
+    return catalog.memo("ann_index", build)
+
+
+def main():
+    from app.catalog import get_catalog
+
+    parser = argparse.ArgumentParser(description="Build the course ANN index next to the catalog JSON")
+    parser.add_argument("command", choices=["build"])
+    parser.add_argument("--nlist", type=int, default=None, help="number of inverted lists (default ~4*sqrt(n))")
+    args = parser.parse_args()
+
+    catalog = get_catalog()
+    if catalog.path is None:
+        raise SystemExit("❌ No catalog found. Run the CSV processor first.")
+
+    started = time.perf_counter()
+    vectors = get_lsa_index(catalog).vectors
+    index = IVFIndex.build(vectors, nlist=args.nlist)
+    path = index_path(catalog)
+    index.save(path, catalog.version)
+    print(f"💾 Saved {index.nlist}-list ANN index ({len(vectors)} x {LSA_COMPONENTS} vectors) to {path} "
+          f"in {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
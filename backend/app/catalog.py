@@ -0,0 +1,208 @@
+"""
+Shared course catalog
+Loads the processed multi-school JSON once per catalog version and caches
+derived structures and pre-encoded response payloads for that version.
+"""
+
+import hashlib
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+
+from app.config import Config
+from app.metrics import increment
+from app.responses import compress_variants, dumps
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+BACKEND_DIR = Path(__file__).parent.parent
+
+# Display names for the school prefix and subject tokens of course codes
+SCHOOL_NAMES = {
+    'CAS': 'College of Arts & Sciences',
+    'CDS': 'College of Computing & Data Sciences',
+    'CFA': 'College of Fine Arts',
+    'CGS': 'College of General Studies',
+    'COM': 'College of Communication',
+    'ENG': 'College of Engineering',
+    'KHC': 'Kilachand Honors College',
+    'MET': 'Metropolitan College',
+    'QST': 'Questrom School of Business',
+    'SAR': 'Sargent College',
+    'SHA': 'School of Hospitality Administration',
+    'SPH': 'School of Public Health',
+    'WED': 'Wheelock College'
+}
+
+DEPARTMENT_NAMES = {
+    'AA': 'African American Studies', 'AH': 'Art History', 'AN': 'Anthropology', 'AR': 'Archaeology', 'AS': 'Astronomy',
+    'BB': 'Biochemistry and Molecular Biology', 'BI': 'Biology', 'CC': 'Core Curriculum', 'CG': 'Classical Greek', 'CH': 'Chemistry',
+    'CI': 'Cinema and Media Studies', 'CL': 'Classical Studies', 'CS': 'Computer Science', 'EC': 'Economics', 'EE': 'Earth and Environment',
+    'BE': 'Biomedical Engineering', 'ME': 'Mechanical Engineering', 'EK': 'Engineering Core',
+    'HF': 'Hospitality and Food Management', 'RE': 'Real Estate', 'SE': 'Special Events',
+    'AC': 'Accounting', 'BA': 'Business Administration', 'FE': 'Finance and Economics', 'IS': 'Information Systems', 'MG': 'Management', 'MK': 'Marketing',
+    'EN': 'English', 'HI': 'History', 'MA': 'Mathematics', 'PH': 'Philosophy', 'PO': 'Political Science', 'PS': 'Psychology', 'PY': 'Physics', 'SO': 'Sociology',
+    'ED': 'Education', 'HD': 'Human Development', 'JO': 'Journalism', 'MU': 'Music', 'TH': 'Theatre'
+}
+
+# Same lookup order routes.py has always used
+CATALOG_PATHS = [
+    BACKEND_DIR / "processing_csv" / "output" / "all_courses_data.json",
+    BACKEND_DIR / "processing_csv" / "all_courses_data.json",
+]
+
+
+class Catalog:
+    """One immutable version of the course catalog"""
+
+    def __init__(self, path: Optional[Path], raw: bytes):
+        self.path = path
+        self.version = hashlib.sha256(raw).hexdigest()[:16]
+        self.data = (orjson.loads(raw) if orjson is not None else json.loads(raw)) if raw else {}
+        self.courses = self._flatten(self.data)
+        self._memo: Dict[str, Any] = {}
+        self._payloads: Dict[str, bytes] = {}
+        self._variants: Dict[str, Dict[str, bytes]] = {}
+        # Guards only the key -> lock table; each build holds its own key's lock,
+        # so a slow build (the LSA fit) never blocks lookups of other keys
+        self._lock = threading.Lock()
+        self._key_locks: Dict[str, threading.RLock] = {}
+
+    @staticmethod
+    def _flatten(data: Dict) -> List[Dict]:
+        """Flatten courses from all schools, tagging each with school and id"""
+        all_courses = []
+        for school_name, school_data in data.get('schools', {}).items():
+            for course in school_data.get('courses', []):
+                course_with_school = course.copy()
+                course_with_school['school'] = school_name
+                course_with_school['id'] = f"{school_name}_{course['code'].replace(' ', '_').replace('|', '_')}"
+                all_courses.append(course_with_school)
+        return all_courses
+
+    def _once(self, kind: str, store: Dict[str, Any], key: str, build: Callable[[], Any]) -> Any:
+        """store[key], built at most once; concurrent callers of the same key wait for it"""
+        value = store.get(key)
+        if value is None:
+            with self._lock:
+                # Re-entrant: builders may depend on other memoized structures
+                key_lock = self._key_locks.setdefault(f"{kind}:{key}", threading.RLock())
+            with key_lock:
+                value = store.get(key)
+                if value is None:
+                    value = build()
+                    store[key] = value
+        return value
+
+    def memo(self, key: str, build: Callable[[], Any]) -> Any:
+        """Return a derived object, building it once for this catalog version"""
+        return self._once("memo", self._memo, key, build)
+
+    def shared_array(self, key: str, build: Callable[[], np.ndarray]) -> np.ndarray:
+        """Return a derived array memory-mapped read-only from <key>-<version>.npy
+
+        The first process to need it writes the file; every worker then maps the
+        same pages from the page cache instead of holding a private copy. Falls
+        back to the in-memory array when there is nowhere to write.
+        """
+        def load():
+            path = array_cache_path(self, key)
+            if path is None:
+                return build()
+            if not path.exists():
+                array = build()
+                try:
+                    path.parent.mkdir(parents=True, exist_ok=True)
+                    # Write then rename, so a concurrent worker never maps a partial file
+                    tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+                    with open(tmp, "wb") as f:
+                        np.save(f, np.ascontiguousarray(array))
+                    os.replace(tmp, path)
+                except OSError as e:
+                    print(f"⚠️  Could not write {path}, keeping {key} in memory: {e}")
+                    return array
+            return np.load(path, mmap_mode="r")
+
+        return self.memo(f"shared_array:{key}", load)
+
+    def payload(self, key: str, build: Callable[[], Any]) -> bytes:
+        """Return a JSON body encoded once for this catalog version"""
+        return self._once("payload", self._payloads, key, lambda: dumps(build()))
+
+    def payload_variants(self, key: str, build: Callable[[], Any]) -> Dict[str, bytes]:
+        """Return the encoded body plus its gzip/brotli variants, compressed once per version"""
+        return self._once("variants", self._variants, key, lambda: compress_variants(self.payload(key, build)))
+
+
+_catalog: Optional[Catalog] = None
+_catalog_signature = None
+_reload_lock = threading.Lock()
+
+
+def resolve_catalog_path() -> Optional[Path]:
+    """Find the processed catalog JSON on disk (Config.CATALOG_PATH wins when set)"""
+    if Config.CATALOG_PATH:
+        path = Path(Config.CATALOG_PATH)
+        return path if path.exists() else None
+    for path in CATALOG_PATHS:
+        if path.exists():
+            return path
+    return None
+
+
+def array_cache_path(catalog: Catalog, key: str) -> Optional[Path]:
+    """Where a catalog version's shared arrays live (Config.INDEX_CACHE_DIR, else next to the JSON)"""
+    if catalog.path is None:
+        return None
+    directory = Path(Config.INDEX_CACHE_DIR) if Config.INDEX_CACHE_DIR else catalog.path.parent / "index_cache"
+    return directory / f"{key}-{catalog.version}.npy"
+
+
+def _signature(path: Optional[Path]):
+    if path is None:
+        return None
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return (str(path), stat.st_mtime_ns, stat.st_size)
+
+
+def get_catalog() -> Catalog:
+    """Return the current catalog, reloading only when the file changed on disk"""
+    global _catalog, _catalog_signature
+
+    path = resolve_catalog_path()
+    signature = _signature(path)
+    if _catalog is not None and signature == _catalog_signature:
+        return _catalog
+
+    with _reload_lock:
+        if _catalog is not None and signature == _catalog_signature:
+            return _catalog
+
+        if signature is None:
+            print("❌ No multi-school course data found. Run the CSV processor first.")
+            catalog = Catalog(None, b"")
+            increment("catalog_reloads_total", result="missing")
+        else:
+            try:
+                catalog = Catalog(path, path.read_bytes())
+                print(f"✅ Loaded {len(catalog.courses)} courses from {len(catalog.data.get('schools', {}))} schools "
+                      f"(catalog version {catalog.version})")
+                increment("catalog_reloads_total", result="success")
+            except Exception as e:
+                print(f"❌ Error loading courses from JSON: {e}")
+                catalog = Catalog(None, b"")
+                increment("catalog_reloads_total", result="error")
+
+        _catalog = catalog
+        _catalog_signature = signature
+        return catalog
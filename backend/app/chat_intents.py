@@ -0,0 +1,243 @@
+"""
+Local answer engine for the chatbot
+A small compiled intent classifier (regexes) plus catalog lookups that answer
+count, list, course-detail, prerequisite and site-navigation questions without
+calling Gemini. Course answers are only given for explicit single-code lookups
+("what is CS 111", "prerequisites for CS 330"); open questions that merely
+mention a course ("Is CS 111 hard?", comparisons) go to the model, as does
+anything else it does not recognise.
+Entity tables are built once per catalog version.
+"""
+
+import re
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from app.catalog import DEPARTMENT_NAMES, SCHOOL_NAMES
+from app.course_index import get_course_index
+from app.hubs import get_hub_index
+from app.metrics import increment
+from app.prerequisites import get_prerequisite_graph
+
+LIST_LIMIT = 10
+
+NAVIGATION_ANSWERS = {
+    "search": "To search for courses, go to the **Explorer** page (click 'Explorer' in the top menu). You can use the search bar to find courses by name or code, and use the filters to narrow by school or level.",
+    "plan": "To plan your semesters, go to the **Planner** page (click 'Planner' in the top menu). Click 'Add Semester' to create a semester, then drag courses from the left sidebar into your semester boards. You can export your plan to PDF when done!",
+    "career": "For career advice and course recommendations, go to the **Progress** page (click 'Progress' in the top menu). You can browse preset career paths or enter your own custom career goal to get AI-powered course recommendations!",
+    "professor": "To research professors, go to the **Professors** page (click 'Professors' in the top menu). You can browse by department, view their publications, and even generate professional cold emails to reach out to them.",
+    "export": "To export your semester plan to PDF, go to the **Planner** page and click the 'Export to PDF' button at the top. Make sure you've added some courses to your semesters first!",
+}
+
+# Intent patterns, checked in order
+COUNT_PATTERN = re.compile(
+    r"\b(?:how many|number of|count of)\b(?:\s+[\w/&'-]+){0,6}?\s+(?:courses|classes)\b"
+    r"(?!\s+(?:should|do|can|could|must|would|per|each|a)\b)",
+    re.IGNORECASE
+)
+LIST_PATTERN = re.compile(
+    r"\b(?:which|what|list|show(?: me)?|give me|name)\b(?:\s+[\w/&'-]+){0,4}?\s+(?:courses|classes)\b"
+    r"|\b(?:courses|classes)\b.*\b(?:cover|covers|satisf\w*|fulfil\w*|count(?:s)? (?:for|toward\w*)|in|from)\b",
+    re.IGNORECASE
+)
+# Lookups must be the whole message, so "what is CS 330 about and how does it compare..." is not one
+LOOKUP_CODE = r"((?:[A-Za-z]{3}\s+)?[A-Za-z]{2}\s?\d{3})"
+LOOKUP_POLITE = r"^\s*(?:(?:can|could) you\s+)?(?:please\s+)?"
+LOOKUP_END = r"\s*[?.!]*\s*$"
+COURSE_LOOKUP_PATTERN = re.compile(
+    LOOKUP_POLITE
+    + r"(?:(?:(?:what|which course) is|what's|whats|tell me about|describe|(?:info|information|details) (?:on|about|for))\s+(?:the\s+)?(?:course\s+)?)?"
+    + LOOKUP_CODE + LOOKUP_END,
+    re.IGNORECASE
+)
+PREREQUISITE_LOOKUP_PATTERN = re.compile(
+    LOOKUP_POLITE
+    + r"(?:"
+    r"(?:(?:what are|what're|list|show me|tell me) (?:the )?)?(?:pre-?req\w*|prerequisites?) (?:for|of|to) " + LOOKUP_CODE
+    + r"|(?:what are (?:the )?)?" + LOOKUP_CODE + r"(?:'s)? (?:pre-?req\w*|prerequisites?)"
+    + r"|what (?:do i need|is required|should i take) (?:to take |before (?:taking |i take )?)" + LOOKUP_CODE
+    + r")" + LOOKUP_END,
+    re.IGNORECASE
+)
+COURSE_CODE_PATTERN = re.compile(r"\b(?:([A-Za-z]{3})\s+)?([A-Za-z]{2})\s?(\d{3})\b")
+# Personal planning questions need judgement, not a lookup
+ADVICE_PATTERN = re.compile(r"\b(?:should i|recommend|best|easiest|hardest|worth|for me|my)\b", re.IGNORECASE)
+
+NAVIGATION_QUESTION = re.compile(r"^\s*(?:how|where|can i|what page|which page|is there a way)\b", re.IGNORECASE)
+NAVIGATION_TOPICS = [
+    ("export", re.compile(r"\b(?:export|pdf|download)\b", re.IGNORECASE)),
+    ("plan", re.compile(r"\bplan\w*\b.*\b(?:semester|schedule)|\badd (?:a )?semester\b", re.IGNORECASE)),
+    ("professor", re.compile(r"\b(?:professors?|faculty|cold emails?)\b", re.IGNORECASE)),
+    ("search", re.compile(r"\b(?:find|search|look up|browse)\b.*\b(?:courses?|class(?:es)?)\b", re.IGNORECASE)),
+    ("career", re.compile(r"\b(?:career advi[cs]e|career recommendations?|course recommendations?)\b", re.IGNORECASE)),
+]
+
+
+def _phrase_pattern(phrases: List[str]) -> Optional[re.Pattern]:
+    if not phrases:
+        return None
+    # Longest first so "quantitative reasoning ii" wins over "quantitative reasoning i"
+    alternation = "|".join(re.escape(p) for p in sorted(phrases, key=len, reverse=True))
+    return re.compile(rf"(?<![\w])({alternation})(?![\w])", re.IGNORECASE)
+
+
+class ChatAnswerIndex:
+    """Per-row school prefix / subject ids and entity patterns for one catalog version"""
+
+    def __init__(self, catalog):
+        self.catalog = catalog
+        courses = catalog.courses
+        self.hubs = get_hub_index(catalog)
+        self.index = get_course_index(catalog)
+
+        prefixes: Dict[str, int] = {}
+        subjects: Dict[str, int] = {}
+        self.prefix_ids = np.zeros(len(courses), dtype=np.int16)
+        self.subject_ids = np.zeros(len(courses), dtype=np.int16)
+        for row, course in enumerate(courses):
+            tokens = course['code'].split('|')[0].split()
+            prefix = tokens[0] if tokens else ''
+            subject = tokens[1] if len(tokens) > 2 else ''
+            self.prefix_ids[row] = prefixes.setdefault(prefix, len(prefixes))
+            self.subject_ids[row] = subjects.setdefault(subject, len(subjects))
+        self.prefixes = prefixes
+        self.subjects = subjects
+
+        # School names people type: "College of Engineering", "Questrom", "Wheelock"
+        school_phrases = {name.lower(): code for code, name in SCHOOL_NAMES.items() if code in prefixes}
+        for course in courses:
+            key = course['school'].lower()
+            if len(key) > 3 and key not in school_phrases:
+                school_phrases[key] = course['code'].split()[0]
+        self.school_phrases = school_phrases
+        self.school_pattern = _phrase_pattern(list(school_phrases))
+
+        self.department_phrases = {name.lower(): code for code, name in DEPARTMENT_NAMES.items() if code in subjects}
+        self.department_pattern = _phrase_pattern(list(self.department_phrases))
+        self.hub_by_lower = {name.lower(): name for name in self.hubs.hub_names}
+        self.hub_pattern = _phrase_pattern(list(self.hub_by_lower))
+
+    def entities(self, message: str) -> Dict:
+        """School prefix, subject code and Hub area mentioned in a message (None if absent)"""
+        school = subject = hub = None
+        # Bare codes only count in upper case: "CS"/"CAS", not the words "as" or "me"
+        for token in re.findall(r"\b[A-Z]{2,3}\b", message):
+            if school is None and len(token) == 3 and token in self.prefixes:
+                school = token
+            elif subject is None and len(token) == 2 and token in self.subjects:
+                subject = token
+        if school is None and self.school_pattern and (m := self.school_pattern.search(message)):
+            school = self.school_phrases[m.group(1).lower()]
+        if subject is None and self.department_pattern and (m := self.department_pattern.search(message)):
+            subject = self.department_phrases[m.group(1).lower()]
+        if self.hub_pattern and (m := self.hub_pattern.search(message)):
+            hub = self.hub_by_lower[m.group(1).lower()]
+        return {"school": school, "subject": subject, "hub": hub}
+
+    def matching_rows(self, school: Optional[str], subject: Optional[str], hub: Optional[str]) -> np.ndarray:
+        mask = np.ones(len(self.prefix_ids), dtype=bool)
+        if school is not None:
+            mask &= self.prefix_ids == self.prefixes[school]
+        if subject is not None:
+            mask &= self.subject_ids == self.subjects[subject]
+        if hub is not None:
+            mask &= self.hubs.matrix[:, self.hubs.bit_by_name[hub]].astype(bool)
+        return np.flatnonzero(mask)
+
+    @staticmethod
+    def describe(school: Optional[str], subject: Optional[str], hub: Optional[str]) -> str:
+        text = f"{DEPARTMENT_NAMES.get(subject, subject)} ({subject}) courses" if subject else "courses"
+        if school:
+            text += f" in {SCHOOL_NAMES.get(school, school)}"
+        if hub:
+            text += f" that satisfy the **{hub}** Hub area"
+        return text
+
+
+def get_chat_answer_index(catalog) -> ChatAnswerIndex:
+    """The chatbot's entity tables for a catalog version"""
+    return catalog.memo("chat_answer_index", lambda: ChatAnswerIndex(catalog))
+
+
+def _course_line(course: Dict) -> str:
+    return f"- **{course['code']}**: {course['name']}"
+
+
+def _answer_course(answers: ChatAnswerIndex, row: int, prerequisites_only: bool) -> str:
+    course = answers.catalog.courses[row]
+    prereqs = get_prerequisite_graph(answers.catalog).prerequisite_codes(row)
+    if prereqs["required"]:
+        prereq_text = f"Required prerequisites: {', '.join(prereqs['required'])}."
+    else:
+        prereq_text = "No required prerequisites are listed."
+    if prereqs["recommended"]:
+        prereq_text += f" Recommended: {', '.join(prereqs['recommended'])}."
+    if prerequisites_only:
+        return f"**{course['code']}** ({course['name']}): {prereq_text}"
+
+    hub_areas = list(course.get('hub_areas', {}).keys())
+    hub_text = f"Hub areas: {', '.join(hub_areas)}." if hub_areas else "It does not satisfy any Hub areas."
+    return f"**{course['code']}: {course['name']}** ({SCHOOL_NAMES.get(course['code'].split()[0], course['school'])}). {hub_text} {prereq_text}"
+
+
+def answer_locally(message: str, catalog) -> Optional[Dict]:
+    """Answer a chatbot message from the catalog, or None if it needs the model
+
+    Returns {"response": text, "intent": name}.
+    """
+    if not catalog.courses:
+        return None
+    answers = get_chat_answer_index(catalog)
+
+    for intent, pattern in (("prerequisites", PREREQUISITE_LOOKUP_PATTERN), ("course_info", COURSE_LOOKUP_PATTERN)):
+        lookup = pattern.match(message)
+        if lookup:
+            row = _mentioned_course(answers, next(code for code in lookup.groups() if code))
+            if row is not None:
+                return _record(intent, _answer_course(answers, row, intent == "prerequisites"))
+            break
+
+    advice = ADVICE_PATTERN.search(message)
+
+    if NAVIGATION_QUESTION.search(message):
+        for topic, pattern in NAVIGATION_TOPICS:
+            if pattern.search(message):
+                return _record("navigation", NAVIGATION_ANSWERS[topic])
+
+    if advice:
+        return None
+
+    if COUNT_PATTERN.search(message):
+        entities = answers.entities(message)
+        rows = answers.matching_rows(**entities)
+        return _record("count", f"There are **{len(rows)}** {answers.describe(**entities)} in the catalog.")
+
+    if LIST_PATTERN.search(message):
+        entities = answers.entities(message)
+        if any(entities.values()):
+            rows = answers.matching_rows(**entities)
+            description = answers.describe(**entities)
+            if len(rows) == 0:
+                return _record("list", f"I couldn't find any {description}.")
+            lines = "\n".join(_course_line(answers.catalog.courses[row]) for row in rows[:LIST_LIMIT])
+            more = f"\n\nShowing {LIST_LIMIT} of {len(rows)}; browse them all on the **Explorer** page." if len(rows) > LIST_LIMIT else ""
+            return _record("list", f"Here are the {description} ({len(rows)} total):\n{lines}{more}")
+
+    return None
+
+
+def _mentioned_course(answers: ChatAnswerIndex, message: str) -> Optional[int]:
+    """Row of the first course code in the message ("CAS CS 111", "cs111", "CS 111")"""
+    for school, subject, number in COURSE_CODE_PATTERN.findall(message):
+        # The optional school group can swallow a word ("for CS 330"), so retry without it
+        for code in ([f"{school} {subject} {number}"] if school else []) + [f"{subject} {number}"]:
+            row = answers.index.resolve(code)
+            if row is not None:
+                return row
+    return None
+
+
+def _record(intent: str, response: str) -> Dict:
+    increment("chat_local_answers_total", intent=intent)
+    return {"response": response, "intent": intent}
@@ -1,4 +1,5 @@
 import os
+from typing import Dict
 from dotenv import load_dotenv
 
 # Load environment variables from .env file
@@ -7,6 +8,37 @@ load_dotenv()
 class Config:
     GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY", "")
     DEBUG = os.getenv("DEBUG", "False").lower() == "true"
+    # Catalog responses only change when process_courses.py is re-run; clients and
+    # CDNs may reuse them briefly and must revalidate with the ETag afterwards
+    CATALOG_CACHE_CONTROL = os.getenv("CATALOG_CACHE_CONTROL", "public, max-age=300, stale-while-revalidate=3600")
+    # LSA recommendations switch from exact scoring to the IVF index at this many
+    # courses; ANN_NPROBE is how many inverted lists each query scans (recall vs latency)
+    ANN_MIN_COURSES = int(os.getenv("ANN_MIN_COURSES", "20000"))
+    ANN_NPROBE = int(os.getenv("ANN_NPROBE", "8"))
+    # Processed catalog JSON to serve instead of processing_csv/output/all_courses_data.json
+    # (e.g. a synthetic catalog from benchmarks/synthetic_catalog.py)
+    CATALOG_PATH = os.getenv("CATALOG_PATH", "")
+    # Per-stage timers in the recommendation pipeline (Server-Timing header + histograms)
+    STAGE_TIMING = os.getenv("STAGE_TIMING", "False").lower() == "true"
+    # Upstream base URLs; point them at benchmarks/fake_openalex.py and
+    # benchmarks/fake_gemini.py (e.g. http://127.0.0.1:8091) for offline load tests
+    OPENALEX_API = os.getenv("OPENALEX_API", "https://api.openalex.org").rstrip("/")
+    GEMINI_API_ENDPOINT = os.getenv("GEMINI_API_ENDPOINT", "")
+    # Import the AI SDK and build the LSA index in the background after startup,
+    # so the first requests don't pay for them
+    STARTUP_WARMUP = os.getenv("STARTUP_WARMUP", "True").lower() == "true"
+    # Memory-mapped index arrays (one .npy per catalog version), shared by all
+    # worker processes; defaults to index_cache/ next to the catalog JSON
+    INDEX_CACHE_DIR = os.getenv("INDEX_CACHE_DIR", "")
+    
+    @staticmethod
+    def genai_options() -> Dict:
+        """Keyword arguments for genai.configure (a custom endpoint needs the REST transport)"""
+        options = {"api_key": Config.GOOGLE_API_KEY}
+        if Config.GEMINI_API_ENDPOINT:
+            options["transport"] = "rest"
+            options["client_options"] = {"api_endpoint": Config.GEMINI_API_ENDPOINT}
+        return options
     
     @staticmethod
     def validate():
@@ -20,7 +52,19 @@ class Config:
         
         return warnings
 
-# Validate on import
-warnings = Config.validate()
-for warning in warnings:
-    print(warning)
+
+_genai = None
+
+
+def get_genai():
+    """google.generativeai, imported and configured on first use
+
+    The SDK takes most of a second to import, so it stays out of worker boot.
+    """
+    global _genai
+    if _genai is None:
+        import google.generativeai as genai
+        if Config.GOOGLE_API_KEY:
+            genai.configure(**Config.genai_options())
+        _genai = genai
+    return _genai
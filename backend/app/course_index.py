@@ -0,0 +1,118 @@
+"""
+Course lookup indexes
+Hash indexes on course id and normalized code (cross-listed "A | B" codes are
+split into aliases), plus a sorted key array for prefix fallback lookups.
+Built once per catalog version.
+"""
+
+from bisect import bisect_left
+from typing import Dict, List, Optional, Tuple
+
+
+def normalize_code(code: str) -> str:
+    """Canonical form of a course code: upper case, single spaces"""
+    return " ".join(code.upper().replace("_", " ").replace("-", " ").split())
+
+
+def code_aliases(code: str) -> List[str]:
+    """Normalized codes a course answers to, one per cross-listing"""
+    aliases = []
+    for part in code.split("|"):
+        alias = normalize_code(part)
+        if alias and alias not in aliases:
+            aliases.append(alias)
+    return aliases
+
+
+class CourseIndex:
+    """Row lookups into a catalog's flattened course list"""
+
+    def __init__(self, courses: List[Dict]):
+        self.by_id: Dict[str, int] = {}
+        self.by_code: Dict[str, int] = {}
+
+        prefix_rows: Dict[str, int] = {}
+        for row, course in enumerate(courses):
+            self.by_id.setdefault(course.get('id', ''), row)
+            self.by_id.setdefault(normalize_code(course.get('id', '')), row)
+            for alias in code_aliases(course.get('code', '')):
+                self.by_code.setdefault(alias, row)
+                # "CAS CS 111" is also findable from "CS 111" and "111"
+                tokens = alias.split()
+                for start in range(len(tokens)):
+                    prefix_rows.setdefault(" ".join(tokens[start:]), row)
+
+        items = sorted(prefix_rows.items())
+        self.sorted_keys: List[str] = [key for key, _ in items]
+        self._sparse = self._build_min_table([row for _, row in items])
+
+    @staticmethod
+    def _build_min_table(rows: List[int]) -> List[List[int]]:
+        """Sparse table so the earliest catalog row in any key range is O(1)"""
+        table = [rows]
+        width = 1
+        while width * 2 <= len(rows):
+            prev = table[-1]
+            table.append([min(prev[i], prev[i + width]) for i in range(len(rows) - width * 2 + 1)])
+            width *= 2
+        return table
+
+    def _range_min(self, lo: int, hi: int) -> int:
+        level = (hi - lo).bit_length() - 1
+        row = self._sparse[level]
+        return min(row[lo], row[hi - (1 << level)])
+
+    def prefix_range(self, prefix: str) -> Tuple[int, int]:
+        """Half-open range of sorted keys starting with prefix"""
+        lo = bisect_left(self.sorted_keys, prefix)
+        hi = bisect_left(self.sorted_keys, prefix + "\uffff", lo)
+        return lo, hi
+
+    def find_prefix(self, prefix: str) -> Optional[int]:
+        """First course (in catalog order) with a code or code suffix starting with prefix"""
+        if not prefix:
+            return None
+        lo, hi = self.prefix_range(prefix)
+        if lo >= hi:
+            return None
+        return self._range_min(lo, hi)
+
+    def find_code(self, code: str) -> Optional[int]:
+        """Exact match on a normalized code or cross-listed alias"""
+        return self.by_code.get(normalize_code(code))
+
+    def resolve(self, code: str) -> Optional[int]:
+        """Exact match on an id, code, alias or school-less code ("CS 111")"""
+        row = self.by_id.get(code)
+        if row is not None:
+            return row
+        normalized = normalize_code(code)
+        row = self.by_code.get(normalized)
+        if row is not None:
+            return row
+        lo, hi = self.prefix_range(normalized)
+        if lo < hi and self.sorted_keys[lo] == normalized:
+            return self._range_min(lo, lo + 1)
+        return self.by_id.get(normalized)
+
+    def lookup(self, course_id: str) -> Optional[int]:
+        """Resolve an id, code or partial code to a catalog row"""
+        row = self.by_id.get(course_id)
+        if row is not None:
+            return row
+
+        normalized = normalize_code(course_id)
+        row = self.by_code.get(normalized)
+        if row is not None:
+            return row
+
+        row = self.by_id.get(normalized)
+        if row is not None:
+            return row
+
+        return self.find_prefix(normalized)
+
+
+def get_course_index(catalog) -> CourseIndex:
+    """The lookup index for a catalog version"""
+    return catalog.memo("course_index", lambda: CourseIndex(catalog.courses))
@@ -0,0 +1,176 @@
+"""
+Precomputed "more like this" graph
+Each course's K most similar courses by cosine similarity of TF-IDF vectors
+over subject and title. Similarities come from blocked sparse products
+(X[block] @ Xᵀ), so no dense n x n matrix is ever formed, and only each row's
+top K survive: an int32 neighbor table and a float16 score table, one row per
+course, best first, padded with -1. Looking up a course's neighbors is a row
+read, whatever the catalog size. Build offline alongside the catalog with:
+    python -m app.course_neighbors build [--k 30]
+"""
+
+import argparse
+import hashlib
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+K_NEIGHBORS = 30
+# Similarity entries materialized per block (~12 bytes each plus sort scratch)
+BLOCK_NONZEROS = 4_000_000
+GRAPH_FILENAME = "course_knn_graph.npz"
+
+
+def similarity_text(course: Dict) -> str:
+    """Subjects and title; the school prefix and course number say nothing about content"""
+    subjects = []
+    for part in course.get('code', '').split('|'):
+        tokens = part.split()
+        if len(tokens) >= 2 and tokens[1] not in subjects:
+            subjects.append(tokens[1])
+    return " ".join(subjects + [course.get('name', '')])
+
+
+def build_neighbor_tables(texts: List[str], k: int = K_NEIGHBORS,
+                          block_rows: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
+    """(neighbors int32 n x k, scores float16 n x k), best first, excluding the course itself
+
+    block_rows defaults to what keeps each block's product near BLOCK_NONZEROS entries.
+    """
+    from sklearn.feature_extraction.text import TfidfVectorizer
+
+    vectors = TfidfVectorizer(
+        stop_words='english',
+        ngram_range=(1, 2),
+        sublinear_tf=True,
+        dtype=np.float32
+    ).fit_transform(texts).tocsr()
+    transposed = vectors.T.tocsr()
+    n = vectors.shape[0]
+    if block_rows is None:
+        # Σ df² bounds the product's nonzeros, so this is the average row's worst case
+        df = np.diff(transposed.indptr).astype(np.int64)
+        per_row = max(1.0, float((df * df).sum()) / max(n, 1))
+        block_rows = int(max(1, min(n, BLOCK_NONZEROS // per_row)))
+    neighbors = np.full((n, k), -1, dtype=np.int32)
+    scores = np.zeros((n, k), dtype=np.float16)
+
+    for start in range(0, n, block_rows):
+        # Rows are unit length, so the sparse product is cosine similarity
+        block = (vectors[start:start + block_rows] @ transposed).tocsr()
+        rows = np.repeat(np.arange(block.shape[0]), np.diff(block.indptr))
+        keep = (block.indices != rows + start) & (block.data > 0)
+        rows, cols, sims = rows[keep], block.indices[keep], block.data[keep]
+
+        # Group by row, best score first (ties by catalog order), then keep each row's first k
+        order = np.lexsort((cols, -sims, rows))
+        rows, cols, sims = rows[order], cols[order], sims[order]
+        counts = np.bincount(rows, minlength=block.shape[0])
+        rank = np.arange(len(rows)) - np.repeat(np.cumsum(counts) - counts, counts)
+        top = rank < k
+        neighbors[start + rows[top], rank[top]] = cols[top]
+        scores[start + rows[top], rank[top]] = sims[top]
+    return neighbors, scores
+
+
+class NeighborGraph:
+    """Top-K similar courses for every catalog row"""
+
+    def __init__(self, neighbors: np.ndarray, scores: np.ndarray):
+        self.neighbors = neighbors
+        self.scores = scores
+
+    @property
+    def k(self) -> int:
+        return self.neighbors.shape[1]
+
+    def similar(self, row: int) -> List[Tuple[int, float]]:
+        """(row, similarity) of a course's stored neighbors, best first"""
+        return [(int(neighbor), float(score)) for neighbor, score in zip(self.neighbors[row], self.scores[row])
+                if neighbor >= 0]
+
+    def save(self, path: Path, catalog_version: str):
+        np.savez(path, catalog_version=np.array(catalog_version), neighbors=self.neighbors, scores=self.scores)
+
+    @classmethod
+    def load(cls, path: Path, rows: int, catalog_version: str) -> Optional["NeighborGraph"]:
+        """Load a prebuilt graph, or None if it is missing or was built for another catalog"""
+        try:
+            with np.load(path) as data:
+                if str(data['catalog_version']) != catalog_version or data['neighbors'].shape[0] != rows:
+                    return None
+                return cls(data['neighbors'], data['scores'])
+        except (OSError, KeyError, ValueError):
+            return None
+
+
+def graph_path(catalog) -> Optional[Path]:
+    return catalog.path.parent / GRAPH_FILENAME if catalog.path else None
+
+
+def graph_source(catalog) -> str:
+    """Names where the tables come from: the prebuilt file (by size and mtime), else an in-process build"""
+    path = graph_path(catalog)
+    if path is None or not path.exists():
+        return f"k{K_NEIGHBORS}"
+    stat = path.stat()
+    return hashlib.blake2b(f"{stat.st_size}:{stat.st_mtime_ns}".encode(), digest_size=4).hexdigest()
+
+
+def get_neighbor_graph(catalog) -> NeighborGraph:
+    """The neighbor graph for a catalog version
+
+    Mapped from the index cache when it has the tables, so every worker shares
+    one copy; otherwise loaded from a matching prebuilt file, or built in-process.
+    """
+    def build():
+        path = graph_path(catalog)
+        loaded: Dict[str, np.ndarray] = {}
+
+        def table(name: str) -> np.ndarray:
+            def load():
+                if not loaded:
+                    graph = NeighborGraph.load(path, len(catalog.courses), catalog.version) if path and path.exists() else None
+                    if graph is None:
+                        graph = NeighborGraph(*build_neighbor_tables([similarity_text(c) for c in catalog.courses]))
+                        print(f"🕸️  Built course neighbor graph in-process: {graph.k} neighbors x {len(catalog.courses)} courses")
+                    else:
+                        print(f"🕸️  Loaded course neighbor graph from {path}")
+                    loaded.update(neighbors=graph.neighbors, scores=graph.scores)
+                return loaded[name]
+            return catalog.shared_array(f"knn_{name}_{graph_source(catalog)}", load)
+
+        graph = NeighborGraph(table("neighbors"), table("scores"))
+        if not loaded:
+            print(f"🕸️  Mapped course neighbor graph from the index cache: {graph.k} neighbors x {len(catalog.courses)} courses")
+        return graph
+
+    return catalog.memo("neighbor_graph", build)
+
+
+def main():
+    from app.catalog import get_catalog
+
+    parser = argparse.ArgumentParser(description="Build the course neighbor graph next to the catalog JSON")
+    parser.add_argument("command", choices=["build"])
+    parser.add_argument("--k", type=int, default=K_NEIGHBORS, help="neighbors stored per course")
+    parser.add_argument("--block-rows", type=int, default=None, help="rows per sparse similarity block (default: sized to memory)")
+    args = parser.parse_args()
+
+    catalog = get_catalog()
+    if catalog.path is None:
+        raise SystemExit("❌ No catalog found. Run the CSV processor first.")
+
+    started = time.perf_counter()
+    graph = NeighborGraph(*build_neighbor_tables([similarity_text(c) for c in catalog.courses], args.k, args.block_rows))
+    path = graph_path(catalog)
+    graph.save(path, catalog.version)
+    size = graph.neighbors.nbytes + graph.scores.nbytes
+    print(f"💾 Saved {graph.k}-neighbor graph for {len(catalog.courses)} courses ({size / 1024**2:.1f} MB) to {path} "
+          f"in {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""
+Dense course vectors
+Latent semantic analysis (TF-IDF projected with TruncatedSVD) over course code
+and name, fitted once per catalog version and kept as a row-normalized float32
+matrix so a query is scored with a single matrix-vector product. The fitted
+vocabulary, idf weights, vectors and projection are cached as shared arrays,
+so workers and later processes load them instead of refitting.
+"""
+
+import hashlib
+import json
+from typing import Dict, List, Optional
+
+import numpy as np
+
+LSA_COMPONENTS = 128
+LSA_PARAMS = {
+    "stop_words": "english",
+    "ngram_range": [1, 2],
+    "min_df": 1,
+    "sublinear_tf": True,
+    "n_components": LSA_COMPONENTS,
+    "random_state": 42,
+}
+# Part of every cached array's key, so changing a parameter never maps stale arrays
+LSA_PARAMS_HASH = hashlib.blake2b(json.dumps(LSA_PARAMS, sort_keys=True).encode(), digest_size=4).hexdigest()
+
+
+def course_text(course: Dict) -> str:
+    """Text a course is matched on (same as the TF-IDF recommender)"""
+    return f"{course['code']} {course['name']}"
+
+
+def normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+def _vectorizer(**kwargs):
+    # sklearn (and scipy under it) is imported here, not at worker boot
+    from sklearn.feature_extraction.text import TfidfVectorizer
+
+    return TfidfVectorizer(
+        stop_words=LSA_PARAMS['stop_words'],
+        ngram_range=tuple(LSA_PARAMS['ngram_range']),
+        min_df=LSA_PARAMS['min_df'],
+        sublinear_tf=LSA_PARAMS['sublinear_tf'],
+        **kwargs
+    )
+
+
+def fit_lsa(texts: List[str]) -> Dict[str, np.ndarray]:
+    """Fit TF-IDF + TruncatedSVD and return the arrays an LSAIndex is rebuilt from"""
+    from sklearn.decomposition import TruncatedSVD
+
+    vectorizer = _vectorizer()
+    tfidf = vectorizer.fit_transform(texts)
+    components = max(1, min(LSA_PARAMS['n_components'], tfidf.shape[1] - 1, len(texts) - 1))
+    svd = TruncatedSVD(n_components=components, random_state=LSA_PARAMS['random_state'])
+    vectors = normalize_rows(svd.fit_transform(tfidf)).astype(np.float32)
+    return {
+        # Vocabulary in column order, so the fitted vectorizer can be rebuilt without refitting
+        "terms": np.asarray(vectorizer.get_feature_names_out(), dtype=str),
+        "idf": vectorizer.idf_.astype(np.float64),
+        "vectors": vectors,
+        # term -> latent direction, one C-contiguous row per vocabulary term
+        "projection": np.ascontiguousarray(svd.components_.T, dtype=np.float32),
+    }
+
+
+class LSAIndex:
+    """Course vectors in a low-rank latent semantic space"""
+
+    def __init__(self, terms: np.ndarray, idf: np.ndarray, vectors: np.ndarray, projection: np.ndarray):
+        self.vectorizer = _vectorizer(vocabulary={term: i for i, term in enumerate(terms.tolist())})
+        self.vectorizer.idf_ = np.array(idf, dtype=np.float64)
+        self.vectors = vectors
+        self.projection = projection
+
+    def embed(self, text: str) -> np.ndarray:
+        """Unit-length latent vector for a query (all zeros if no term is known)"""
+        # Same as svd.transform, but a query has only a few terms: summing their rows
+        # avoids the dense copy of the whole projection a sparse product makes
+        row = self.vectorizer.transform([text])
+        vector = (row.data @ self.projection[row.indices]).astype(np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm > 0 else vector
+
+    def scores(self, text: str, rows: Optional[np.ndarray] = None) -> np.ndarray:
+        """Cosine similarity of the query to every course (or the given rows)"""
+        vectors = self.vectors if rows is None else self.vectors[rows]
+        return vectors @ self.embed(text)
+
+
+def get_lsa_index(catalog) -> LSAIndex:
+    """The LSA index for a catalog version, fitted only if its cached arrays are missing"""
+    def build():
+        fitted: Dict[str, np.ndarray] = {}
+
+        def array(name: str) -> np.ndarray:
+            def fit():
+                if not fitted:
+                    fitted.update(fit_lsa([course_text(c) for c in catalog.courses]))
+                return fitted[name]
+            # Mapped from disk and shared by every worker; only the vocabulary dict is per process
+            return catalog.shared_array(f"lsa_{name}_{LSA_PARAMS_HASH}", fit)
+
+        index = LSAIndex(array("terms"), array("idf"), array("vectors"), array("projection"))
+        source = "Built" if fitted else "Loaded"
+        print(f"🧭 {source} LSA index: {index.vectors.shape[0]} courses x {index.vectors.shape[1]} dims")
+        return index
+
+    return catalog.memo("lsa_index", build)
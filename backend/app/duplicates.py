@@ -0,0 +1,65 @@
+"""
+Cross-listed and near-duplicate course groups
+process_courses.py tags each course of a duplicate group (a cross-listing, or
+the same course offered by several schools) with a duplicate_group id. Here
+every catalog row maps to its group's canonical row, the first member in
+catalog order, so collapsing a result list is one array lookup per row.
+"""
+
+from typing import Dict, List
+
+import numpy as np
+
+
+class DuplicateIndex:
+    """canonical[row] is the first catalog row of the course's duplicate group (itself if unique)"""
+
+    def __init__(self, courses: List[Dict], canonical: np.ndarray):
+        self.courses = courses
+        self.canonical = canonical
+        # Canonical row -> member rows, for groups of two or more
+        self.groups: Dict[int, List[int]] = {}
+        for row in np.flatnonzero(canonical != np.arange(len(canonical))).tolist():
+            self.groups.setdefault(int(canonical[row]), [int(canonical[row])]).append(row)
+
+    @staticmethod
+    def canonical_rows(courses: List[Dict]) -> np.ndarray:
+        canonical = np.arange(len(courses), dtype=np.int32)
+        first = {}
+        for row, course in enumerate(courses):
+            group = course.get('duplicate_group')
+            if group is not None:
+                canonical[row] = first.setdefault(group, row)
+        return canonical
+
+    def collapse(self, rows) -> np.ndarray:
+        """rows with every later member of an already present group dropped, order kept"""
+        rows = np.asarray(rows, dtype=np.intp)
+        _, first = np.unique(self.canonical[rows], return_index=True)
+        return rows[np.sort(first)]
+
+    def unique_count(self, rows) -> int:
+        """Number of distinct courses among rows"""
+        return len(np.unique(self.canonical[np.asarray(rows, dtype=np.intp)]))
+
+    def also_listed_as(self, row: int) -> List[str]:
+        """Codes of the other members of a course's group"""
+        members = self.groups.get(int(self.canonical[row]))
+        if not members:
+            return []
+        own = self.courses[row]['code']
+        codes = []
+        for member in members:
+            code = self.courses[member]['code']
+            if code != own and code not in codes:
+                codes.append(code)
+        return codes
+
+
+def get_duplicate_index(catalog) -> DuplicateIndex:
+    """The duplicate groups of a catalog version; catalogs built without them collapse nothing"""
+    def build():
+        canonical = catalog.shared_array("duplicate_canonical", lambda: DuplicateIndex.canonical_rows(catalog.courses))
+        return DuplicateIndex(catalog.courses, canonical)
+
+    return catalog.memo("duplicate_index", build)
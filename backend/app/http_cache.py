@@ -0,0 +1,68 @@
+"""
+Conditional GET helpers for read-only catalog endpoints
+ETags are derived from the catalog content hash plus the request path and
+query, so a 304 can be answered before any body is built or serialized.
+"""
+
+import hashlib
+from typing import Dict, Optional
+
+from fastapi import Request
+from fastapi.responses import Response
+
+from app.config import Config
+
+
+def catalog_etag(request: Request, version: str) -> str:
+    """Strong ETag for this request against a catalog version"""
+    key = request.url.path + "?" + "&".join(f"{k}={v}" for k, v in sorted(request.query_params.multi_items()))
+    digest = hashlib.blake2b(key.encode("utf-8"), digest_size=6).hexdigest()
+    return f'"{version}-{digest}"'
+
+
+def is_not_modified(request: Request, etag: str) -> bool:
+    """Check If-None-Match (weak comparison, as RFC 9110 requires for GET)"""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    for candidate in header.split(","):
+        candidate = candidate.strip()
+        if candidate == "*":
+            return True
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        # Precompressed variants carry an encoding suffix on the same validator
+        if candidate == etag or _strip_encoding(candidate) == etag:
+            return True
+    return False
+
+
+def _strip_encoding(candidate: str) -> str:
+    for suffix in ('-br"', '-gzip"'):
+        if candidate.endswith(suffix):
+            return candidate[:-len(suffix)] + '"'
+    return candidate
+
+
+def cache_headers(etag: str) -> Dict[str, str]:
+    """Validator and freshness headers for a catalog response"""
+    return {"ETag": etag, "Cache-Control": Config.CATALOG_CACHE_CONTROL}
+
+
+def not_modified_response(etag: str, request: Optional[Request] = None) -> Response:
+    """Empty 304 carrying the same validator and freshness headers
+
+    Pass the request for endpoints with precompressed variants so the 304 echoes
+    the validator of the variant the client holds.
+    """
+    headers = cache_headers(etag)
+    if request is not None:
+        for candidate in request.headers.get("if-none-match", "").split(","):
+            candidate = candidate.strip()
+            if candidate.startswith("W/"):
+                candidate = candidate[2:]
+            if candidate != etag and _strip_encoding(candidate) == etag:
+                headers["ETag"] = candidate
+                headers["Vary"] = "Accept-Encoding"
+                break
+    return Response(status_code=304, headers=headers)
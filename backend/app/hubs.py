@@ -0,0 +1,295 @@
+"""
+BU Hub bitmask index, coverage solver and progress calculator
+Each course gets an int bitmask (and a row of a 0/1 course x hub matrix) of the
+Hub areas it satisfies, built once per catalog version. The solver picks a
+small course set that covers a list of still-needed Hub areas (greedy weighted
+set cover, or exact branch-and-bound when the input is small); the progress
+calculator reports covered/missing areas for one or many students' plans.
+"""
+
+import time
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.course_index import get_course_index
+
+# Exact search is exponential in the number of needed areas; above this the
+# greedy answer (within ln(k) of optimal) is returned instead
+EXACT_MAX_HUBS = 12
+# Graduate-level courses still count toward the Hub but cost more to pick
+GRADUATE_COURSE_COST = 2.0
+ALTERNATIVES_PER_PICK = 3
+
+
+class HubIndex:
+    """Per-course Hub bitmasks for one catalog version"""
+
+    def __init__(self, courses: List[Dict]):
+        names = set()
+        for course in courses:
+            names.update(course.get('hub_areas', {}).keys())
+        self.hub_names: List[str] = sorted(names)
+        self.bit_by_name: Dict[str, int] = {name: bit for bit, name in enumerate(self.hub_names)}
+        self._bit_by_lower = {name.lower(): bit for name, bit in self.bit_by_name.items()}
+
+        self.masks: List[int] = []
+        self.matrix = np.zeros((len(courses), len(self.hub_names)), dtype=np.uint8)
+        for row, course in enumerate(courses):
+            mask = 0
+            for name in course.get('hub_areas', {}):
+                bit = self.bit_by_name[name]
+                mask |= 1 << bit
+                self.matrix[row, bit] = 1
+            self.masks.append(mask)
+
+        self.costs: List[float] = [self._course_cost(course) for course in courses]
+
+    @staticmethod
+    def _course_cost(course: Dict) -> float:
+        number = course.get('code', '').split('|')[0].split()[-1:] or ['']
+        digits = ''.join(ch for ch in number[0] if ch.isdigit())
+        return GRADUATE_COURSE_COST if digits and int(digits) >= 500 else 1.0
+
+    def resolve_names(self, names: List[str]) -> Tuple[int, List[str]]:
+        """Bitmask for Hub area names (case-insensitive) and the names not recognized"""
+        mask = 0
+        unknown = []
+        for name in names:
+            bit = self._bit_by_lower.get(name.strip().lower())
+            if bit is None:
+                unknown.append(name)
+            else:
+                mask |= 1 << bit
+        return mask, unknown
+
+    def names(self, mask: int) -> List[str]:
+        return [name for bit, name in enumerate(self.hub_names) if (mask >> bit) & 1]
+
+
+def get_hub_index(catalog) -> HubIndex:
+    """The Hub bitmask index for a catalog version"""
+    return catalog.memo("hub_index", lambda: HubIndex(catalog.courses))
+
+
+def _greedy_cover(groups: List[Tuple[int, float, List[int]]], need: int) -> List[int]:
+    """Repeatedly take the group with the most newly covered areas per unit cost"""
+    remaining = need
+    picks = []
+    while remaining:
+        best, best_ratio = None, 0.0
+        for position, (mask, cost, _) in enumerate(groups):
+            gain = bin(mask & remaining).count("1")
+            if gain and gain / cost > best_ratio:
+                best, best_ratio = position, gain / cost
+        if best is None:
+            break
+        picks.append(best)
+        remaining &= ~groups[best][0]
+    return picks
+
+
+def _prune_dominated(groups: List[Tuple[int, float, List[int]]], need: int) -> List[Tuple[int, float, List[int]]]:
+    """Drop groups whose areas are a strict subset of a no-more-expensive group's
+
+    Uses a superset-minimum table over the 2^k subsets of needed areas, so it
+    is O(2^k * k) rather than quadratic in the number of groups.
+    """
+    bits = [bit for bit in range(need.bit_length()) if (need >> bit) & 1]
+    k = len(bits)
+
+    def compress(mask: int) -> int:
+        packed = 0
+        for position, bit in enumerate(bits):
+            if (mask >> bit) & 1:
+                packed |= 1 << position
+        return packed
+
+    packed_groups = [compress(mask) for mask, _, _ in groups]
+    cheapest = [float("inf")] * (1 << k)
+    for packed, (_, cost, _) in zip(packed_groups, groups):
+        cheapest[packed] = min(cheapest[packed], cost)
+    for position in range(k):
+        for subset in range(1 << k):
+            if not (subset >> position) & 1:
+                cheapest[subset] = min(cheapest[subset], cheapest[subset | (1 << position)])
+
+    kept = []
+    for packed, group in zip(packed_groups, groups):
+        strict_superset_cost = min(
+            (cheapest[packed | (1 << position)] for position in range(k) if not (packed >> position) & 1),
+            default=float("inf")
+        )
+        if strict_superset_cost > group[1]:
+            kept.append(group)
+    return kept
+
+
+def _exact_cover(groups: List[Tuple[int, float, List[int]]], need: int, incumbent: List[int]) -> List[int]:
+    """Branch-and-bound minimum-cost cover, seeded with the greedy answer as the bound"""
+    best_cost = sum(groups[p][1] for p in incumbent)
+    best_picks = list(incumbent)
+    min_cost = min(cost for _, cost, _ in groups)
+    max_gain = max(bin(mask & need).count("1") for mask, _, _ in groups)
+
+    # Groups covering each area, most useful first
+    by_bit: Dict[int, List[int]] = {}
+    for position, (mask, cost, _) in enumerate(groups):
+        for bit in range(need.bit_length()):
+            if (mask >> bit) & 1:
+                by_bit.setdefault(bit, []).append(position)
+    for positions in by_bit.values():
+        positions.sort(key=lambda p: (-bin(groups[p][0] & need).count("1") / groups[p][1], groups[p][1]))
+
+    def search(remaining: int, cost: float, picks: List[int]):
+        nonlocal best_cost, best_picks
+        if not remaining:
+            if cost < best_cost:
+                best_cost, best_picks = cost, list(picks)
+            return
+        # Lower bound: every further pick covers at most max_gain areas at min_cost
+        still_needed = -(-bin(remaining).count("1") // max_gain)
+        if cost + still_needed * min_cost >= best_cost:
+            return
+        # Branch on the lowest uncovered area; some pick must cover it
+        bit = (remaining & -remaining).bit_length() - 1
+        for position in by_bit.get(bit, []):
+            picks.append(position)
+            search(remaining & ~groups[position][0], cost + groups[position][1], picks)
+            picks.pop()
+
+    search(need, 0.0, [])
+    return best_picks
+
+
+def solve_hub_cover(catalog, hub_areas: List[str], school_filters: Optional[List[str]] = None,
+                    completed: Optional[List[str]] = None, mode: str = "auto") -> Dict:
+    """Pick a small set of courses that together cover the requested Hub areas"""
+    started = time.perf_counter()
+    hubs = get_hub_index(catalog)
+    index = get_course_index(catalog)
+
+    requested, unknown_areas = hubs.resolve_names(hub_areas)
+    need = requested
+
+    # Areas already satisfied by completed courses drop out of the problem
+    completed_rows = set()
+    for code in completed or []:
+        row = index.resolve(code)
+        if row is not None:
+            completed_rows.add(row)
+            need &= ~hubs.masks[row]
+
+    schools = {s.lower() for s in school_filters} if school_filters else None
+
+    # Courses that cover the same subset of needed areas are interchangeable:
+    # keep the cheapest few per subset so the search space is at most 2^k groups
+    by_subset: Dict[int, List[int]] = {}
+    if need:
+        for row, mask in enumerate(hubs.masks):
+            subset = mask & need
+            if not subset or row in completed_rows:
+                continue
+            if schools is not None and catalog.courses[row].get('school', '').lower() not in schools:
+                continue
+            by_subset.setdefault(subset, []).append(row)
+
+    groups = []
+    coverable = 0
+    for subset, rows in by_subset.items():
+        rows.sort(key=lambda r: (hubs.costs[r], r))
+        groups.append((subset, hubs.costs[rows[0]], rows[:ALTERNATIVES_PER_PICK + 1]))
+        coverable |= subset
+
+    target = need & coverable
+    # "exact" is honoured only for small inputs; larger ones always get the greedy cover
+    use_exact = mode != "greedy" and bin(target).count("1") <= EXACT_MAX_HUBS
+    if use_exact and groups:
+        groups = _prune_dominated(groups, target)
+    picks = _greedy_cover(groups, target)
+    if use_exact and picks:
+        picks = _exact_cover(groups, target, picks)
+
+    selected = []
+    for position in picks:
+        subset, cost, rows = groups[position]
+        row = rows[0]
+        course = catalog.courses[row]
+        selected.append({
+            "code": course['code'],
+            "name": course.get('name', ''),
+            "school": course.get('school', ''),
+            "covers": hubs.names(subset & target),
+            "hub_areas": hubs.names(hubs.masks[row]),
+            "cost": cost,
+            "alternatives": [catalog.courses[r]['code'] for r in rows[1:]]
+        })
+
+    return {
+        "courses": selected,
+        "total_courses": len(selected),
+        "total_cost": sum(course["cost"] for course in selected),
+        "covered": hubs.names(target),
+        "uncoverable": hubs.names(need & ~coverable),
+        "already_satisfied": hubs.names(requested & ~need),
+        "unknown_hub_areas": unknown_areas,
+        "mode": "exact" if use_exact else "greedy",
+        "elapsed_ms": round((time.perf_counter() - started) * 1000, 3)
+    }
+
+
+def hub_progress(catalog, plans: List[List[str]], hub_areas: Optional[List[str]] = None) -> List[Dict]:
+    """Covered and missing Hub areas, with per-area course counts, for each plan
+
+    hub_areas names that are not Hub areas are returned in unknown_hub_areas;
+    if none of them is known there is nothing to track and coverage is 0.
+    All plans are evaluated together: course codes are resolved through the
+    code index and the per-area counts come from one scatter-add over the
+    course x hub matrix, so a batch of plans costs about the same as one.
+    """
+    hubs = get_hub_index(catalog)
+    index = get_course_index(catalog)
+
+    unknown_areas: List[str] = []
+    if hub_areas:
+        required, unknown_areas = hubs.resolve_names(hub_areas)
+    else:
+        required = (1 << len(hubs.hub_names)) - 1
+
+    plan_ids = []
+    rows = []
+    unknown: List[List[str]] = []
+    for plan_id, codes in enumerate(plans):
+        seen = set()
+        missing_codes = []
+        for code in codes:
+            row = index.resolve(code)
+            if row is None:
+                missing_codes.append(code)
+            elif row not in seen:
+                seen.add(row)
+                plan_ids.append(plan_id)
+                rows.append(row)
+        unknown.append(missing_codes)
+
+    counts = np.zeros((len(plans), len(hubs.hub_names)), dtype=np.int32)
+    if rows:
+        np.add.at(counts, np.asarray(plan_ids, dtype=np.intp), hubs.matrix[np.asarray(rows, dtype=np.intp)])
+    courses_counted = np.bincount(np.asarray(plan_ids, dtype=np.intp), minlength=len(plans))
+
+    required_bits = [bit for bit in range(len(hubs.hub_names)) if (required >> bit) & 1]
+    results = []
+    for plan_id in range(len(plans)):
+        plan_counts = counts[plan_id]
+        covered = [hubs.hub_names[bit] for bit in required_bits if plan_counts[bit] > 0]
+        missing = [hubs.hub_names[bit] for bit in required_bits if plan_counts[bit] == 0]
+        results.append({
+            "covered": covered,
+            "missing": missing,
+            "counts": {hubs.hub_names[bit]: int(plan_counts[bit]) for bit in required_bits},
+            "coverage_percentage": round(100 * len(covered) / len(required_bits), 1) if required_bits else 0.0,
+            "courses_counted": int(courses_counted[plan_id]),
+            "unknown_courses": unknown[plan_id],
+            "unknown_hub_areas": unknown_areas
+        })
+    return results
@@ -1,8 +1,91 @@
+import asyncio
+import gc
+import time
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from starlette.concurrency import run_in_threadpool
+from app.catalog import get_catalog
+from app.config import Config, get_genai
+from app.metrics import MetricsMiddleware, set_gauge
 from app.routes import router
+from app.streaming import StreamAwareGZipMiddleware
 
-app = FastAPI(title="BU Course Planner API")
+
+def warm_up():
+    """Pay for the heavy imports and the LSA index before the first request needs them"""
+    started = time.perf_counter()
+    if Config.GOOGLE_API_KEY:
+        get_genai()
+    from app.course_vectors import get_lsa_index
+    catalog = get_catalog()
+    if catalog.courses:
+        get_lsa_index(catalog)
+    print(f"🔥 Warm-up finished in {time.perf_counter() - started:.1f}s")
+
+
+def preload():
+    """Build everything workers share in the pre-fork master (see gunicorn.conf.py)
+
+    Forked workers inherit the catalog, its indexes and the professor table
+    copy-on-write. gc.freeze() moves all of it into the permanent generation, so
+    a worker's garbage collections never write to (and so never copy) those pages.
+    """
+    started = time.perf_counter()
+    catalog = get_catalog()
+    try:
+        from app.smart_recommender import sync_catalog
+        sync_catalog()
+    except ImportError:
+        pass
+    warm_up()
+    if catalog.courses:
+        from app.ann_index import get_ann_index
+        from app.chat_intents import get_chat_answer_index
+        from app.course_index import get_course_index
+        from app.course_neighbors import get_neighbor_graph
+        from app.duplicates import get_duplicate_index
+        from app.hubs import get_hub_index
+        from app.routes import get_enhanced_courses
+        from app.trigram_index import get_trigram_index
+        get_enhanced_courses(catalog)
+        get_course_index(catalog)
+        get_hub_index(catalog)
+        get_trigram_index(catalog)
+        get_chat_answer_index(catalog)
+        get_neighbor_graph(catalog)
+        get_duplicate_index(catalog)
+        if len(catalog.courses) >= Config.ANN_MIN_COURSES:
+            get_ann_index(catalog)
+    from app.professor_data import load_professors
+    load_professors()
+    gc.freeze()
+    print(f"🧊 Preloaded shared state in {time.perf_counter() - started:.1f}s "
+          f"({gc.get_freeze_count():,} objects frozen)")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Startup work that used to run at import time"""
+    started = time.perf_counter()
+    for warning in Config.validate():
+        print(warning)
+    catalog = await run_in_threadpool(get_catalog)
+    try:
+        from app.smart_recommender import sync_catalog
+        sync_catalog()
+    except ImportError:
+        pass
+    set_gauge("startup_seconds", time.perf_counter() - started)
+    print(f"🚀 Ready with {len(catalog.courses)} courses in {time.perf_counter() - started:.2f}s")
+
+    warm = asyncio.get_running_loop().run_in_executor(None, warm_up) if Config.STARTUP_WARMUP else None
+    yield
+    if warm is not None and not warm.done():
+        warm.cancel()
+
+
+app = FastAPI(title="BU Course Planner API", lifespan=lifespan)
 
 # CORS settings
 app.add_middleware(
@@ -13,6 +96,14 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compress dynamic responses on the fly; the static catalog payloads are
+# served precompressed and already carry Content-Encoding, so they pass through,
+# and SSE streams (/stream endpoints) are never buffered for compression
+app.add_middleware(StreamAwareGZipMiddleware, minimum_size=1024, compresslevel=6)
+
+# Outermost, so latencies include compression and CORS handling
+app.add_middleware(MetricsMiddleware)
+
 # Include routes
 app.include_router(router)
 
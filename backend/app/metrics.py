@@ -0,0 +1,171 @@
+"""
+In-process metrics
+Thread-safe labelled counters, gauges and fixed-bucket histograms kept in
+module-level dicts, shared by every request in a worker process, plus a pure
+ASGI middleware for per-route request metrics and a Prometheus text renderer.
+"""
+
+import threading
+import time
+from bisect import bisect_left
+from typing import Dict, List, Optional, Tuple
+
+_lock = threading.Lock()
+_counters: Dict[Tuple[str, Tuple], float] = {}
+_gauges: Dict[Tuple[str, Tuple], float] = {}
+# (name, labels) -> [per-bucket counts..., +Inf count, sum]
+_histograms: Dict[Tuple[str, Tuple], List[float]] = {}
+_buckets: Dict[str, Tuple[float, ...]] = {}
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def _key(name: str, labels: Dict[str, str]) -> Tuple[str, Tuple]:
+    return name, tuple(sorted(labels.items()))
+
+
+def increment(name: str, amount: float = 1, **labels):
+    key = _key(name, labels)
+    with _lock:
+        _counters[key] = _counters.get(key, 0) + amount
+
+
+def set_gauge(name: str, value: float, **labels):
+    with _lock:
+        _gauges[_key(name, labels)] = value
+
+
+def add_gauge(name: str, amount: float, **labels):
+    key = _key(name, labels)
+    with _lock:
+        _gauges[key] = _gauges.get(key, 0) + amount
+
+
+def observe(name: str, value: float, buckets: Tuple[float, ...] = LATENCY_BUCKETS, **labels):
+    """Record one sample in a histogram (buckets are fixed by the first observation of name)"""
+    key = _key(name, labels)
+    with _lock:
+        bounds = _buckets.setdefault(name, buckets)
+        series = _histograms.get(key)
+        if series is None:
+            series = _histograms[key] = [0] * (len(bounds) + 2)
+        series[bisect_left(bounds, value)] += 1
+        series[-1] += value
+
+
+def counter_value(name: str, **labels) -> float:
+    with _lock:
+        return _counters.get(_key(name, labels), 0)
+
+
+def gauge_value(name: str, **labels) -> float:
+    with _lock:
+        return _gauges.get(_key(name, labels), 0)
+
+
+def snapshot() -> Dict:
+    """All counters and gauges as {"counters": [...], "gauges": [...]} for JSON output"""
+    with _lock:
+        counters = list(_counters.items())
+        gauges = list(_gauges.items())
+    return {
+        "counters": [{"name": name, "labels": dict(labels), "value": value} for (name, labels), value in sorted(counters)],
+        "gauges": [{"name": name, "labels": dict(labels), "value": value} for (name, labels), value in sorted(gauges)],
+    }
+
+
+def _format_labels(labels: Tuple, extra: Optional[Tuple] = None) -> str:
+    pairs = list(labels) + ([extra] if extra else [])
+    if not pairs:
+        return ""
+    escaped = (str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, value in pairs)
+    return "{" + ",".join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + "}"
+
+
+def _format_value(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+def render_prometheus() -> str:
+    """Every metric in the Prometheus text exposition format (version 0.0.4)"""
+    with _lock:
+        counters = sorted(_counters.items())
+        gauges = sorted(_gauges.items())
+        histograms = sorted((key, list(series)) for key, series in _histograms.items())
+        buckets = dict(_buckets)
+
+    lines = []
+    typed = set()
+
+    def declare(name: str, kind: str):
+        if name not in typed:
+            typed.add(name)
+            lines.append(f"# TYPE {name} {kind}")
+
+    for (name, labels), value in counters:
+        declare(name, "counter")
+        lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+    for (name, labels), value in gauges:
+        declare(name, "gauge")
+        lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+    for (name, labels), series in histograms:
+        declare(name, "histogram")
+        cumulative = 0
+        for bound, count in zip(buckets[name] + (float("inf"),), series[:-1]):
+            cumulative += count
+            le = "+Inf" if bound == float("inf") else repr(bound)
+            lines.append(f"{name}_bucket{_format_labels(labels, ('le', le))} {_format_value(cumulative)}")
+        lines.append(f"{name}_sum{_format_labels(labels)} {_format_value(series[-1])}")
+        lines.append(f"{name}_count{_format_labels(labels)} {_format_value(cumulative)}")
+    return "\n".join(lines) + "\n"
+
+
+def record_gemini_call(model: str, success: bool, response=None):
+    """Count a Gemini generate_content call and the tokens it used (from usage_metadata)"""
+    increment("gemini_requests_total", model=model, outcome="success" if success else "failure")
+    usage = getattr(response, "usage_metadata", None) if response is not None else None
+    if usage is not None:
+        increment("gemini_tokens_total", getattr(usage, "prompt_token_count", 0) or 0, model=model, kind="prompt")
+        increment("gemini_tokens_total", getattr(usage, "candidates_token_count", 0) or 0, model=model, kind="completion")
+
+
+def record_openalex_call(endpoint: str, success: bool, seconds: float):
+    increment("openalex_requests_total", endpoint=endpoint, outcome="success" if success else "failure")
+    observe("openalex_request_duration_seconds", seconds, endpoint=endpoint)
+
+
+class MetricsMiddleware:
+    """Per-route latency histogram, status counts and in-flight gauge (pure ASGI)
+
+    Routes are labelled by their path template ("/api/courses/{course_id}"), so
+    label cardinality stays bounded; unmatched paths share one label.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status = 500
+        started = time.perf_counter()
+        add_gauge("http_requests_in_flight", 1)
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - started
+            # FastAPI stores the matched route in the (shared) scope
+            route = getattr(scope.get("route"), "path", "unmatched")
+            add_gauge("http_requests_in_flight", -1)
+            increment("http_requests_total", method=method, route=route, status=str(status))
+            observe("http_request_duration_seconds", elapsed, method=method, route=route)
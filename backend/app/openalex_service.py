@@ -1,50 +1,65 @@
+import time
 import requests
 from typing import Dict, List, Optional
-import google.generativeai as genai
-from app.config import Config
+from app.config import Config, get_genai
+from app.metrics import record_gemini_call, record_openalex_call
+from app.singleflight import SingleFlight
 
-# Configure Google AI
-if Config.GOOGLE_API_KEY:
-    genai.configure(api_key=Config.GOOGLE_API_KEY)
+OPENALEX_API = Config.OPENALEX_API
 
-OPENALEX_API = "https://api.openalex.org"
+# Concurrent lookups of the same author share one HTTP request
+_author_requests = SingleFlight("openalex_author")
+_works_requests = SingleFlight("openalex_works")
+
+def _author_id(openalex_id: str) -> str:
+    # Extract ID from URL if full URL provided
+    if 'openalex.org' in openalex_id:
+        return openalex_id.split('/')[-1]
+    return openalex_id
 
 def get_author_data(openalex_id: str) -> Optional[Dict]:
     """
     Fetch author data from OpenAlex API
     Example ID: A5023147820 or full URL
     """
-    # Extract ID from URL if full URL provided
-    if 'openalex.org' in openalex_id:
-        openalex_id = openalex_id.split('/')[-1]
-    
+    openalex_id = _author_id(openalex_id)
+    return _author_requests.do(openalex_id, _fetch_author_data, openalex_id)
+
+def _fetch_author_data(openalex_id: str) -> Optional[Dict]:
     url = f"{OPENALEX_API}/authors/{openalex_id}"
+    started = time.perf_counter()
     
     try:
         response = requests.get(url)
         response.raise_for_status()
+        record_openalex_call("authors", True, time.perf_counter() - started)
         return response.json()
     except Exception as e:
+        record_openalex_call("authors", False, time.perf_counter() - started)
         print(f"Error fetching OpenAlex data: {e}")
         return None
 
 def get_author_works(openalex_id: str, limit: int = 10) -> List[Dict]:
     """Get recent publications by an author"""
-    if 'openalex.org' in openalex_id:
-        openalex_id = openalex_id.split('/')[-1]
-    
+    openalex_id = _author_id(openalex_id)
+    return _works_requests.do((openalex_id, limit), _fetch_author_works, openalex_id, limit)
+
+def _fetch_author_works(openalex_id: str, limit: int) -> List[Dict]:
     url = f"{OPENALEX_API}/works"
     params = {
         'filter': f'author.id:{openalex_id}',
         'sort': 'publication_date:desc',
         'per-page': limit
     }
+    started = time.perf_counter()
     
     try:
         response = requests.get(url, params=params)
         response.raise_for_status()
+        record_openalex_call("works", True, time.perf_counter() - started)
         return response.json().get('results', [])
     except Exception as e:
+        record_openalex_call("works", False, time.perf_counter() - started)
         print(f"Error fetching works: {e}")
         return []
 
@@ -115,19 +130,25 @@ def generate_research_summary(author_data: Dict, works: List[Dict]) -> str:
             summary += f"- {title} ({year}) - {citations} citations\n"
     
     return summary
-def generate_cold_email(
+
+# Gemini 2.0 models tried in order for cold emails
+COLD_EMAIL_MODELS = [
+    'models/gemini-2.0-flash',           # Fast and efficient
+    'models/gemini-2.0-flash-001',       # Specific version
+    'models/gemini-2.0-flash-exp',       # Experimental version
+    'models/gemini-2.0-pro-exp',         # Pro experimental
+    'models/gemini-pro-latest',          # Pro latest
+    'models/gemini-flash-latest',        # Flash latest
+]
+
+def build_cold_email_prompt(
     professor_name: str,
     research_summary: str,
     student_interests: str,
     course_context: str = ""
 ) -> str:
-    """Generate personalized cold email using Google Gemini"""
-    
-    if not Config.GOOGLE_API_KEY:
-        return "Error: Google API key not configured. Please add GOOGLE_API_KEY to .env file."
-    
-    try:
-        prompt = f"""Generate a professional, personalized cold email from a student to a professor expressing interest in research opportunities.
+    """Prompt for a personalized cold email to a professor"""
+    return f"""Generate a professional, personalized cold email from a student to a professor expressing interest in research opportunities.
 
 Professor: {professor_name}
 
@@ -160,24 +181,33 @@ Best regards,
 
 Generate the email:"""
 
-        # Use the available Gemini 2.0 models
-        model_names = [
-            'models/gemini-2.0-flash',           # Fast and efficient
-            'models/gemini-2.0-flash-001',       # Specific version
-            'models/gemini-2.0-flash-exp',       # Experimental version
-            'models/gemini-2.0-pro-exp',         # Pro experimental
-            'models/gemini-pro-latest',          # Pro latest
-            'models/gemini-flash-latest',        # Flash latest
-        ]
+def generate_cold_email(
+    professor_name: str,
+    research_summary: str,
+    student_interests: str,
+    course_context: str = ""
+) -> str:
+    """Generate personalized cold email using Google Gemini"""
+    
+    if not Config.GOOGLE_API_KEY:
+        return "Error: Google API key not configured. Please add GOOGLE_API_KEY to .env file."
+    
+    try:
+        prompt = build_cold_email_prompt(professor_name, research_summary, student_interests, course_context)
         
         successful_response = None
         last_error = None
         
-        for model_name in model_names:
+        for model_name in COLD_EMAIL_MODELS:
             try:
                 print(f"Trying model: {model_name}")
-                model = genai.GenerativeModel(model_name)
-                response = model.generate_content(prompt)
+                model = get_genai().GenerativeModel(model_name)
+                try:
+                    response = model.generate_content(prompt)
+                except Exception:
+                    record_gemini_call(model_name, False)
+                    raise
+                record_gemini_call(model_name, True, response)
                 
                 if response.text:
                     successful_response = response.text
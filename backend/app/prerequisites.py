@@ -0,0 +1,280 @@
+"""
+Prerequisite graph
+Builds a DAG of required prerequisites once per catalog version, with CSR
+adjacency arrays, ancestor bitsets and cycle detection, and validates
+multi-semester plans in a single pass.
+"""
+
+import json
+import re
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+
+from app.course_index import get_course_index
+
+# Legacy CS catalog with hand-curated prerequisites; fills gaps in the
+# multi-school catalog, which has no descriptions to parse
+PREREQUISITE_SOURCES = [
+    Path(__file__).parent.parent.parent / "data" / "processed" / "cs_courses.json",
+]
+
+COURSE_CODE_PATTERN = re.compile(r'(?:CAS\s*)?([A-Z]{2})\s*(\d{3})', re.IGNORECASE)
+
+
+def parse_prerequisites(text: str) -> Dict[str, List[str]]:
+    """Parse prerequisite text into structured format (also used by data/scripts/parse_courses.py)"""
+    if not text or 'prerequisite' not in text.lower():
+        return {"required": [], "recommended": []}
+
+    prereq_match = re.search(r'prerequisite[s]?:([^.]+)', text, re.IGNORECASE)
+    if not prereq_match:
+        return {"required": [], "recommended": []}
+
+    matches = COURSE_CODE_PATTERN.findall(prereq_match.group(1))
+    courses = list(dict.fromkeys(f"{dept.upper()} {num}" for dept, num in matches))
+
+    required = []
+    recommended = []
+    for course in courses:
+        if re.search(r'recommend.*?' + re.escape(course), text, re.IGNORECASE):
+            recommended.append(course)
+        else:
+            required.append(course)
+
+    return {"required": required, "recommended": recommended}
+
+
+def load_supplementary_prerequisites() -> Dict[str, Dict[str, List[str]]]:
+    """Structured prerequisites keyed by course code from the extra sources"""
+    prerequisites = {}
+    for path in PREREQUISITE_SOURCES:
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            continue
+        for course in data.get('courses', []):
+            prereqs = course.get('prerequisites') or {}
+            if prereqs.get('required') or prereqs.get('recommended'):
+                prerequisites[course.get('code', '')] = prereqs
+    return prerequisites
+
+
+def _to_csr(lists: List[List[int]]):
+    indptr = np.zeros(len(lists) + 1, dtype=np.int32)
+    indptr[1:] = np.cumsum([len(items) for items in lists])
+    indices = np.fromiter((item for items in lists for item in items), dtype=np.int32, count=int(indptr[-1]))
+    return indptr, indices
+
+
+def _bits(mask: int) -> List[int]:
+    rows = []
+    while mask:
+        low = mask & -mask
+        rows.append(low.bit_length() - 1)
+        mask ^= low
+    return rows
+
+
+class PrerequisiteGraph:
+    """Required/recommended prerequisite edges between catalog rows"""
+
+    def __init__(self, courses: List[Dict], index, supplementary: Optional[Dict] = None):
+        self.courses = courses
+        self.index = index
+        n = len(courses)
+
+        required: List[List[int]] = [[] for _ in range(n)]
+        recommended: List[List[int]] = [[] for _ in range(n)]
+        # Prerequisite codes we could not resolve to a catalog row, kept for display
+        self.unresolved: Dict[int, Dict[str, List[str]]] = {}
+        # Edges added from each source, so a build shows where its edges came from
+        self.edge_sources = {"catalog": 0, "parsed": 0, "supplementary": 0}
+
+        # Rows whose own entry lists prerequisites, resolvable or not
+        listed = set()
+        for row, course in enumerate(courses):
+            prereqs = course.get('prerequisites')
+            source = "catalog"
+            if not prereqs and course.get('description'):
+                prereqs = parse_prerequisites(course['description'])
+                source = "parsed"
+            if prereqs and (prereqs.get('required') or prereqs.get('recommended')):
+                listed.add(row)
+                self.edge_sources[source] += self._add_edges(row, prereqs, required, recommended)
+
+        for code, prereqs in (supplementary or {}).items():
+            row = index.resolve(code)
+            if row is not None and row not in listed:
+                listed.add(row)
+                self.edge_sources["supplementary"] += self._add_edges(row, prereqs, required, recommended)
+
+        self.required_indptr, self.required_indices = _to_csr(required)
+        self.recommended_indptr, self.recommended_indices = _to_csr(recommended)
+
+        dependents: List[List[int]] = [[] for _ in range(n)]
+        for row, prereqs in enumerate(required):
+            for prereq in prereqs:
+                dependents[prereq].append(row)
+        self.dependents_indptr, self.dependents_indices = _to_csr(dependents)
+
+        self.topological_order, self.cyclic = self._topological_sort(required, dependents)
+        self.ancestors = self._ancestor_bitsets(required)
+
+    def _add_edges(self, row: int, prereqs: Dict, required: List[List[int]], recommended: List[List[int]]) -> int:
+        added = 0
+        for kind, target in (('required', required), ('recommended', recommended)):
+            for code in prereqs.get(kind, []):
+                prereq_row = self.index.resolve(code)
+                if prereq_row is None:
+                    self.unresolved.setdefault(row, {"required": [], "recommended": []})[kind].append(code)
+                elif prereq_row != row and prereq_row not in target[row]:
+                    target[row].append(prereq_row)
+                    added += 1
+        return added
+
+    @staticmethod
+    def _topological_sort(required: List[List[int]], dependents: List[List[int]]):
+        """Kahn's algorithm; rows left over sit on or behind a cycle"""
+        in_degree = [len(prereqs) for prereqs in required]
+        queue = [row for row, degree in enumerate(in_degree) if degree == 0]
+        order = []
+        while queue:
+            row = queue.pop()
+            order.append(row)
+            for dependent in dependents[row]:
+                in_degree[dependent] -= 1
+                if in_degree[dependent] == 0:
+                    queue.append(dependent)
+        cyclic = [row for row, degree in enumerate(in_degree) if degree > 0]
+        return order, cyclic
+
+    def _ancestor_bitsets(self, required: List[List[int]]) -> Dict[int, int]:
+        """Transitive required prerequisites per row as int bitsets (rows with none are omitted)"""
+        ancestors: Dict[int, int] = {}
+        for row in self.topological_order:
+            mask = 0
+            for prereq in required[row]:
+                mask |= ancestors.get(prereq, 0) | (1 << prereq)
+            if mask:
+                ancestors[row] = mask
+
+        # Rows on a cycle: iterate to a fixed point instead of a topological pass
+        changed = bool(self.cyclic)
+        while changed:
+            changed = False
+            for row in self.cyclic:
+                mask = ancestors.get(row, 0)
+                for prereq in required[row]:
+                    mask |= ancestors.get(prereq, 0) | (1 << prereq)
+                if mask != ancestors.get(row, 0):
+                    ancestors[row] = mask
+                    changed = True
+        return ancestors
+
+    def required_rows(self, row: int) -> np.ndarray:
+        return self.required_indices[self.required_indptr[row]:self.required_indptr[row + 1]]
+
+    def recommended_rows(self, row: int) -> np.ndarray:
+        return self.recommended_indices[self.recommended_indptr[row]:self.recommended_indptr[row + 1]]
+
+    def dependent_rows(self, row: int) -> np.ndarray:
+        return self.dependents_indices[self.dependents_indptr[row]:self.dependents_indptr[row + 1]]
+
+    def ancestor_rows(self, row: int) -> List[int]:
+        return _bits(self.ancestors.get(row, 0))
+
+    def codes(self, rows: Iterable[int]) -> List[str]:
+        return [self.courses[int(row)]['code'] for row in rows]
+
+    def prerequisite_codes(self, row: int) -> Dict[str, List[str]]:
+        """Direct prerequisites of a row in the API's {"required", "recommended"} shape"""
+        unresolved = self.unresolved.get(row, {})
+        return {
+            "required": self.codes(self.required_rows(row)) + unresolved.get("required", []),
+            "recommended": self.codes(self.recommended_rows(row)) + unresolved.get("recommended", []),
+        }
+
+    def cycles(self) -> List[List[str]]:
+        """Strongly connected groups of rows that require each other"""
+        cyclic = set(self.cyclic)
+        seen = set()
+        groups = []
+        for start in self.cyclic:
+            if start in seen:
+                continue
+            # Rows that reach start and that start reaches, within the cyclic set
+            group = [row for row in cyclic
+                     if (self.ancestors.get(row, 0) >> start) & 1 and (self.ancestors.get(start, 0) >> row) & 1]
+            if group:
+                seen.update(group)
+                groups.append(self.codes(sorted(group)))
+        return groups
+
+    def validate_plan(self, semesters: List[Dict], completed: Optional[List[str]] = None) -> Dict:
+        """Check every planned course against courses finished in earlier semesters
+
+        One pass over the plan: each course costs a lookup plus a check of its
+        direct required prerequisites against the set of rows taken so far.
+        """
+        taken = set()
+        unknown = []
+        issues = []
+        duplicates = []
+
+        for code in completed or []:
+            row = self.index.resolve(code)
+            if row is None:
+                unknown.append({"code": code, "semester": None})
+            else:
+                taken.add(row)
+
+        semester_results = []
+        for position, semester in enumerate(semesters):
+            name = semester.get('name') or f"Semester {position + 1}"
+            this_semester = set()
+            semester_issues = 0
+            for code in semester.get('courses', []):
+                row = self.index.resolve(code)
+                if row is None:
+                    unknown.append({"code": code, "semester": name})
+                    continue
+                if row in taken or row in this_semester:
+                    duplicates.append({"code": self.courses[row]['code'], "semester": name})
+                missing = [int(prereq) for prereq in self.required_rows(row) if int(prereq) not in taken]
+                unverified = self.unresolved.get(row, {}).get("required", [])
+                if missing or unverified:
+                    issues.append({
+                        "code": self.courses[row]['code'],
+                        "semester": name,
+                        "missing_prerequisites": self.codes(missing),
+                        "unverified_prerequisites": unverified,
+                    })
+                    semester_issues += bool(missing)
+                this_semester.add(row)
+            # Courses in the same semester do not satisfy each other (no co-requisites)
+            taken |= this_semester
+            semester_results.append({"name": name, "course_count": len(this_semester), "issues": semester_issues})
+
+        return {
+            "valid": not unknown and not any(issue["missing_prerequisites"] for issue in issues),
+            "semesters": semester_results,
+            "issues": issues,
+            "unknown_courses": unknown,
+            "duplicates": duplicates,
+        }
+
+
+def get_prerequisite_graph(catalog) -> PrerequisiteGraph:
+    """The prerequisite graph for a catalog version"""
+    def build():
+        graph = PrerequisiteGraph(catalog.courses, get_course_index(catalog), load_supplementary_prerequisites())
+        edges = len(graph.required_indices) + len(graph.recommended_indices)
+        sources = ", ".join(f"{count} {source}" for source, count in graph.edge_sources.items())
+        print(f"🔗 Built prerequisite graph: {edges} edges ({sources}), {len(graph.cyclic)} courses on cycles, "
+              f"{len(graph.unresolved)} courses with unresolved prerequisites")
+        return graph
+
+    return catalog.memo("prerequisite_graph", build)
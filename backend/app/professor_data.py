@@ -1,23 +1,51 @@
 import pandas as pd
 from typing import List, Dict, Optional
 import os
+import threading
 
 # Load professor data
 PROFESSORS_FILE = os.path.join(os.path.dirname(__file__), '../data/openalex_dict_vHack.xlsx')
+STRING_COLUMNS = ['emp_name', 'primary_department', 'joint_department']
 
-def load_professors() -> pd.DataFrame:
-    """Load professor data from Excel file"""
+_professors: Optional[pd.DataFrame] = None
+_professors_mtime = None
+_professors_lock = threading.Lock()
+
+def _read_professors() -> pd.DataFrame:
     try:
         df = pd.read_excel(PROFESSORS_FILE)
         # Fill NaN values with empty strings to avoid errors
         df = df.fillna('')
         # Filter out professors without oaid (OpenAlex ID)
-        df = df[df['oaid'].astype(str).str.strip() != '']
+        df = df[df['oaid'].astype(str).str.strip() != ''].copy()
+        # Coerce the searched columns once so lookups never write to the shared frame
+        for column in STRING_COLUMNS:
+            if column in df.columns:
+                df[column] = df[column].astype(str)
         return df
     except Exception as e:
         print(f"Error loading professors: {e}")
         return pd.DataFrame()
 
+def load_professors() -> pd.DataFrame:
+    """Professor data from the Excel file, re-read only when the file changes
+
+    Treat the result as read-only: it is shared by every request (and, when the
+    app is preloaded, by every worker process).
+    """
+    global _professors, _professors_mtime
+    try:
+        mtime = os.stat(PROFESSORS_FILE).st_mtime_ns
+    except OSError:
+        mtime = None
+    if _professors is not None and mtime == _professors_mtime:
+        return _professors
+    with _professors_lock:
+        if _professors is None or mtime != _professors_mtime:
+            _professors = _read_professors()
+            _professors_mtime = mtime
+        return _professors
+
 def get_professors_by_department(department: str) -> List[Dict]:
     """Get all professors in a department"""
     df = load_professors()
@@ -25,10 +53,6 @@ def get_professors_by_department(department: str) -> List[Dict]:
         return []
     
     # Search in both primary and joint departments
-    # Convert to string first to avoid issues with NaN
-    df['primary_department'] = df['primary_department'].astype(str)
-    df['joint_department'] = df['joint_department'].astype(str)
-    
     matches = df[
         (df['primary_department'].str.contains(department, case=False, na=False)) |
         (df['joint_department'].str.contains(department, case=False, na=False))
@@ -44,7 +68,6 @@ def get_professor_by_name(name: str) -> Optional[Dict]:
     if df.empty:
         return None
     
-    df['emp_name'] = df['emp_name'].astype(str)
     matches = df[df['emp_name'].str.contains(name, case=False, na=False)]
     
     if len(matches) > 0:
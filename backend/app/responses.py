@@ -0,0 +1,120 @@
+"""
+JSON response classes for the catalog endpoints
+Uses orjson when it is installed and falls back to the stdlib encoder otherwise.
+Large static payloads can be served from precompressed gzip/brotli variants.
+"""
+
+import gzip
+import json
+from typing import Any, Dict, Optional
+
+from fastapi.responses import JSONResponse, Response
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is listed in requirements.txt
+    orjson = None
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - brotli is optional, gzip always works
+    brotli = None
+
+# Bodies smaller than this are not worth a compressed variant
+COMPRESSION_MIN_SIZE = 1024
+GZIP_LEVEL = 9
+# Quality 11 is ~100x slower than 9 on the full catalog for ~15% smaller output
+BROTLI_QUALITY = 9
+
+
+def dumps(content: Any) -> bytes:
+    """Encode content to compact UTF-8 JSON bytes"""
+    if orjson is not None:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(content, ensure_ascii=False, separators=(",", ":"), default=str).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse rendered with orjson
+
+    Return it directly from an endpoint so FastAPI skips jsonable_encoder;
+    the content must already be plain dicts/lists/str/numbers.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+class EncodedJSONResponse(Response):
+    """Response for a JSON body that was already encoded to bytes"""
+
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, (bytes, bytearray, memoryview)):
+            return bytes(content)
+        return dumps(content)
+
+
+def compress_variants(body: bytes) -> Dict[str, bytes]:
+    """Identity plus every compressed encoding we can produce for a body"""
+    variants = {"identity": body}
+    if len(body) < COMPRESSION_MIN_SIZE:
+        return variants
+    variants["gzip"] = gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0)
+    if brotli is not None:
+        variants["br"] = brotli.compress(body, quality=BROTLI_QUALITY)
+    return variants
+
+
+def negotiate_encoding(accept_encoding: Optional[str], available) -> str:
+    """Pick the best available content-coding for an Accept-Encoding header"""
+    if not accept_encoding:
+        return "identity"
+
+    accepted = {}
+    for item in accept_encoding.split(","):
+        coding, _, params = item.strip().partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        accepted[coding] = q
+
+    best, best_q = "identity", 0.0
+    # Server preference breaks ties: smallest encoding first
+    for coding in ("br", "gzip"):
+        if coding not in available:
+            continue
+        q = accepted.get(coding, accepted.get("*", 0.0))
+        if q > best_q:
+            best, best_q = coding, q
+    return best
+
+
+def precompressed_response(variants: Dict[str, bytes], accept_encoding: Optional[str],
+                           headers: Optional[Dict[str, str]] = None) -> Response:
+    """Serve the negotiated variant of a pre-encoded JSON body"""
+    encoding = negotiate_encoding(accept_encoding, variants)
+    response_headers = dict(headers or {})
+    if len(variants) > 1:
+        response_headers["Vary"] = "Accept-Encoding"
+    if encoding != "identity":
+        response_headers["Content-Encoding"] = encoding
+        etag = response_headers.get("ETag")
+        if etag:
+            response_headers["ETag"] = variant_etag(etag, encoding)
+    return EncodedJSONResponse(variants[encoding], headers=response_headers)
+
+
+def variant_etag(etag: str, encoding: str) -> str:
+    """Strong ETags must differ between content-codings of the same resource"""
+    if encoding == "identity":
+        return etag
+    return etag[:-1] + f'-{encoding}"'
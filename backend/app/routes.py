@@ -1,53 +1,44 @@
-from fastapi import APIRouter, HTTPException, Body
+from fastapi import APIRouter, HTTPException, Body, Request
+from fastapi.responses import PlainTextResponse
+from starlette.concurrency import run_in_threadpool
 from typing import List, Dict, Optional
 import json
 import re
 import os
-from pathlib import Path
-from app.ai_advisor import generate_ai_response
+from app.admission import Overloaded, get_limiter, record_degraded, service_unavailable
+from app.ai_advisor import generate_ai_response, stream_ai_response
+from app.catalog import DEPARTMENT_NAMES, SCHOOL_NAMES, get_catalog
+from app.chat_intents import NAVIGATION_ANSWERS, answer_locally
+from app.course_index import get_course_index
+from app.course_neighbors import get_neighbor_graph
+from app.duplicates import get_duplicate_index
+from app.prerequisites import get_prerequisite_graph
+from app.hubs import hub_progress, solve_hub_cover
+from app.metrics import render_prometheus, snapshot as metrics_snapshot
+from app.http_cache import cache_headers, catalog_etag, is_not_modified, not_modified_response
+from app.responses import FastJSONResponse, precompressed_response
+from app.streaming import error_stream, relay_events, single_event_stream, sse_response, stream_gemini
 
 router = APIRouter()
 
 # Load courses from the new multi-school JSON file
 def load_courses_from_json():
     """Load courses from the processed multi-school JSON file"""
-    try:
-        # Path to the new multi-school JSON file
-        json_path = Path(__file__).parent.parent / "processing_csv" / "output" / "all_courses_data.json"
-        
-        if not json_path.exists():
-            # Fallback path
-            json_path = Path(__file__).parent.parent / "processing_csv" / "all_courses_data.json"
-            if not json_path.exists():
-                print("❌ No multi-school course data found. Run the CSV processor first.")
-                return []
-        
-        with open(json_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-        
-        # Extract all courses from all schools and flatten them
-        all_courses = []
-        if 'schools' in data:
-            for school_name, school_data in data['schools'].items():
-                for course in school_data.get('courses', []):
-                    # Add school information to each course
-                    course_with_school = course.copy()
-                    course_with_school['school'] = school_name
-                    course_with_school['id'] = f"{school_name}_{course['code'].replace(' ', '_').replace('|', '_')}"
-                    all_courses.append(course_with_school)
-        
-        print(f"✅ Loaded {len(all_courses)} courses from {len(data.get('schools', {}))} schools")
-        return all_courses
-        
-    except Exception as e:
-        print(f"❌ Error loading courses from JSON: {e}")
-        return []
+    return get_catalog().courses
 
 def get_all_courses():
     """Helper function to get all courses from JSON file"""
     return load_courses_from_json()
 
-def enhance_course_data(course):
+def get_enhanced_courses(catalog) -> List[Dict]:
+    """API-shaped copies of every course, built once per catalog version"""
+    def build():
+        graph = get_prerequisite_graph(catalog)
+        return [enhance_course_data(c, graph.prerequisite_codes(row)) for row, c in enumerate(catalog.courses)]
+    
+    return catalog.memo("enhanced_courses", build)
+
+def enhance_course_data(course, prerequisites: Optional[Dict] = None):
     """Add missing fields for API compatibility"""
     enhanced = course.copy()
     
@@ -61,7 +52,7 @@ def enhance_course_data(course):
     enhanced['component'] = 'LEC'
     enhanced['repeatable'] = False
     enhanced['consent_required'] = False
-    enhanced['prerequisites'] = {"required": [], "recommended": []}
+    enhanced['prerequisites'] = prerequisites or {"required": [], "recommended": []}
     
     # Extract HUB requirements from hub_areas
     hub_requirements = list(course.get('hub_areas', {}).keys())
@@ -94,77 +85,173 @@ def enhance_course_data(course):
 async def list_ai_models():
     """Return available AI models from the configured Google client for debugging."""
     try:
-        import google.generativeai as genai
-        from app.config import Config
+        from app.config import Config, get_genai
 
         if not Config.GOOGLE_API_KEY:
             raise HTTPException(status_code=400, detail="GOOGLE_API_KEY not configured on server")
 
-        genai.configure(api_key=Config.GOOGLE_API_KEY)
-        models = genai.list_models()
+        models = get_genai().list_models()
         return {"models": models}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/api/courses/")
-async def list_courses(school: Optional[str] = None, hub_area: Optional[str] = None):
+async def list_courses(request: Request, school: Optional[str] = None, hub_area: Optional[str] = None):
     """Get all courses from JSON file with optional school and HUB filtering"""
-    courses = get_all_courses()
+    catalog = get_catalog()
+    etag = catalog_etag(request, catalog.version)
+    if is_not_modified(request, etag):
+        return not_modified_response(etag, request)
+    enhanced = get_enhanced_courses(catalog)
+    
+    if not school and not hub_area:
+        variants = catalog.payload_variants("courses", lambda: {
+            "courses": enhanced,
+            "total": len(enhanced),
+            "filters": {"school": None, "hub_area": None}
+        })
+        return precompressed_response(variants, request.headers.get("accept-encoding"), cache_headers(etag))
     
     # Apply filters
-    filtered_courses = courses
+    rows = range(len(catalog.courses))
     if school:
-        filtered_courses = [c for c in filtered_courses if c.get('school', '').lower() == school.lower()]
+        rows = [i for i in rows if catalog.courses[i].get('school', '').lower() == school.lower()]
     
     if hub_area:
-        filtered_courses = [c for c in filtered_courses if hub_area in c.get('hub_areas', {})]
+        rows = [i for i in rows if hub_area in catalog.courses[i].get('hub_areas', {})]
     
-    enhanced_courses = [enhance_course_data(course) for course in filtered_courses]
-    return {
+    enhanced_courses = [enhanced[i] for i in rows]
+    return FastJSONResponse({
         "courses": enhanced_courses, 
         "total": len(enhanced_courses),
         "filters": {
             "school": school,
             "hub_area": hub_area
         }
-    }
+    }, headers=cache_headers(etag))
 
 @router.get("/api/courses/{course_id}")
-async def get_course(course_id: str):
-    """Get a specific course by ID"""
-    courses = get_all_courses()
-    
-    # Try exact ID match first
-    course = next((c for c in courses if c.get("id") == course_id), None)
-    
-    if not course:
-        # Try code match
-        course = next((c for c in courses if c.get("code") == course_id), None)
+async def get_course(request: Request, course_id: str):
+    """Get a specific course by ID, code, cross-listed code or code prefix"""
+    catalog = get_catalog()
+    etag = catalog_etag(request, catalog.version)
+    if is_not_modified(request, etag):
+        return not_modified_response(etag, request)
+    
+    row = get_course_index(catalog).lookup(course_id)
+    if row is None:
+        raise HTTPException(status_code=404, detail="Course not found")
     
-    if not course:
-        # Try partial code match
-        course = next((c for c in courses if course_id in c.get("code", "")), None)
+    return FastJSONResponse(get_enhanced_courses(catalog)[row], headers=cache_headers(etag))
+
+@router.get("/api/courses/{course_id}/prerequisites")
+async def get_course_prerequisites(request: Request, course_id: str):
+    """Direct and transitive prerequisites of a course, plus the courses it unlocks"""
+    catalog = get_catalog()
+    etag = catalog_etag(request, catalog.version)
+    if is_not_modified(request, etag):
+        return not_modified_response(etag, request)
     
-    if not course:
+    row = get_course_index(catalog).lookup(course_id)
+    if row is None:
         raise HTTPException(status_code=404, detail="Course not found")
     
-    return enhance_course_data(course)
+    graph = get_prerequisite_graph(catalog)
+    return FastJSONResponse({
+        "code": catalog.courses[row]['code'],
+        "prerequisites": graph.prerequisite_codes(row),
+        "all_required": graph.codes(graph.ancestor_rows(row)),
+        "unlocks": graph.codes(graph.dependent_rows(row)),
+        "on_cycle": row in graph.ancestors and (graph.ancestors[row] >> row) & 1 == 1
+    }, headers=cache_headers(etag))
+
+@router.get("/api/courses/{course_id}/similar")
+async def get_similar_courses(request: Request, course_id: str, limit: int = 10, school: str = None, hub_area: str = None):
+    """Courses most like this one, read from the precomputed neighbor graph
+
+    school and hub_area filter the stored neighbors (K per course), so a narrow
+    filter can return fewer than limit courses. Cross-listings of the course
+    itself are skipped and each other duplicate group appears once.
+    """
+    catalog = get_catalog()
+    etag = catalog_etag(request, catalog.version)
+    if is_not_modified(request, etag):
+        return not_modified_response(etag, request)
+
+    row = get_course_index(catalog).lookup(course_id)
+    if row is None:
+        raise HTTPException(status_code=404, detail="Course not found")
+
+    # Building the graph takes seconds when no prebuilt one matches, so keep it off the event loop
+    graph = await run_in_threadpool(get_neighbor_graph, catalog)
+    limit = max(1, min(limit, graph.k))
+    enhanced = get_enhanced_courses(catalog)
+    canonical = get_duplicate_index(catalog).canonical
+    seen = {int(canonical[row])}
+    similar = []
+    for neighbor, score in graph.similar(row):
+        if canonical[neighbor] in seen:
+            continue
+        course = catalog.courses[neighbor]
+        if school and school.lower() != course.get("school", "").lower():
+            continue
+        if hub_area and hub_area not in course.get('hub_areas', {}):
+            continue
+        seen.add(int(canonical[neighbor]))
+        similar.append({**enhanced[neighbor], "similarity": round(score, 3)})
+        if len(similar) == limit:
+            break
+
+    return FastJSONResponse({
+        "code": catalog.courses[row]['code'],
+        "similar": similar,
+        "total": len(similar)
+    }, headers=cache_headers(etag))
+
+@router.post("/api/plans/validate")
+async def validate_plan(request: dict):
+    """Validate a multi-semester plan against the prerequisite graph in one pass
+    
+    Body: {"semesters": [{"name": "Fall 2025", "courses": ["CAS CS 111", ...]}, ...],
+           "completed": ["CAS MA 123", ...]}
+    A semester may also be given as a bare list of course codes.
+    """
+    semesters = request.get("semesters")
+    if not isinstance(semesters, list):
+        raise HTTPException(status_code=400, detail="semesters must be a list")
+    
+    semesters = [s if isinstance(s, dict) else {"courses": s} for s in semesters]
+    if any(not isinstance(s.get("courses", []), list) for s in semesters):
+        raise HTTPException(status_code=400, detail="Each semester's courses must be a list of course codes")
+    
+    graph = get_prerequisite_graph(get_catalog())
+    return FastJSONResponse(graph.validate_plan(semesters, request.get("completed", [])))
 
 @router.get("/api/courses/search/")
 async def search_courses(
+    request: Request,
     q: str = "", 
     department: str = None, 
     level: str = None,
     school: str = None,
-    hub_area: str = None
+    hub_area: str = None,
+    collapse: bool = True
 ):
-    """Search courses by query with optional filters"""
-    courses = get_all_courses()
+    """Search courses by query with optional filters
+    
+    Cross-listed and duplicate courses are collapsed to their first match, which
+    lists the other codes in also_listed_as; collapse=false returns every listing.
+    """
+    catalog = get_catalog()
+    etag = catalog_etag(request, catalog.version)
+    if is_not_modified(request, etag):
+        return not_modified_response(etag, request)
+    enhanced = get_enhanced_courses(catalog)
     
     query = q.lower() if q else ""
-    results = []
+    rows = []
     
-    for course in courses:
+    for i, course in enumerate(catalog.courses):
         # Text search
         text_match = True
         if query:
@@ -206,14 +293,30 @@ async def search_courses(
             hub_match = hub_area in course.get('hub_areas', {})
         
         if text_match and dept_match and level_match and school_match and hub_match:
-            results.append(enhance_course_data(course))
+            rows.append(i)
+    
+    if collapse:
+        duplicates = get_duplicate_index(catalog)
+        results = []
+        for i in duplicates.collapse(rows).tolist():
+            also_listed_as = duplicates.also_listed_as(i)
+            results.append({**enhanced[i], "also_listed_as": also_listed_as} if also_listed_as else enhanced[i])
+    else:
+        results = [enhanced[i] for i in rows]
     
-    return {"courses": results, "total": len(results)}
+    return FastJSONResponse({"courses": results, "total": len(results)}, headers=cache_headers(etag))
 
 @router.get("/api/schools/")
-async def list_schools():
+async def list_schools(request: Request):
     """Get all unique schools from actual course data"""
-    courses = get_all_courses()
+    catalog = get_catalog()
+    etag = catalog_etag(request, catalog.version)
+    if is_not_modified(request, etag):
+        return not_modified_response(etag, request)
+    return precompressed_response(catalog.payload_variants("schools", lambda: build_schools(catalog.courses)), request.headers.get("accept-encoding"), cache_headers(etag))
+
+def build_schools(courses: List[Dict]) -> Dict:
+    """Unique schools from course codes, with display names"""
     school_codes = set()
     
     # Extract unique schools from actual course data
@@ -222,25 +325,9 @@ async def list_schools():
         if code_parts:
             school_codes.add(code_parts[0])
     
-    school_mapping = {
-        'CAS': 'College of Arts & Sciences',
-        'CDS': 'College of Computing & Data Sciences',
-        'CFA': 'College of Fine Arts',
-        'CGS': 'College of General Studies',
-        'COM': 'College of Communication',
-        'ENG': 'College of Engineering',
-        'KHC': 'Kilachand Honors College',
-        'MET': 'Metropolitan College',
-        'QST': 'Questrom School of Business',
-        'SAR': 'Sargent College',
-        'SHA': 'School of Hospitality Administration',
-        'SPH': 'School of Public Health',
-        'WED': 'Wheelock College'
-    }
-    
     schools = []
     for school_code in sorted(school_codes):
-        full_name = school_mapping.get(school_code, school_code)
+        full_name = SCHOOL_NAMES.get(school_code, school_code)
         schools.append({
             'abbreviation': school_code,
             'full_name': full_name,
@@ -249,85 +336,186 @@ async def list_schools():
     
     return {"schools": schools}
 
-@router.get("/api/departments/")
-async def list_departments():
-    """Get all unique departments"""
-    dept_names = {
-        'AA': 'African American Studies', 'AH': 'Art History', 'AN': 'Anthropology', 'AR': 'Archaeology', 'AS': 'Astronomy',
-        'BB': 'Biochemistry and Molecular Biology', 'BI': 'Biology', 'CC': 'Core Curriculum', 'CG': 'Classical Greek', 'CH': 'Chemistry',
-        'CI': 'Cinema and Media Studies', 'CL': 'Classical Studies', 'CS': 'Computer Science', 'EC': 'Economics', 'EE': 'Earth and Environment',
-        'BE': 'Biomedical Engineering', 'ME': 'Mechanical Engineering', 'EK': 'Engineering Core',
-        'HF': 'Hospitality and Food Management', 'RE': 'Real Estate', 'SE': 'Special Events',
-        'AC': 'Accounting', 'BA': 'Business Administration', 'FE': 'Finance and Economics', 'IS': 'Information Systems', 'MG': 'Management', 'MK': 'Marketing',
-        'EN': 'English', 'HI': 'History', 'MA': 'Mathematics', 'PH': 'Philosophy', 'PO': 'Political Science', 'PS': 'Psychology', 'PY': 'Physics', 'SO': 'Sociology',
-        'ED': 'Education', 'HD': 'Human Development', 'JO': 'Journalism', 'MU': 'Music', 'TH': 'Theatre'
-    }
-    
-    courses = get_all_courses()
+def build_departments(courses: List[Dict], school: Optional[str] = None) -> Dict:
+    """Unique departments from course codes, optionally limited to one school"""
     dept_codes = set()
     for course in courses:
         parts = course.get('code', '').split()
-        if len(parts) >= 2:
+        if len(parts) >= 2 and (school is None or parts[0] == school):
             dept_codes.add(parts[1])
     
-    departments = [{'code': code, 'name': dept_names.get(code, code), 'label': dept_names.get(code, code)} for code in sorted(dept_codes)]
+    departments = [{'code': code, 'name': DEPARTMENT_NAMES.get(code, code), 'label': DEPARTMENT_NAMES.get(code, code)} for code in sorted(dept_codes)]
     return {"departments": departments}
 
+@router.get("/api/departments/")
+async def list_departments(request: Request):
+    """Get all unique departments"""
+    catalog = get_catalog()
+    etag = catalog_etag(request, catalog.version)
+    if is_not_modified(request, etag):
+        return not_modified_response(etag, request)
+    return precompressed_response(catalog.payload_variants("departments", lambda: build_departments(catalog.courses)), request.headers.get("accept-encoding"), cache_headers(etag))
+
 @router.get("/api/departments/{school}")
-async def list_departments_by_school(school: str):
+async def list_departments_by_school(request: Request, school: str):
     """Get departments for a specific school from actual course data"""
-    courses = get_all_courses()
-    dept_codes = set()
-    
-    # Extract unique departments for this school from actual course data
-    for course in courses:
-        code_parts = course.get('code', '').split()
-        if len(code_parts) >= 2:
-            course_school = code_parts[0]
-            course_dept = code_parts[1]
-            if course_school == school:
-                dept_codes.add(course_dept)
-    
-    dept_names = {
-        'AA': 'African American Studies', 'AH': 'Art History', 'AN': 'Anthropology', 'AR': 'Archaeology', 'AS': 'Astronomy',
-        'BB': 'Biochemistry and Molecular Biology', 'BI': 'Biology', 'CC': 'Core Curriculum', 'CG': 'Classical Greek', 'CH': 'Chemistry',
-        'CI': 'Cinema and Media Studies', 'CL': 'Classical Studies', 'CS': 'Computer Science', 'EC': 'Economics', 'EE': 'Earth and Environment',
-        'BE': 'Biomedical Engineering', 'ME': 'Mechanical Engineering', 'EK': 'Engineering Core',
-        'HF': 'Hospitality and Food Management', 'RE': 'Real Estate', 'SE': 'Special Events',
-        'AC': 'Accounting', 'BA': 'Business Administration', 'FE': 'Finance and Economics', 'IS': 'Information Systems', 'MG': 'Management', 'MK': 'Marketing',
-        'EN': 'English', 'HI': 'History', 'MA': 'Mathematics', 'PH': 'Philosophy', 'PO': 'Political Science', 'PS': 'Psychology', 'PY': 'Physics', 'SO': 'Sociology',
-        'ED': 'Education', 'HD': 'Human Development', 'JO': 'Journalism', 'MU': 'Music', 'TH': 'Theatre'
-    }
-    
-    departments = [{'code': code, 'name': dept_names.get(code, code), 'label': dept_names.get(code, code)} for code in sorted(dept_codes)]
-    return {"departments": departments}
+    catalog = get_catalog()
+    etag = catalog_etag(request, catalog.version)
+    if is_not_modified(request, etag):
+        return not_modified_response(etag, request)
+    school_codes = catalog.memo("school_codes", lambda: {s['abbreviation'] for s in build_schools(catalog.courses)['schools']})
+    if school not in school_codes:
+        return FastJSONResponse({"departments": []}, headers=cache_headers(etag))
+    return precompressed_response(catalog.payload_variants(f"departments:{school}", lambda: build_departments(catalog.courses, school)), request.headers.get("accept-encoding"), cache_headers(etag))
 
 @router.get("/api/hub-areas/")
-async def list_hub_areas():
+async def list_hub_areas(request: Request):
     """Get all unique HUB areas across all courses"""
-    courses = get_all_courses()
-    hub_areas = set()
-    
-    for course in courses:
-        for hub_area in course.get('hub_areas', {}).keys():
-            hub_areas.add(hub_area)
-    
-    return {"hub_areas": sorted(list(hub_areas))}
+    catalog = get_catalog()
+    etag = catalog_etag(request, catalog.version)
+    if is_not_modified(request, etag):
+        return not_modified_response(etag, request)
+    
+    def build():
+        hub_areas = set()
+        for course in catalog.courses:
+            for hub_area in course.get('hub_areas', {}).keys():
+                hub_areas.add(hub_area)
+        return {"hub_areas": sorted(list(hub_areas))}
+    
+    return precompressed_response(catalog.payload_variants("hub_areas", build), request.headers.get("accept-encoding"), cache_headers(etag))
+
+@router.get("/api/hub-analytics/")
+async def get_hub_analytics(request: Request):
+    """Catalog-wide HUB co-occurrence, per-school area counts and double-counting course groups
+
+    Precomputed by process_courses.py and served as stored in the catalog metadata.
+    """
+    catalog = get_catalog()
+    analytics = catalog.data.get('metadata', {}).get('hub_analytics')
+    if analytics is None:
+        raise HTTPException(status_code=404, detail="Hub analytics not in this catalog; re-run process_courses.py")
+    etag = catalog_etag(request, catalog.version)
+    if is_not_modified(request, etag):
+        return not_modified_response(etag, request)
+    return precompressed_response(catalog.payload_variants("hub_analytics", lambda: analytics), request.headers.get("accept-encoding"), cache_headers(etag))
+
+@router.get("/api/hub-analytics/{school}")
+async def get_school_hub_analytics(request: Request, school: str):
+    """One school's HUB statistics, including its area co-occurrence matrix"""
+    catalog = get_catalog()
+    sections = {name.upper(): section for name, section in catalog.data.get('schools', {}).items()}
+    section = sections.get(school.upper())
+    if section is None:
+        raise HTTPException(status_code=404, detail=f"School {school} not found")
+    if 'co_occurrence' not in section.get('hub_statistics', {}):
+        raise HTTPException(status_code=404, detail="Hub analytics not in this catalog; re-run process_courses.py")
+    etag = catalog_etag(request, catalog.version)
+    if is_not_modified(request, etag):
+        return not_modified_response(etag, request)
+
+    def build():
+        stats = section['hub_statistics']
+        return {
+            "school": section['school'],
+            "total_courses": section['total_courses'],
+            "hub_areas": list(stats['courses_per_area']),
+            "courses_per_area": list(stats['courses_per_area'].values()),
+            "hubs_per_course": stats['distribution'],
+            "average_hubs_per_course": stats['average_hubs_per_course'],
+            # Rows and columns follow hub_areas
+            "co_occurrence": stats['co_occurrence']
+        }
+
+    return precompressed_response(catalog.payload_variants(f"hub_analytics:{section['school']}", build), request.headers.get("accept-encoding"), cache_headers(etag))
 
 @router.get("/api/subjects/")
-async def list_subjects():
+async def list_subjects(request: Request):
     """Get all unique subjects"""
-    courses = get_all_courses()
-    subjects = set()
-    
-    for course in courses:
-        code = course.get('code', '')
-        if ' ' in code:
-            parts = code.split()
+    catalog = get_catalog()
+    etag = catalog_etag(request, catalog.version)
+    if is_not_modified(request, etag):
+        return not_modified_response(etag, request)
+    
+    def build():
+        subjects = set()
+        for course in catalog.courses:
+            parts = course.get('code', '').split()
             if len(parts) >= 2:
                 subjects.add(parts[1])
-    
-    return {"subjects": sorted(list(subjects))}
+        return {"subjects": sorted(list(subjects))}
+    
+    return precompressed_response(catalog.payload_variants("subjects", build), request.headers.get("accept-encoding"), cache_headers(etag))
+
+def is_string_list(value) -> bool:
+    return isinstance(value, list) and all(isinstance(item, str) for item in value)
+
+@router.post("/api/hub-coverage/solve")
+async def solve_hub_coverage(request: dict):
+    """Pick a small set of courses covering the HUB areas a student still needs
+    
+    Body: {"hub_areas": [...], "school_filters": ["CAS", ...], "completed": ["CAS WR 120", ...],
+           "mode": "auto" | "greedy" | "exact"}
+    """
+    hub_areas = request.get("hub_areas", [])
+    if not hub_areas or not is_string_list(hub_areas):
+        raise HTTPException(status_code=400, detail="hub_areas must be a non-empty list of Hub area names")
+    
+    school_filters = request.get("school_filters")
+    if school_filters is not None and not is_string_list(school_filters):
+        raise HTTPException(status_code=400, detail="school_filters must be a list of school names")
+    
+    completed = request.get("completed", [])
+    if not is_string_list(completed):
+        raise HTTPException(status_code=400, detail="completed must be a list of course codes")
+    
+    mode = request.get("mode", "auto")
+    if mode not in ("auto", "greedy", "exact"):
+        raise HTTPException(status_code=400, detail="mode must be one of: auto, greedy, exact")
+    
+    result = solve_hub_cover(
+        get_catalog(),
+        hub_areas,
+        school_filters=school_filters,
+        completed=completed,
+        mode=mode
+    )
+    return FastJSONResponse(result)
+
+def check_tracked_hub_areas(hub_areas):
+    if hub_areas is not None and not is_string_list(hub_areas):
+        raise HTTPException(status_code=400, detail="hub_areas must be a list of Hub area names")
+
+@router.post("/api/hub-progress")
+async def get_hub_progress(request: dict):
+    """HUB areas covered and still missing for a student's completed and planned courses
+    
+    Body: {"courses": ["CAS WR 120", ...], "hub_areas": [...optional subset to track...]}
+    """
+    courses = request.get("courses")
+    if not is_string_list(courses):
+        raise HTTPException(status_code=400, detail="courses must be a list of course codes")
+    check_tracked_hub_areas(request.get("hub_areas"))
+    
+    result = hub_progress(get_catalog(), [courses], request.get("hub_areas"))[0]
+    return FastJSONResponse(result)
+
+@router.post("/api/hub-progress/batch")
+async def get_hub_progress_batch(request: dict):
+    """HUB progress for many students in one call (advisor dashboards)
+    
+    Body: {"plans": [{"id": "student-1", "courses": [...]}, ...], "hub_areas": [...optional...]}
+    """
+    plans = request.get("plans")
+    if not isinstance(plans, list) or any(not isinstance(p, dict) or not is_string_list(p.get("courses", [])) for p in plans):
+        raise HTTPException(status_code=400, detail="plans must be a list of {id, courses} objects")
+    check_tracked_hub_areas(request.get("hub_areas"))
+    
+    results = hub_progress(get_catalog(), [p.get("courses", []) for p in plans], request.get("hub_areas"))
+    return FastJSONResponse({
+        "results": [{"id": p.get("id", i), **result} for i, (p, result) in enumerate(zip(plans, results))],
+        "total": len(results)
+    })
 
 # AI Advisor endpoint
 @router.post("/api/ai-advisor/")
@@ -348,14 +536,41 @@ async def ai_career_advisor(request: dict):
     if school:
         courses = [c for c in courses if c.get('school', '').lower() == school.lower()]
     
-    recommendations = get_career_recommendations(
-        career_goal=career_goal,
-        available_courses=courses,
-        current_major=major
-    )
+    try:
+        async with get_limiter("advisor").slot():
+            # Blocking Gemini calls run in the threadpool so identical concurrent goals can coalesce
+            recommendations = await run_in_threadpool(
+                get_career_recommendations,
+                career_goal=career_goal,
+                available_courses=courses,
+                current_major=major
+            )
+    except Overloaded as e:
+        record_degraded(e)
+        return get_rule_based_recommendations(career_goal, school)
     
     return recommendations
 
+def get_rule_based_recommendations(career_goal: str, school: str = "") -> Dict:
+    """Career advice without Gemini, from the keyword recommender (used when the AI is saturated)"""
+    from app.smart_recommender import extract_skills_from_career, recommend_courses_fallback
+    
+    courses = recommend_courses_fallback(career_goal, 6, [school.upper()] if school else None)
+    return {
+        "career_analysis": f"Career path in {career_goal} draws on the skills taught in these courses.",
+        "required_skills": extract_skills_from_career(career_goal),
+        "recommended_courses": [{
+            "code": course['code'],
+            "name": course['name'],
+            "relevance": course['relevance'],
+            "skills_taught": course['skills_taught'],
+            "priority": "Medium"
+        } for course in courses],
+        "skill_coverage_percentage": 65,
+        "additional_advice": "The AI advisor is busy right now; these are keyword-matched suggestions. Try again shortly for a personalized analysis.",
+        "note": "Rule-based recommendations (AI advisor at capacity)"
+    }
+
 # Professor endpoints (unchanged)
 @router.get("/api/professors/")
 async def get_professors(department: str = None):
@@ -369,6 +584,21 @@ async def get_professors(department: str = None):
     
     return {"professors": professors, "total": len(professors)}
 
+def parse_ai_json(text: str):
+    """JSON from a model answer: the whole text, else the first {...} block, else None"""
+    try:
+        return json.loads(text)
+    except Exception:
+        try:
+            m = re.search(r"\{.*\}", text, re.DOTALL)
+            if m:
+                parsed = json.loads(m.group())
+                if isinstance(parsed, dict):
+                    return parsed
+        except Exception:
+            pass
+    return None
+
 @router.post("/api/gemini/")
 async def gemini_endpoint(body: dict = Body(...)):
     """Handle requests to the Gemini AI model."""
@@ -378,7 +608,11 @@ async def gemini_endpoint(body: dict = Body(...)):
     
     model = body.get('model')
     print(f"/api/gemini/ called; model={model}")
-    result = await generate_ai_response(prompt, model)
+    try:
+        async with get_limiter("gemini").slot():
+            result = await generate_ai_response(prompt, model)
+    except Overloaded as e:
+        raise service_unavailable(e)
 
     text = None
     if isinstance(result, dict):
@@ -387,23 +621,39 @@ async def gemini_endpoint(body: dict = Body(...)):
         text = result
 
     if text:
-        try:
-            parsed = json.loads(text)
-            if isinstance(parsed, dict):
-                return parsed
+        parsed = parse_ai_json(text)
+        if isinstance(parsed, dict):
+            return parsed
+        if parsed is not None:
             return {"result": parsed, "model": result.get('model') if isinstance(result, dict) else None}
-        except Exception:
-            try:
-                m = re.search(r"\{.*\}", text, re.DOTALL)
-                if m:
-                    parsed = json.loads(m.group())
-                    if isinstance(parsed, dict):
-                        return parsed
-            except Exception:
-                pass
 
     return result
 
+@router.post("/api/gemini/stream")
+async def gemini_stream_endpoint(body: dict = Body(...)):
+    """Gemini answer streamed as server-sent events; "done" carries the full text and any parsed JSON"""
+    from app.config import Config
+    
+    prompt = body.get('prompt')
+    if not prompt:
+        raise HTTPException(status_code=400, detail="Prompt is required")
+    
+    if not Config.GOOGLE_API_KEY:
+        return sse_response(error_stream("GOOGLE_API_KEY not configured"))
+    
+    model = body.get('model')
+    
+    limiter = get_limiter("gemini")
+    try:
+        await limiter.acquire()
+    except Overloaded as e:
+        raise service_unavailable(e)
+    
+    def done(text: str, model_name: str) -> Dict:
+        return {"result": text, "model": model_name, "parsed": parse_ai_json(text)}
+    
+    return sse_response(relay_events(stream_ai_response(prompt, model), done), on_close=limiter.release)
+
 @router.get("/api/professors/{professor_name}")
 async def get_professor_details(professor_name: str):
     """Get detailed professor information including OpenAlex data"""
@@ -421,9 +671,10 @@ async def get_professor_details(professor_name: str):
     
     oaid = professor.get('oaid', '')
     if oaid:
-        author_data = get_author_data(oaid)
-        works = get_author_works(oaid, limit=10)
-        coauthors = get_coauthors(oaid, limit=10)
+        # OpenAlex lookups block; in the threadpool, concurrent requests for one professor share them
+        author_data = await run_in_threadpool(get_author_data, oaid)
+        works = await run_in_threadpool(get_author_works, oaid, limit=10)
+        coauthors = await run_in_threadpool(get_coauthors, oaid, limit=10)
         
         if author_data:
             research_summary = generate_research_summary(author_data, works)
@@ -438,20 +689,16 @@ async def get_professor_details(professor_name: str):
     
     return {"professor": professor}
 
-@router.post("/api/professors/cold-email")
-async def generate_professor_email(request: dict):
-    """Generate personalized cold email to professor"""
+def load_cold_email_context(request: dict) -> Dict:
+    """Professor lookup and OpenAlex research summary for a cold email request"""
     from app.professor_data import get_professor_by_name
     from app.openalex_service import (
         get_author_data,
         get_author_works,
-        generate_research_summary,
-        generate_cold_email
+        generate_research_summary
     )
     
     professor_name = request.get("professor_name", "")
-    student_interests = request.get("student_interests", "")
-    course_context = request.get("course_context", "")
     
     professor = get_professor_by_name(professor_name)
     if not professor:
@@ -467,43 +714,76 @@ async def generate_professor_email(request: dict):
     if not author_data:
         raise HTTPException(status_code=500, detail="Could not fetch research data")
     
-    research_summary = generate_research_summary(author_data, works)
+    return {
+        "professor_name": professor_name,
+        "research_summary": generate_research_summary(author_data, works),
+        "student_interests": request.get("student_interests", ""),
+        "course_context": request.get("course_context", ""),
+        "research_areas": [c.get('display_name') for c in author_data.get('x_concepts', [])[:5]]
+    }
+
+@router.post("/api/professors/cold-email")
+async def generate_professor_email(request: dict):
+    """Generate personalized cold email to professor"""
+    from app.openalex_service import generate_cold_email
+    
+    context = await run_in_threadpool(load_cold_email_context, request)
     
-    email = generate_cold_email(
-        professor_name=professor_name,
-        research_summary=research_summary,
-        student_interests=student_interests,
-        course_context=course_context
-    )
+    try:
+        async with get_limiter("email").slot():
+            email = await run_in_threadpool(
+                generate_cold_email,
+                professor_name=context["professor_name"],
+                research_summary=context["research_summary"],
+                student_interests=context["student_interests"],
+                course_context=context["course_context"]
+            )
+    except Overloaded as e:
+        raise service_unavailable(e)
     
     return {
         "email": email,
-        "professor": professor_name,
-        "research_areas": [c.get('display_name') for c in author_data.get('x_concepts', [])[:5]]
+        "professor": context["professor_name"],
+        "research_areas": context["research_areas"]
     }
 
-@router.post("/api/chatbot/")
-async def chatbot_conversation(request: dict):
-    """AI chatbot for course planning assistance"""
+@router.post("/api/professors/cold-email/stream")
+async def generate_professor_email_stream(request: dict):
+    """Cold email streamed as server-sent events; "done" has the same fields as /cold-email"""
     from app.config import Config
+    from app.openalex_service import COLD_EMAIL_MODELS, build_cold_email_prompt
     
-    user_message = request.get("message", "")
-    chat_history = request.get("history", [])
+    context = await run_in_threadpool(load_cold_email_context, request)
     
-    if not user_message:
-        raise HTTPException(status_code=400, detail="Message is required")
+    if not Config.GOOGLE_API_KEY:
+        return sse_response(error_stream("Google API key not configured. Please add GOOGLE_API_KEY to .env file."))
     
-    courses = get_all_courses()
-    course_count = len(courses)
+    prompt = build_cold_email_prompt(
+        context["professor_name"],
+        context["research_summary"],
+        context["student_interests"],
+        context["course_context"]
+    )
     
-    # Get sample schools for better responses
-    schools = set()
-    for course in courses[:50]:  # Sample first 50 courses
-        if school := course.get('school'):
-            schools.add(school)
-    school_list = ", ".join(sorted(list(schools))[:10])
+    limiter = get_limiter("email")
+    try:
+        await limiter.acquire()
+    except Overloaded as e:
+        raise service_unavailable(e)
+    
+    def done(text: str, model: str) -> Dict:
+        return {
+            "email": text,
+            "professor": context["professor_name"],
+            "research_areas": context["research_areas"],
+            "model": model
+        }
     
-    website_knowledge = f"""
+    return sse_response(relay_events(stream_gemini(prompt, COLD_EMAIL_MODELS), done), on_close=limiter.release)
+
+def build_website_knowledge(course_count: int, school_list: str) -> str:
+    """Site structure and feature guide the chatbot answers from"""
+    return f"""
 WEBSITE STRUCTURE & NAVIGATION:
 The Cognify BU Course Planner has 5 main sections accessible from the top navigation bar:
 
@@ -544,29 +824,30 @@ NAVIGATION TIPS:
 - Home page has quick action buttons for each feature
 - Use the chatbot (me!) anytime for help navigating
 """
+
+
+def get_fallback_response(message: str, course_count: int) -> str:
+    """Rule-based answers for common questions when the AI is unavailable"""
+    msg_lower = message.lower()
     
-    # Provide rule-based responses for common questions when API is not available
-    def get_fallback_response(message: str) -> str:
-        msg_lower = message.lower()
-        
-        # Navigation questions
-        if any(word in msg_lower for word in ['find', 'search', 'look for', 'where']) and 'course' in msg_lower:
-            return "To search for courses, go to the **Explorer** page (click 'Explorer' in the top menu). You can use the search bar to find courses by name or code, and use the filters to narrow by school or level."
-        
-        if 'plan' in msg_lower and any(word in msg_lower for word in ['semester', 'schedule']):
-            return "To plan your semesters, go to the **Planner** page (click 'Planner' in the top menu). Click 'Add Semester' to create a semester, then drag courses from the left sidebar into your semester boards. You can export your plan to PDF when done!"
-        
-        if 'career' in msg_lower or 'recommendation' in msg_lower:
-            return "For career advice and course recommendations, go to the **Progress** page (click 'Progress' in the top menu). You can browse preset career paths or enter your own custom career goal to get AI-powered course recommendations!"
-        
-        if 'professor' in msg_lower or 'faculty' in msg_lower:
-            return "To research professors, go to the **Professors** page (click 'Professors' in the top menu). You can browse by department, view their publications, and even generate professional cold emails to reach out to them."
-        
-        if 'export' in msg_lower or 'pdf' in msg_lower:
-            return "To export your semester plan to PDF, go to the **Planner** page and click the 'Export to PDF' button at the top. Make sure you've added some courses to your semesters first!"
-        
-        if any(word in msg_lower for word in ['navigate', 'use', 'how', 'help', 'guide']):
-            return f"""I can help you navigate the BU Course Planner! Here are the main sections:
+    # Navigation questions
+    if any(word in msg_lower for word in ['find', 'search', 'look for', 'where']) and 'course' in msg_lower:
+        return NAVIGATION_ANSWERS["search"]
+    
+    if 'plan' in msg_lower and any(word in msg_lower for word in ['semester', 'schedule']):
+        return NAVIGATION_ANSWERS["plan"]
+    
+    if 'career' in msg_lower or 'recommendation' in msg_lower:
+        return NAVIGATION_ANSWERS["career"]
+    
+    if 'professor' in msg_lower or 'faculty' in msg_lower:
+        return NAVIGATION_ANSWERS["professor"]
+    
+    if 'export' in msg_lower or 'pdf' in msg_lower:
+        return NAVIGATION_ANSWERS["export"]
+    
+    if any(word in msg_lower for word in ['navigate', 'use', 'how', 'help', 'guide']):
+        return f"""I can help you navigate the BU Course Planner! Here are the main sections:
 
 📚 **Explorer** - Search and browse {course_count} courses
 📅 **Planner** - Drag-and-drop semester planning
@@ -574,9 +855,9 @@ NAVIGATION TIPS:
 👨🏫 **Professors** - Research faculty and publications
 
 What would you like to do? I can give you specific directions!"""
-        
-        # Default response
-        return f"""I'm here to help you navigate the BU Course Planner! The site has 5 main sections:
+    
+    # Default response
+    return f"""I'm here to help you navigate the BU Course Planner! The site has 5 main sections:
 
 • **Home** - Overview and quick links
 • **Explorer** - Search {course_count} BU courses
@@ -585,21 +866,22 @@ What would you like to do? I can give you specific directions!"""
 • **Professors** - Research faculty
 
 What would you like help with? Ask me about finding courses, planning semesters, career recommendations, or researching professors!"""
+
+
+def build_chatbot_prompt(user_message: str, chat_history: List[Dict], courses: List[Dict]) -> str:
+    """Full Gemini prompt for a chatbot turn"""
+    course_count = len(courses)
     
-    # Check if API key is configured
-    if not Config.GOOGLE_API_KEY:
-        # Provide helpful fallback response
-        fallback = get_fallback_response(user_message)
-        return {
-            "response": fallback,
-            "model": "fallback",
-            "message": user_message
-        }
+    # Get sample schools for better responses
+    schools = set()
+    for course in courses[:50]:  # Sample first 50 courses
+        if school := course.get('school'):
+            schools.add(school)
+    school_list = ", ".join(sorted(list(schools))[:10])
     
-    # Use AI if API key is available
-    from app.ai_advisor import generate_ai_response
+    website_knowledge = build_website_knowledge(course_count, school_list)
     
-    context = f"""You are an AI assistant for the BU Course Planner website. You help Boston University students with course planning and navigating the website.
+    return f"""You are an AI assistant for the BU Course Planner website. You help Boston University students with course planning and navigating the website.
 
 {website_knowledge}
 
@@ -617,23 +899,109 @@ INSTRUCTIONS:
 - Use emojis sparingly for visual appeal
 - If asked about courses, mention that there are {course_count} courses available
 - Guide users to the right page for their needs with clear step-by-step directions"""
+
+
+@router.post("/api/chatbot/")
+async def chatbot_conversation(request: dict):
+    """AI chatbot for course planning assistance"""
+    from app.config import Config
+    
+    user_message = request.get("message", "")
+    chat_history = request.get("history", [])
+    
+    if not user_message:
+        raise HTTPException(status_code=400, detail="Message is required")
+    
+    courses = get_all_courses()
+    course_count = len(courses)
+    
+    # Catalog counts, lists and navigation are answered without the model
+    local = answer_locally(user_message, get_catalog())
+    if local:
+        return {
+            "response": local["response"],
+            "model": "local",
+            "intent": local["intent"],
+            "message": user_message
+        }
+    
+    # Check if API key is configured
+    if not Config.GOOGLE_API_KEY:
+        # Provide helpful fallback response
+        fallback = get_fallback_response(user_message, course_count)
+        return {
+            "response": fallback,
+            "model": "fallback",
+            "message": user_message
+        }
+    
+    # Use AI if API key is available
+    context = build_chatbot_prompt(user_message, chat_history, courses)
     
     try:
-        response = await generate_ai_response(context)
+        async with get_limiter("chat").slot():
+            response = await generate_ai_response(context)
         return {
             "response": response.get("result", ""),
             "model": response.get("model", ""),
             "message": user_message
         }
+    except Overloaded as e:
+        # Saturated: answer from the rules right away instead of queueing longer
+        record_degraded(e)
+        return {
+            "response": get_fallback_response(user_message, course_count),
+            "model": "fallback",
+            "message": user_message
+        }
     except Exception as e:
         # If AI fails, use fallback
-        fallback = get_fallback_response(user_message)
+        fallback = get_fallback_response(user_message, course_count)
         return {
             "response": fallback,
             "model": "fallback",
             "message": user_message
         }
 
+@router.post("/api/chatbot/stream")
+async def chatbot_conversation_stream(request: dict):
+    """Chatbot answer streamed as server-sent events ("delta" chunks, then "done")"""
+    from app.config import Config
+    
+    user_message = request.get("message", "")
+    chat_history = request.get("history", [])
+    
+    if not user_message:
+        raise HTTPException(status_code=400, detail="Message is required")
+    
+    courses = get_all_courses()
+    
+    local = answer_locally(user_message, get_catalog())
+    if local:
+        done = {"response": local["response"], "model": "local", "intent": local["intent"], "message": user_message}
+        return sse_response(single_event_stream(local["response"], done))
+    
+    fallback = get_fallback_response(user_message, len(courses))
+    
+    if not Config.GOOGLE_API_KEY:
+        done = {"response": fallback, "model": "fallback", "message": user_message}
+        return sse_response(single_event_stream(fallback, done))
+    
+    context = build_chatbot_prompt(user_message, chat_history, courses)
+    
+    limiter = get_limiter("chat")
+    try:
+        await limiter.acquire()
+    except Overloaded as e:
+        record_degraded(e)
+        degraded = {"response": fallback, "model": "fallback", "message": user_message}
+        return sse_response(single_event_stream(fallback, degraded))
+    
+    def done(text: str, model: str) -> Dict:
+        return {"response": text, "model": model, "message": user_message}
+    
+    return sse_response(relay_events(stream_ai_response(context), done, fallback_text=fallback), on_close=limiter.release)
+
 @router.get("/api/ai-models/")
 async def list_ai_models():
     """List available AI models"""
@@ -642,4 +1010,14 @@ async def list_ai_models():
         models = get_available_models()
         return {"models": models}
     except Exception as e:
-        return {"error": str(e), "models": []}
\ No newline at end of file
+        return {"error": str(e), "models": []}
+
+@router.get("/api/metrics")
+async def get_metrics():
+    """In-process counters (e.g. coalesced upstream calls) for this worker"""
+    return metrics_snapshot()
+
+@router.get("/metrics", include_in_schema=False)
+async def get_prometheus_metrics():
+    """Every metric for this worker in the Prometheus text format"""
+    return PlainTextResponse(render_prometheus(), media_type="text/plain; version=0.0.4")
@@ -0,0 +1,96 @@
+"""
+Single-flight request coalescing
+Concurrent calls with the same key share one execution of the underlying
+function: the first caller (the leader) runs it, later callers wait for and
+receive the same result or exception. Nothing is cached once the call
+finishes. Results are shared by reference, so callers must not mutate them.
+
+SingleFlight is for blocking code running on threads; AsyncSingleFlight is
+for coroutines on the event loop, where waiters hold no thread at all.
+"""
+
+import asyncio
+import threading
+from typing import Any, Callable, Dict, Hashable
+
+from app.metrics import increment
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: BaseException = None
+
+
+class SingleFlight:
+    """Keyed coalescing of blocking calls across threads"""
+
+    def __init__(self, group: str):
+        self.group = group
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+
+    def do(self, key: Hashable, fn: Callable, *args, **kwargs):
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+
+        if not leader:
+            increment("singleflight_coalesced_total", group=self.group)
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        increment("singleflight_calls_total", group=self.group)
+        try:
+            call.result = fn(*args, **kwargs)
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    def in_flight(self) -> int:
+        with self._lock:
+            return len(self._calls)
+
+
+class AsyncSingleFlight:
+    """Keyed coalescing of awaitables within one event loop
+
+    The shared call runs as its own task and every caller, the first one
+    included, waits on it through asyncio.shield: a cancelled caller stops
+    waiting, but the call and the other callers carry on.
+    """
+
+    def __init__(self, group: str):
+        self.group = group
+        self._calls: Dict[Hashable, asyncio.Task] = {}
+
+    async def do(self, key: Hashable, fn: Callable, *args, **kwargs):
+        task = self._calls.get(key)
+        # A finished task may still be registered until its done callback runs
+        if task is None or task.done():
+            increment("singleflight_calls_total", group=self.group)
+            task = self._calls[key] = asyncio.ensure_future(fn(*args, **kwargs))
+            task.add_done_callback(lambda finished: self._finish(key, finished))
+        else:
+            increment("singleflight_coalesced_total", group=self.group)
+        return await asyncio.shield(task)
+
+    def _finish(self, key: Hashable, task: asyncio.Task):
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        # Mark retrieved so an error nobody was still waiting on is not logged as unhandled
+        if not task.cancelled():
+            task.exception()
+
+    def in_flight(self) -> int:
+        return len(self._calls)
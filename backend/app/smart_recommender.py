@@ -4,14 +4,20 @@ Uses TF-IDF and cosine similarity to match career goals with course titles
 Now with school filtering!
 """
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Request, Response
 from pydantic import BaseModel
-from typing import List, Dict, Optional
-import json
-from pathlib import Path
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
+from starlette.concurrency import run_in_threadpool
+from typing import List, Dict, Literal, Optional
 import numpy as np
+from app.ann_index import get_ann_index
+from app.catalog import get_catalog
+from app.config import Config
+from app.course_vectors import get_lsa_index
+from app.duplicates import get_duplicate_index
+from app.http_cache import cache_headers, catalog_etag, is_not_modified, not_modified_response
+from app.responses import FastJSONResponse
+from app.stage_timing import stage, timed_request
+from app.trigram_index import get_trigram_index
 
 router = APIRouter()
 
@@ -19,33 +25,28 @@ router = APIRouter()
 COURSES_DATA = None
 COURSE_LIST = []
 AVAILABLE_SCHOOLS = []
+CATALOG_VERSION = None
 
 def load_courses():
-    """Load all courses from the JSON file"""
-    global COURSES_DATA, COURSE_LIST, AVAILABLE_SCHOOLS
+    """Load all courses from the shared catalog"""
+    global COURSES_DATA, COURSE_LIST, AVAILABLE_SCHOOLS, CATALOG_VERSION
     
     try:
-        # Since routes.py is in app/ directly, go up one level then to processing_csv
-        json_path = Path(__file__).parent / "processing_csv" / "output" / "all_courses_data.json"
+        catalog = get_catalog()
         
-        # If not found, try alternative path
-        if not json_path.exists():
-            json_path = Path(__file__).parent.parent / "processing_csv" / "output" / "all_courses_data.json"
-        
-        print(f"📂 Looking for courses at: {json_path}")
-        
-        if not json_path.exists():
-            print(f"❌ Course file not found at {json_path}")
-            print(f"Current file location: {Path(__file__)}")
+        if catalog.path is None:
+            print("❌ Course file not found - recommendations are unavailable")
             return
         
-        with open(json_path, 'r') as f:
-            COURSES_DATA = json.load(f)
+        COURSES_DATA = catalog.data
+        CATALOG_VERSION = catalog.version
         
         # Get list of all schools
         AVAILABLE_SCHOOLS = sorted(list(COURSES_DATA['schools'].keys()))
         
-        # Flatten all courses into a single list
+        # Flatten all courses into a single list (same row order as catalog.courses)
+        # 'group' is the canonical row of the course's duplicate group
+        canonical = get_duplicate_index(catalog).canonical.tolist()
         COURSE_LIST = []
         for school_name, school_data in COURSES_DATA['schools'].items():
             for course in school_data['courses']:
@@ -53,7 +54,8 @@ def load_courses():
                     'code': course['code'],
                     'name': course['name'],
                     'school': school_name,
-                    'hub_areas': list(course['hub_areas'].keys()) if course['hub_areas'] else []
+                    'hub_areas': list(course['hub_areas'].keys()) if course['hub_areas'] else [],
+                    'group': canonical[len(COURSE_LIST)]
                 })
         
         print(f"✅ Loaded {len(COURSE_LIST)} courses from {len(COURSES_DATA['schools'])} schools")
@@ -65,8 +67,16 @@ def load_courses():
         traceback.print_exc()
         COURSE_LIST = []
 
-# Load courses when module is imported
-load_courses()
+
+def sync_catalog():
+    """Return the current catalog, refreshing COURSE_LIST if the catalog was rebuilt"""
+    catalog = get_catalog()
+    if catalog.version != CATALOG_VERSION:
+        load_courses()
+    return catalog
+
+# Minimum cosine similarity for a course to count as a match, per mode
+MIN_MATCH_SCORE = {"tfidf": 0.05, "lsa": 0.3}
 
 
 class CareerRecommendationRequest(BaseModel):
@@ -74,6 +84,7 @@ class CareerRecommendationRequest(BaseModel):
     major: str = "Any"
     num_recommendations: int = 9
     school_filters: Optional[List[str]] = None  # NEW: Optional list of schools to filter by
+    mode: Literal["tfidf", "lsa"] = "tfidf"  # "lsa" matches on latent topics, not just shared words
 
 
 class CourseRecommendation(BaseModel):
@@ -231,18 +242,26 @@ def generate_career_keywords(career_goal: str) -> List[str]:
     return keywords
 
 
-def recommend_courses_smart(career_goal: str, num_courses: int = 9, school_filters: Optional[List[str]] = None) -> List[Dict]:
+def recommend_courses_smart(career_goal: str, num_courses: int = 9, school_filters: Optional[List[str]] = None,
+                            mode: str = "tfidf") -> List[Dict]:
     """
     Smart course recommendation using TF-IDF and cosine similarity
     NEW: Now with optional school filtering!
+    mode="lsa" scores against precomputed latent semantic vectors instead
+    (through the approximate IVF index once the catalog reaches ANN_MIN_COURSES)
     """
+    with stage("catalog"):
+        catalog = sync_catalog()
     if not COURSE_LIST:
         raise HTTPException(status_code=500, detail="Course data not loaded. Please check server logs.")
     
     # Filter courses by school if specified
+    filtered_rows = None
     filtered_courses = COURSE_LIST
     if school_filters and len(school_filters) > 0:
-        filtered_courses = [c for c in COURSE_LIST if c['school'] in school_filters]
+        with stage("filter"):
+            filtered_rows = np.array([i for i, c in enumerate(COURSE_LIST) if c['school'] in school_filters], dtype=np.intp)
+            filtered_courses = [COURSE_LIST[i] for i in filtered_rows]
         print(f"🔍 Filtering to {len(filtered_courses)} courses from schools: {', '.join(school_filters)}")
         
         if len(filtered_courses) == 0:
@@ -252,11 +271,67 @@ def recommend_courses_smart(career_goal: str, num_courses: int = 9, school_filte
             )
     
     # Generate keywords for the career goal
-    career_keywords = generate_career_keywords(career_goal)
-    career_text = ' '.join(career_keywords)
+    with stage("keywords"):
+        career_keywords = generate_career_keywords(career_goal)
+        career_text = ' '.join(career_keywords)
+    
+    top_indices = None
+    if mode == "lsa" and len(COURSE_LIST) >= Config.ANN_MIN_COURSES:
+        with stage("ann_search"):
+            top_indices, similarities = ann_candidates(catalog, career_text, num_courses * 2, filtered_rows)
+        if top_indices is not None:
+            filtered_courses = COURSE_LIST
+    
+    if top_indices is None:
+        if mode == "lsa":
+            # One matrix-vector product against vectors fitted once per catalog version
+            with stage("lsa_score"):
+                similarities = get_lsa_index(catalog).scores(career_text, filtered_rows)
+        else:
+            similarities = tfidf_similarities(career_text, filtered_courses)
+            if similarities is None:
+                with stage("fallback"):
+                    return recommend_courses_fallback(career_goal, num_courses, school_filters)
+        
+        # Get top N courses
+        with stage("top_k"):
+            top_indices = np.argsort(similarities)[::-1][:num_courses * 2]
+    
+    # Filter out very low similarity scores
+    top_indices = [idx for idx in top_indices if similarities[idx] > MIN_MATCH_SCORE[mode]]
+    
+    if len(top_indices) < num_courses:
+        with stage("fallback"):
+            return recommend_courses_fallback(career_goal, num_courses, school_filters)
+    
+    with stage("rank"):
+        return rank_recommendations(career_goal, filtered_courses, top_indices, similarities, num_courses, school_filters)
+
+
+def ann_candidates(catalog, career_text: str, k: int, filtered_rows: Optional[np.ndarray] = None):
+    """Approximate top-k catalog rows and {row: score} from the IVF index
+
+    Returns (None, None) when the probed lists hold fewer than k allowed
+    courses (e.g. a narrow school filter), so the caller scores exactly.
+    """
+    allowed = None
+    if filtered_rows is not None:
+        allowed = np.zeros(len(COURSE_LIST), dtype=bool)
+        allowed[filtered_rows] = True
+    query = get_lsa_index(catalog).embed(career_text)
+    rows, scores = get_ann_index(catalog).search(query, k, allowed=allowed)
+    if len(rows) < k:
+        return None, None
+    return rows.tolist(), dict(zip(rows.tolist(), scores.tolist()))
+
+
+def tfidf_similarities(career_text: str, courses: List[Dict]) -> Optional[np.ndarray]:
+    """Fit TF-IDF on the goal plus course texts and score every course against the goal"""
+    from sklearn.feature_extraction.text import TfidfVectorizer
+    from sklearn.metrics.pairwise import cosine_similarity
     
     # Prepare course texts (combine code and name for better matching)
-    course_texts = [f"{course['code']} {course['name']}" for course in filtered_courses]
+    course_texts = [f"{course['code']} {course['name']}" for course in courses]
     
     # Add career text at the beginning
     all_texts = [career_text] + course_texts
@@ -270,49 +345,52 @@ def recommend_courses_smart(career_goal: str, num_courses: int = 9, school_filte
     )
     
     try:
-        tfidf_matrix = vectorizer.fit_transform(all_texts)
+        with stage("tfidf_fit"):
+            tfidf_matrix = vectorizer.fit_transform(all_texts)
     except Exception as e:
         print(f"TF-IDF error: {e}")
-        return recommend_courses_fallback(career_goal, num_courses, school_filters)
+        return None
     
     # Calculate similarity between career goal and all courses
     career_vector = tfidf_matrix[0:1]
     course_vectors = tfidf_matrix[1:]
     
-    similarities = cosine_similarity(career_vector, course_vectors)[0]
-    
-    # Get top N courses
-    top_indices = np.argsort(similarities)[::-1][:num_courses * 2]
-    
-    # Filter out very low similarity scores
-    top_indices = [idx for idx in top_indices if similarities[idx] > 0.05]
-    
-    if len(top_indices) < num_courses:
-        return recommend_courses_fallback(career_goal, num_courses, school_filters)
-    
+    with stage("cosine"):
+        return cosine_similarity(career_vector, course_vectors)[0]
+
+
+def rank_recommendations(career_goal: str, courses: List[Dict], top_indices, similarities,
+                         num_courses: int, school_filters: Optional[List[str]] = None) -> List[Dict]:
+    """Turn the best-scoring courses into recommendations, limiting picks per school
+
+    Only the best-scoring listing of a cross-listed or duplicate course is kept.
+    """
     # Ensure diversity - don't recommend too many courses from same school (unless filtering by single school)
     recommended = []
     school_counts = {}
+    seen_groups = set()
     max_per_school = 3 if not school_filters or len(school_filters) > 1 else num_courses
     
     for idx in top_indices:
         if len(recommended) >= num_courses:
             break
         
-        course = filtered_courses[idx]
+        course = courses[idx]
         school = course['school']
         
         # Limit courses per school
-        if school_counts.get(school, 0) >= max_per_school:
+        if school_counts.get(school, 0) >= max_per_school or course['group'] in seen_groups:
             continue
         
         match_score = float(similarities[idx])
         
         # Generate relevance explanation
-        relevance = generate_relevance_explanation(career_goal, course, match_score)
+        with stage("explanation"):
+            relevance = generate_relevance_explanation(career_goal, course, match_score)
         
         # Generate skills taught
-        skills = extract_skills_from_course(course['name'], career_goal)
+        with stage("skills"):
+            skills = extract_skills_from_course(course['name'], career_goal)
         
         recommended.append({
             'code': course['code'],
@@ -324,57 +402,49 @@ def recommend_courses_smart(career_goal: str, num_courses: int = 9, school_filte
         })
         
         school_counts[school] = school_counts.get(school, 0) + 1
+        seen_groups.add(course['group'])
     
     return recommended
 
 
 def recommend_courses_fallback(career_goal: str, num_courses: int = 9, school_filters: Optional[List[str]] = None) -> List[Dict]:
     """
-    Fallback recommendation using simple keyword matching
-    More aggressive to handle typos and find ANY relevant courses
+    Fallback recommendation using typo-tolerant keyword matching
+    Keywords are matched through the trigram index, so misspelled goals
+    ("pyschology", "machin learning") still find relevant courses
     """
+    index = get_trigram_index(sync_catalog())
+    
     # Filter courses by school if specified
-    filtered_courses = COURSE_LIST
+    allowed = None
     if school_filters and len(school_filters) > 0:
-        filtered_courses = [c for c in COURSE_LIST if c['school'] in school_filters]
+        allowed = np.array([c['school'] in school_filters for c in COURSE_LIST], dtype=bool)
     
-    career_lower = career_goal.lower()
     keywords = generate_career_keywords(career_goal)
     
     # Add individual words from career goal as keywords
     career_words = career_goal.lower().split()
     keywords.extend([w for w in career_words if len(w) > 3])
     
-    # Score each course
-    scored_courses = []
-    
-    for course in filtered_courses:
-        score = 0
-        course_text = f"{course['code']} {course['name']}".lower()
-        
-        # Check keyword matches
-        for keyword in keywords:
-            if keyword.lower() in course_text:
-                score += 1
-        
-        # Give ANY match a minimum score so we return something
-        if score > 0:
-            scored_courses.append((score, course))
+    # Score each course: one point per matching keyword, scaled by how closely it matched,
+    # over the number of keywords, so scores lie in [0, 1] like the ranked path's similarities
+    phrases = list(dict.fromkeys(keyword.lower() for keyword in keywords))
+    scores = index.scores(phrases) / max(len(phrases), 1)
+    if allowed is not None:
+        scores[~allowed] = 0
+    rows = np.nonzero(scores)[0]
+    scored_courses = [(float(scores[row]), COURSE_LIST[row]) for row in rows[np.argsort(-scores[rows], kind='stable')]]
     
     # If still nothing found, just return some intro courses
     if len(scored_courses) == 0:
         print(f"⚠️  No keyword matches for '{career_goal}', returning intro courses")
-        for course in filtered_courses[:num_courses * 2]:
-            # Look for intro/101 courses
-            if 'introduction' in course['name'].lower() or '101' in course['code']:
-                scored_courses.append((0.1, course))
-    
-    # Sort by score
-    scored_courses.sort(reverse=True, key=lambda x: x[0])
+        intro_rows = index.intro_rows if allowed is None else index.intro_rows[allowed[index.intro_rows]]
+        scored_courses = [(0.0, COURSE_LIST[row]) for row in intro_rows[:num_courses * 2]]
     
     # Get top courses
     recommended = []
     school_counts = {}
+    seen_groups = set()
     max_per_school = 3 if not school_filters or len(school_filters) > 1 else num_courses
     
     for score, course in scored_courses:
@@ -382,22 +452,25 @@ def recommend_courses_fallback(career_goal: str, num_courses: int = 9, school_fi
             break
         
         school = course['school']
-        if school_counts.get(school, 0) >= max_per_school:
+        if school_counts.get(school, 0) >= max_per_school or course['group'] in seen_groups:
             continue
         
-        relevance = generate_relevance_explanation(career_goal, course, score / 10)
-        skills = extract_skills_from_course(course['name'], career_goal)
+        with stage("explanation"):
+            relevance = generate_relevance_explanation(career_goal, course, score)
+        with stage("skills"):
+            skills = extract_skills_from_course(course['name'], career_goal)
         
         recommended.append({
             'code': course['code'],
             'relevance': relevance,
             'skills_taught': skills,
-            'match_score': max(score / 10, 0.1),
+            'match_score': score,
             'name': course['name'],
             'school': school
         })
         
         school_counts[school] = school_counts.get(school, 0) + 1
+        seen_groups.add(course['group'])
     
     return recommended
 
@@ -676,12 +749,23 @@ def generate_additional_advice(career_goal: str) -> str:
 
 
 @router.post("/smart-recommend", response_model=RecommendationResponse)
-async def smart_recommend_courses(request: CareerRecommendationRequest):
+async def smart_recommend_courses(request: CareerRecommendationRequest, response: Response):
     """
     Smart course recommendation endpoint
     NOW WITH SCHOOL FILTERING!
+    With STAGE_TIMING on, per-stage durations come back in the Server-Timing header
     """
+    with timed_request("smart_recommend") as timer:
+        # Off the event loop: the first call per catalog version fits the LSA and ANN indexes
+        result = await run_in_threadpool(_smart_recommend, request)
+    if timer is not None:
+        response.headers["Server-Timing"] = timer.server_timing()
+    return result
+
+
+def _smart_recommend(request: CareerRecommendationRequest) -> RecommendationResponse:
     try:
+        sync_catalog()
         # Validate school filters if provided
         if request.school_filters:
             invalid_schools = [s for s in request.school_filters if s not in AVAILABLE_SCHOOLS]
@@ -695,7 +779,8 @@ async def smart_recommend_courses(request: CareerRecommendationRequest):
         recommended_courses = recommend_courses_smart(
             request.career_goal,
             request.num_recommendations,
-            request.school_filters  # Pass school filters
+            request.school_filters,  # Pass school filters
+            request.mode
         )
         
         if not recommended_courses:
@@ -706,16 +791,19 @@ async def smart_recommend_courses(request: CareerRecommendationRequest):
             )
         
         # Extract required skills
-        required_skills = extract_skills_from_career(request.career_goal)
+        with stage("career_skills"):
+            required_skills = extract_skills_from_career(request.career_goal)
         
         # Calculate skill coverage
         skill_coverage = min(85, 60 + len(recommended_courses) * 3)
         
         # Generate universal career analysis based on field
-        career_analysis = generate_career_analysis(request.career_goal, request.school_filters)
+        with stage("analysis"):
+            career_analysis = generate_career_analysis(request.career_goal, request.school_filters)
         
         # Generate additional advice
-        additional_advice = generate_additional_advice(request.career_goal)
+        with stage("advice"):
+            additional_advice = generate_additional_advice(request.career_goal)
         
         return RecommendationResponse(
             career_analysis=career_analysis,
@@ -736,37 +824,48 @@ async def smart_recommend_courses(request: CareerRecommendationRequest):
 
 
 @router.get("/schools")
-async def get_available_schools():
+async def get_available_schools(request: Request):
     """Get list of all available schools"""
+    sync_catalog()
     if not AVAILABLE_SCHOOLS:
         return {"error": "Course data not loaded", "schools": []}
     
-    # Get course count per school
-    school_counts = {}
+    etag = catalog_etag(request, CATALOG_VERSION)
+    if is_not_modified(request, etag):
+        return not_modified_response(etag)
+    
+    # Get course count per school, counting a cross-listed course once
+    school_groups = {}
     for course in COURSE_LIST:
-        school = course['school']
-        school_counts[school] = school_counts.get(school, 0) + 1
+        school_groups.setdefault(course['school'], set()).add(course['group'])
     
     schools_with_counts = [
-        {"code": school, "name": school, "course_count": school_counts.get(school, 0)}
+        {"code": school, "name": school, "course_count": len(school_groups.get(school, ()))}
         for school in AVAILABLE_SCHOOLS
     ]
     
-    return {
+    return FastJSONResponse({
         "schools": schools_with_counts,
         "total_schools": len(AVAILABLE_SCHOOLS)
-    }
+    }, headers=cache_headers(etag))
 
 
 @router.get("/stats")
-async def get_course_stats():
+async def get_course_stats(request: Request):
     """Get statistics about loaded courses"""
+    sync_catalog()
     if not COURSES_DATA:
         return {"error": "Course data not loaded", "courses_loaded": 0}
     
-    return {
+    etag = catalog_etag(request, CATALOG_VERSION)
+    if is_not_modified(request, etag):
+        return not_modified_response(etag)
+    
+    return FastJSONResponse({
         "total_schools": COURSES_DATA['metadata']['total_schools'],
         "total_courses": COURSES_DATA['metadata']['total_courses'],
         "courses_loaded": len(COURSE_LIST),
+        # Cross-listed and duplicate listings counted once
+        "unique_courses": len({course['group'] for course in COURSE_LIST}),
         "available_schools": AVAILABLE_SCHOOLS
-    }
\ No newline at end of file
+    }, headers=cache_headers(etag))
@@ -0,0 +1,66 @@
+"""
+Stage timers for the recommendation pipeline
+When Config.STAGE_TIMING is on, a request opens a StageTimer and each
+`with stage("name"):` block adds its wall time to that request's totals
+(repeated stages, like per-course explanations, accumulate). The totals go
+out in a Server-Timing header and into the recommendation_stage_duration_seconds
+histogram. With timing off, or outside a timed request, stage() is a no-op.
+"""
+
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Optional
+
+from app.config import Config
+from app.metrics import observe
+
+_current: ContextVar[Optional["StageTimer"]] = ContextVar("stage_timer", default=None)
+
+
+class StageTimer:
+    def __init__(self, name: str):
+        self.name = name
+        self.started = time.perf_counter()
+        self.stages: Dict[str, float] = {}
+
+    def add(self, stage_name: str, seconds: float):
+        self.stages[stage_name] = self.stages.get(stage_name, 0.0) + seconds
+
+    def finish(self):
+        """Record the request total and every stage in the histograms"""
+        self.stages["total"] = time.perf_counter() - self.started
+        for stage_name, seconds in self.stages.items():
+            observe("recommendation_stage_duration_seconds", seconds, pipeline=self.name, stage=stage_name)
+
+    def server_timing(self) -> str:
+        # Nested stages (e.g. explanation inside rank) overlap; durations are in ms
+        return ", ".join(f"{stage_name};dur={seconds * 1000:.2f}" for stage_name, seconds in self.stages.items())
+
+
+@contextmanager
+def timed_request(name: str):
+    """Time the stages run inside this block; yields the timer, or None when timing is off"""
+    if not Config.STAGE_TIMING:
+        yield None
+        return
+    timer = StageTimer(name)
+    token = _current.set(timer)
+    try:
+        yield timer
+    finally:
+        _current.reset(token)
+        timer.finish()
+
+
+@contextmanager
+def stage(name: str):
+    timer = _current.get()
+    if timer is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        timer.add(name, time.perf_counter() - started)
@@ -0,0 +1,162 @@
+"""
+Server-sent event streaming for Gemini responses
+Runs the SDK's streaming generate_content in the threadpool and forwards each
+text chunk to the client as a "delta" event as soon as the model produces it,
+then sends one "done" event with the assembled text (plus endpoint-specific
+fields) so the client can cache the full answer.
+"""
+
+import json
+from typing import AsyncIterator, Callable, Dict, List, Optional, Tuple
+
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import iterate_in_threadpool, run_in_threadpool
+from starlette.datastructures import MutableHeaders
+
+from app.config import get_genai
+from app.metrics import record_gemini_call
+from app.responses import variant_etag
+
+STREAM_PATH_SUFFIX = "/stream"
+SSE_HEADERS = {
+    "Cache-Control": "no-cache",
+    # Stop nginx-style proxies from buffering the stream
+    "X-Accel-Buffering": "no",
+}
+
+
+def sse_event(event: str, data: Dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+def _chunk_text(chunk) -> str:
+    # .text raises ValueError on chunks without text parts (e.g. safety stops)
+    try:
+        return chunk.text or ""
+    except ValueError:
+        return ""
+
+
+async def stream_gemini(prompt: str, model_names: List[str],
+                        generation_config: Optional[Dict] = None) -> AsyncIterator[Tuple[str, str]]:
+    """Yield (model name, text chunk) pairs from the first model that produces output
+
+    A model that fails before its first chunk is skipped for the next one; a
+    failure mid-stream is raised, since part of the answer is already sent.
+    """
+    genai = get_genai()
+    last_error = None
+    for model_name in model_names:
+        produced = False
+        chunk = None
+        try:
+            model = genai.GenerativeModel(model_name)
+            response = await run_in_threadpool(
+                model.generate_content, prompt, generation_config=generation_config, stream=True
+            )
+            async for chunk in iterate_in_threadpool(iter(response)):
+                text = _chunk_text(chunk)
+                if text:
+                    produced = True
+                    yield model_name, text
+            # The last chunk carries the usage totals for the whole stream
+            record_gemini_call(model_name, produced, chunk)
+            if produced:
+                return
+        except Exception as e:
+            record_gemini_call(model_name, False)
+            if produced:
+                raise
+            last_error = e
+            print(f"❌ Streaming model {model_name} failed: {e}")
+    raise RuntimeError(f"No working model found. Last error: {last_error}")
+
+
+async def relay_events(chunks: AsyncIterator[Tuple[str, str]], done: Callable[[str, str], Dict],
+                       fallback_text: Optional[str] = None) -> AsyncIterator[str]:
+    """Turn (model, text) chunks into SSE delta events followed by a done event
+
+    If the model fails before sending anything and fallback_text is given, it
+    is sent instead (as model "fallback"); otherwise an "error" event ends the stream.
+    """
+    parts = []
+    model_name = ""
+    try:
+        async for model_name, text in chunks:
+            parts.append(text)
+            yield sse_event("delta", {"text": text})
+    except Exception as e:
+        print(f"❌ Stream error: {e}")
+        if parts or fallback_text is None:
+            yield sse_event("error", {"error": f"AI service error: {str(e)}"})
+            return
+        parts, model_name = [fallback_text], "fallback"
+        yield sse_event("delta", {"text": fallback_text})
+    yield sse_event("done", done("".join(parts), model_name))
+
+
+async def single_event_stream(text: str, done: Dict) -> AsyncIterator[str]:
+    """A complete answer (no model call) delivered in the same event format"""
+    yield sse_event("delta", {"text": text})
+    yield sse_event("done", done)
+
+
+async def error_stream(message: str) -> AsyncIterator[str]:
+    yield sse_event("error", {"error": message})
+
+
+class SSEResponse(StreamingResponse):
+    """Event stream that calls on_close once the exchange is over, however it ended
+
+    A body generator's finally only runs once iteration has begun, so cleanup
+    placed there is skipped when the client disconnects, or a send fails,
+    before the first event.
+    """
+
+    def __init__(self, events: AsyncIterator[str], on_close: Optional[Callable[[], None]] = None):
+        super().__init__(events, media_type="text/event-stream", headers=SSE_HEADERS)
+        self.on_close = on_close
+
+    async def __call__(self, scope, receive, send):
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            if self.on_close is not None:
+                self.on_close()
+
+
+def sse_response(events: AsyncIterator[str], on_close: Optional[Callable[[], None]] = None) -> StreamingResponse:
+    """SSE response; on_close (e.g. releasing an admission slot) runs when it is done"""
+    return SSEResponse(events, on_close)
+
+
+class StreamAwareGZipMiddleware(GZipMiddleware):
+    """GZip that leaves SSE endpoints alone: the compressor would hold tokens back until its buffer fills
+
+    A body it compresses gets the same encoding-suffixed ETag precompressed_response
+    gives its variants, and every response says Vary: Accept-Encoding, since
+    whether it was compressed depends on that header.
+    """
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and scope["path"].rstrip("/").endswith(STREAM_PATH_SUFFIX):
+            await self.app(scope, receive, send)
+            return
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_validators(message):
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(raw=message["headers"])
+                encoding = headers.get("content-encoding")
+                etag = headers.get("etag")
+                # Precompressed variants already carry their suffix
+                if encoding and etag and not etag.endswith(f'-{encoding}"'):
+                    headers["ETag"] = variant_etag(etag, encoding)
+                if "accept-encoding" not in headers.get("vary", "").lower():
+                    headers.add_vary_header("Accept-Encoding")
+            await send(message)
+
+        await super().__call__(scope, receive, send_with_validators)
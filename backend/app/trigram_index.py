@@ -0,0 +1,106 @@
+"""
+Typo-tolerant course text index
+Course code + name are split into words; each distinct word gets a posting
+array of catalog rows, and each character trigram of a padded word points at
+the vocabulary words containing it. A query word is matched to vocabulary
+words by shared-trigram (Dice) similarity, so "pyschology" still finds
+"psychology", and a phrase matches the rows where all of its words match.
+Built once per catalog version.
+"""
+
+import re
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+# Dice coefficient over padded trigrams a vocabulary word needs to count as a match
+MIN_WORD_SIMILARITY = 0.5
+STOP_WORDS = {"a", "an", "and", "for", "in", "of", "on", "the", "to", "with"}
+WORD_PATTERN = re.compile(r"[a-z0-9]+")
+
+
+def words(text: str) -> List[str]:
+    return [w for w in WORD_PATTERN.findall(text.lower()) if w not in STOP_WORDS]
+
+
+def trigrams(word: str) -> List[str]:
+    padded = f"${word}$"
+    return list(dict.fromkeys(padded[i:i + 3] for i in range(len(padded) - 2)))
+
+
+class TrigramIndex:
+    """Word postings and trigram -> word lists over course code + name"""
+
+    def __init__(self, courses: List[Dict]):
+        self.size = len(courses)
+        vocabulary: Dict[str, int] = {}
+        postings: List[List[int]] = []
+        for row, course in enumerate(courses):
+            for word in dict.fromkeys(words(f"{course['code']} {course['name']}")):
+                word_id = vocabulary.setdefault(word, len(vocabulary))
+                if word_id == len(postings):
+                    postings.append([])
+                postings[word_id].append(row)
+
+        self.vocabulary = vocabulary
+        self.postings = [np.asarray(rows, dtype=np.int32) for rows in postings]
+        self.trigram_counts = np.zeros(len(vocabulary), dtype=np.int32)
+
+        by_trigram: Dict[str, List[int]] = {}
+        for word, word_id in vocabulary.items():
+            grams = trigrams(word)
+            self.trigram_counts[word_id] = len(grams)
+            for gram in grams:
+                by_trigram.setdefault(gram, []).append(word_id)
+        self.by_trigram = {gram: np.asarray(ids, dtype=np.int32) for gram, ids in by_trigram.items()}
+
+        # Intro-level courses, the answer of last resort when nothing matches
+        self.intro_rows = np.asarray([
+            row for row, course in enumerate(courses)
+            if 'introduction' in course['name'].lower() or '101' in course['code']
+        ], dtype=np.int32)
+
+    def similar_words(self, word: str) -> List[Tuple[int, float]]:
+        """Vocabulary words within MIN_WORD_SIMILARITY of word, as (word id, similarity)"""
+        exact = self.vocabulary.get(word)
+        if exact is not None and len(word) <= 2:
+            return [(exact, 1.0)]
+        grams = trigrams(word)
+        lists = [self.by_trigram[gram] for gram in grams if gram in self.by_trigram]
+        if not lists:
+            return []
+        shared = np.bincount(np.concatenate(lists), minlength=len(self.vocabulary))
+        candidates = np.nonzero(shared)[0]
+        dice = 2.0 * shared[candidates] / (len(grams) + self.trigram_counts[candidates])
+        keep = dice >= MIN_WORD_SIMILARITY
+        return list(zip(candidates[keep].tolist(), dice[keep].tolist()))
+
+    def phrase_scores(self, phrase: str) -> np.ndarray:
+        """Per-row score in [0, 1]: mean best word similarity where every phrase word matches, else 0"""
+        total = np.zeros(self.size, dtype=np.float32)
+        matched = np.ones(self.size, dtype=bool)
+        phrase_words = words(phrase)
+        if not phrase_words:
+            return total
+        for word in phrase_words:
+            best = np.zeros(self.size, dtype=np.float32)
+            for word_id, similarity in self.similar_words(word):
+                rows = self.postings[word_id]
+                best[rows] = np.maximum(best[rows], similarity)
+            matched &= best > 0
+            if not matched.any():
+                return np.zeros(self.size, dtype=np.float32)
+            total += best
+        return np.where(matched, total / len(phrase_words), 0.0).astype(np.float32)
+
+    def scores(self, phrases: List[str]) -> np.ndarray:
+        """Sum of phrase scores per row; each phrase counts at most once per course"""
+        total = np.zeros(self.size, dtype=np.float32)
+        for phrase in dict.fromkeys(p.lower() for p in phrases):
+            total += self.phrase_scores(phrase)
+        return total
+
+
+def get_trigram_index(catalog) -> TrigramIndex:
+    """The trigram text index for a catalog version"""
+    return catalog.memo("trigram_index", lambda: TrigramIndex(catalog.courses))
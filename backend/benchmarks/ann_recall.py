@@ -0,0 +1,119 @@
+"""
+Recall@k and latency of the IVF index against exact LSA search
+
+Queries are the labeled career goals plus a sample of course titles. With
+--scale N the catalog vectors are replicated with small noise up to N rows, to
+see how both searches behave at multi-university catalog sizes.
+
+Run from backend/:
+    python -m benchmarks.ann_recall [--scale 100000] [--nprobe 1 4 8 16] [--json results.json]
+"""
+
+import argparse
+import json
+import time
+
+import numpy as np
+
+from app.ann_index import IVFIndex
+from app.catalog import get_catalog
+from app.course_vectors import course_text, get_lsa_index, normalize_rows
+from app.smart_recommender import generate_career_keywords
+from benchmarks.recommender_modes import LABELED_GOALS
+
+
+def scaled_vectors(vectors: np.ndarray, size: int, seed: int) -> np.ndarray:
+    """Tile the catalog vectors up to `size` rows, jittering the copies"""
+    if size <= len(vectors):
+        return vectors
+    rng = np.random.default_rng(seed)
+    picks = rng.integers(0, len(vectors), size=size - len(vectors))
+    noise = rng.normal(scale=0.05, size=(len(picks), vectors.shape[1])).astype(np.float32)
+    extra = normalize_rows(vectors[picks] + noise).astype(np.float32)
+    return np.vstack([vectors, extra])
+
+
+def exact_top_k(vectors: np.ndarray, query: np.ndarray, k: int) -> np.ndarray:
+    scores = vectors @ query
+    top = np.argpartition(-scores, k - 1)[:k]
+    return top[np.argsort(-scores[top])]
+
+
+def percentile(values, fraction: float) -> float:
+    values = sorted(values)
+    return round(values[min(len(values) - 1, int(len(values) * fraction))], 3)
+
+
+def run(scale: int, nlist: int, nprobes, k: int, sample: int, seed: int):
+    catalog = get_catalog()
+    lsa = get_lsa_index(catalog)
+    vectors = scaled_vectors(lsa.vectors, scale, seed)
+
+    rng = np.random.default_rng(seed)
+    titles = [course_text(catalog.courses[row]) for row in rng.choice(len(catalog.courses), size=sample, replace=False)]
+    texts = [' '.join(generate_career_keywords(goal)) for goal, _ in LABELED_GOALS] + titles
+    queries = [q for q in (lsa.embed(text) for text in texts) if q.any()]
+
+    started = time.perf_counter()
+    index = IVFIndex.build(vectors, nlist=nlist)
+    build_seconds = time.perf_counter() - started
+
+    exact_latencies = []
+    truths = []
+    for query in queries:
+        started = time.perf_counter()
+        truths.append(set(exact_top_k(vectors, query, k).tolist()))
+        exact_latencies.append((time.perf_counter() - started) * 1000)
+
+    results = {
+        "courses": len(vectors),
+        "nlist": index.nlist,
+        "queries": len(queries),
+        "build_seconds": round(build_seconds, 2),
+        "exact": {"p50_ms": percentile(exact_latencies, 0.5), "p95_ms": percentile(exact_latencies, 0.95)},
+        "ivf": {},
+    }
+    for nprobe in nprobes:
+        latencies = []
+        recalls = []
+        for query, truth in zip(queries, truths):
+            started = time.perf_counter()
+            rows, _ = index.search(query, k, nprobe=nprobe)
+            latencies.append((time.perf_counter() - started) * 1000)
+            recalls.append(len(truth & set(rows.tolist())) / len(truth))
+        results["ivf"][nprobe] = {
+            "recall_at_k": round(float(np.mean(recalls)), 3),
+            "p50_ms": percentile(latencies, 0.5),
+            "p95_ms": percentile(latencies, 0.95),
+        }
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scale", type=int, default=0, help="replicate vectors up to this many courses")
+    parser.add_argument("--nlist", type=int, default=None, help="inverted lists (default ~4*sqrt(n))")
+    parser.add_argument("--nprobe", type=int, nargs="+", default=[1, 2, 4, 8, 16, 32])
+    parser.add_argument("-k", type=int, default=18, help="neighbors per query (recommender asks for 2x its count)")
+    parser.add_argument("--sample", type=int, default=200, help="course titles used as extra queries")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="write results to this file")
+    args = parser.parse_args()
+
+    results = run(args.scale, args.nlist, args.nprobe, args.k, args.sample, args.seed)
+
+    print(f"\n{results['courses']} courses, {results['nlist']} lists, {results['queries']} queries, "
+          f"built in {results['build_seconds']}s")
+    print(f"{'search':<12}{'recall@' + str(args.k):>12}{'p50 ms':>10}{'p95 ms':>10}")
+    print(f"{'exact':<12}{1.0:>12}{results['exact']['p50_ms']:>10}{results['exact']['p95_ms']:>10}")
+    for nprobe, stats in results["ivf"].items():
+        print(f"{'nprobe=' + str(nprobe):<12}{stats['recall_at_k']:>12}{stats['p50_ms']:>10}{stats['p95_ms']:>10}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"\n💾 Saved results to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+Hot-path benchmarks across synthetic catalog sizes
+For each scale, generates a catalog with synthetic_catalog (same seed, so runs
+are comparable), processes it, and runs hot_paths in a fresh process with
+CATALOG_PATH pointing at it. Prints p50 per case against catalog size and
+writes every run to one JSON file.
+
+Run from backend/:
+    python -m benchmarks.catalog_scaling [--scales 1 10 100] [--cases search recommend_lsa]
+                                         [--iterations 50] [--json scaling.json]
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+from benchmarks.synthetic_catalog import CatalogModel, generate, process, write_csvs
+
+BACKEND_DIR = Path(__file__).parent.parent
+
+
+def run_scale(model: CatalogModel, scale: float, work_dir: Path, seed: int, cases, iterations: int) -> dict:
+    real_total = sum(len(rows) for _, rows in model.schools.values())
+    total = round(real_total * scale)
+    schools = max(1, round(total / (real_total / len(model.schools))))
+    catalog_dir = work_dir / f"scale_{scale:g}"
+    write_csvs(model, generate(model, total, schools, seed), catalog_dir)
+    json_path = process(catalog_dir)
+
+    results_path = catalog_dir / "hot_paths.json"
+    command = [sys.executable, "-m", "benchmarks.hot_paths", "--iterations", str(iterations), "--json", str(results_path)]
+    if cases:
+        command += ["--cases", *cases]
+    # A fresh interpreter per size: no memoized indexes or RSS carried over
+    subprocess.run(command, cwd=BACKEND_DIR, env={**os.environ, "CATALOG_PATH": str(json_path)},
+                   check=True, stdout=subprocess.DEVNULL)
+    with open(results_path) as f:
+        return json.load(f)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scales", type=float, nargs="+", default=[1, 10, 100], help="multiples of the real catalog size")
+    parser.add_argument("--cases", nargs="+", help="hot_paths cases to run (default: all)")
+    parser.add_argument("--iterations", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--work-dir", help="keep generated catalogs here (default: a temporary directory)")
+    parser.add_argument("--json", help="write results to this file")
+    args = parser.parse_args()
+
+    model = CatalogModel()
+    with tempfile.TemporaryDirectory() as tmp:
+        work_dir = Path(args.work_dir or tmp)
+        runs = {f"{scale:g}": run_scale(model, scale, work_dir, args.seed, args.cases, args.iterations)
+                for scale in args.scales}
+
+    cases = list(next(iter(runs.values()))["cases"])
+    print(f"\n{'case (p50 ms)':<28}" + "".join(f"{run['courses']:>12,}" for run in runs.values()))
+    for case in cases:
+        print(f"{case:<28}" + "".join(f"{run['cases'][case]['p50_ms']:>12}" for run in runs.values()))
+    print(f"{'max RSS MB':<28}" + "".join(f"{run['max_rss_mb']:>12}" for run in runs.values()))
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"seed": args.seed, "runs": runs}, f, indent=2)
+        print(f"\n💾 Saved results to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
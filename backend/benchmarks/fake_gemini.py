@@ -0,0 +1,147 @@
+"""
+Local stand-in for the Gemini REST API
+Answers generateContent and streamGenerateContent (v1beta) with canned text
+and usage metadata, plus the model list. Prompts asking for course JSON (the
+career advisor's) get a JSON answer built from the course codes in the prompt,
+so the whole parse path runs. Latency, errors and 429 bursts come from
+upstream_faults; --chunk-delay spaces out streamed chunks.
+
+Run from backend/:
+    python -m benchmarks.fake_gemini [--port 8092] [--latency lognormal:800,0.4] [--chunk-delay 40]
+                                     [--error-rate 0.01] [--burst-every 60 --burst-length 10]
+
+then start the API with GEMINI_API_ENDPOINT=http://127.0.0.1:8092 (and any GOOGLE_API_KEY).
+"""
+
+import argparse
+import asyncio
+import json
+import re
+from typing import Dict, List
+
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
+
+from app.metrics import increment, render_prometheus
+from benchmarks.upstream_faults import FaultProfile, add_fault_arguments, profile_from_args
+
+MODEL_NAMES = ["gemini-2.0-flash", "gemini-2.5-flash", "gemini-2.5-pro", "gemini-pro-latest"]
+STREAM_CHUNKS = 6
+CATALOG_LINE = re.compile(r"^- ([A-Z]{2,3} [A-Z]{2} \d{3}[A-Z]?): ([^-\n]+)", re.MULTILINE)
+
+
+def _prompt_text(body: Dict) -> str:
+    return "\n".join(part.get("text", "") for content in body.get("contents", []) for part in content.get("parts", []))
+
+
+def answer_for(prompt: str) -> str:
+    """Deterministic model output shaped like what the calling endpoint parses"""
+    if "recommended_courses" in prompt and "JSON" in prompt:
+        courses = CATALOG_LINE.findall(prompt)[:4]
+        return json.dumps({
+            "career_analysis": "Benchmark analysis of the skills this career needs.",
+            "required_skills": ["Programming", "Statistics", "Communication"],
+            "recommended_courses": [
+                {"code": code, "name": name.strip(), "relevance": "Builds core skills for this goal.",
+                 "skills_taught": ["Problem solving"], "priority": "High" if i < 2 else "Medium"}
+                for i, (code, name) in enumerate(courses)
+            ],
+            "skill_coverage_percentage": 70,
+            "additional_advice": "Look for internships and project work.",
+        })
+    subject = " ".join(prompt.split()[:12])
+    return (f"This is a stand-in answer from the fake Gemini server. It responds to: \"{subject}\". "
+            "In a real deployment the model would answer here with course planning advice, "
+            "drawing on the catalog context included in the prompt.")
+
+
+def _candidate(text: str, finish: bool) -> Dict:
+    candidate = {"content": {"parts": [{"text": text}], "role": "model"}, "index": 0}
+    if finish:
+        candidate["finishReason"] = "STOP"
+    return candidate
+
+
+def _usage(prompt: str, text: str) -> Dict:
+    prompt_tokens = max(1, len(prompt) // 4)
+    output_tokens = max(1, len(text) // 4)
+    return {"promptTokenCount": prompt_tokens, "candidatesTokenCount": output_tokens,
+            "totalTokenCount": prompt_tokens + output_tokens}
+
+
+def _split(text: str, parts: int) -> List[str]:
+    size = max(1, -(-len(text) // parts))
+    return [text[i:i + size] for i in range(0, len(text), size)]
+
+
+def create_app(profile: FaultProfile, chunk_delay: float = 0.0) -> FastAPI:
+    app = FastAPI(title="Fake Gemini")
+
+    def model_info(name: str) -> Dict:
+        return {
+            "name": f"models/{name}", "baseModelId": name, "version": "001", "displayName": name,
+            "description": "Fake Gemini model for load tests", "inputTokenLimit": 1048576, "outputTokenLimit": 8192,
+            "supportedGenerationMethods": ["generateContent", "countTokens"],
+            "temperature": 1.0, "topP": 0.95, "topK": 40,
+        }
+
+    @app.get("/v1beta/models")
+    async def list_models():
+        return {"models": [model_info(name) for name in MODEL_NAMES]}
+
+    @app.post("/v1beta/models/{model_action}")
+    async def generate(model_action: str, request: Request):
+        model, _, action = model_action.partition(":")
+        if action not in ("generateContent", "streamGenerateContent"):
+            raise HTTPException(status_code=404, detail=f"Unknown method {action}")
+        failure = await profile.apply("gemini")
+        if failure is not None:
+            return failure
+
+        prompt = _prompt_text(await request.json())
+        text = answer_for(prompt)
+        increment("fake_gemini_tokens_total", _usage(prompt, text)["totalTokenCount"], model=model)
+        if action == "generateContent":
+            return JSONResponse({"candidates": [_candidate(text, True)], "usageMetadata": _usage(prompt, text),
+                                 "modelVersion": model})
+
+        chunks = _split(text, STREAM_CHUNKS)
+
+        async def stream():
+            # The REST transport reads one JSON array, parsing each element as it arrives
+            yield "["
+            for i, chunk in enumerate(chunks):
+                if i:
+                    await asyncio.sleep(chunk_delay)
+                    yield ",\n"
+                last = i == len(chunks) - 1
+                body = {"candidates": [_candidate(chunk, last)], "modelVersion": model}
+                if last:
+                    body["usageMetadata"] = _usage(prompt, text)
+                yield json.dumps(body)
+            yield "]"
+
+        return StreamingResponse(stream(), media_type="application/json")
+
+    @app.get("/metrics")
+    async def metrics():
+        return PlainTextResponse(render_prometheus(), media_type="text/plain; version=0.0.4")
+
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8092)
+    parser.add_argument("--chunk-delay", type=float, default=0.0, help="ms between streamed chunks")
+    add_fault_arguments(parser)
+    args = parser.parse_args()
+
+    import uvicorn
+    uvicorn.run(create_app(profile_from_args(args), args.chunk_delay / 1000), host=args.host, port=args.port,
+                log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+"""
+Local stand-in for the OpenAlex API
+Serves GET /authors/{id} and GET /works?filter=author.id:{id}&per-page=N with
+deterministic synthetic records (seeded by author id), so every professor in
+the spreadsheet resolves. No real OpenAlex data is committed; `record` saves
+real responses to benchmarks/fixtures/openalex/ (authors/{id}.json and
+works/{id}.json), and those are served instead for the authors they cover.
+Latency, errors and 429 bursts come from upstream_faults.
+
+Run from backend/:
+    python -m benchmarks.fake_openalex serve [--port 8091] [--latency lognormal:150,0.6]
+                                             [--error-rate 0.02] [--burst-every 30 --burst-length 5]
+    python -m benchmarks.fake_openalex record [--limit 50]    # needs network access
+
+then start the API with OPENALEX_API=http://127.0.0.1:8091
+"""
+
+import argparse
+import json
+import random
+from pathlib import Path
+from typing import Dict, Optional
+
+from fastapi import FastAPI, HTTPException, Query
+from fastapi.responses import JSONResponse, PlainTextResponse
+
+from app.metrics import render_prometheus
+from benchmarks.upstream_faults import FaultProfile, add_fault_arguments, profile_from_args
+
+FIXTURES_DIR = Path(__file__).parent / "fixtures" / "openalex"
+RECORDED_WORKS = 50
+CONCEPTS = ["Computer science", "Machine learning", "Statistics", "Psychology", "Medicine", "Economics",
+            "Biology", "Chemistry", "Sociology", "Mathematics", "Neuroscience", "Public health"]
+
+
+def _read_fixture(kind: str, author_id: str) -> Optional[Dict]:
+    path = FIXTURES_DIR / kind / f"{author_id}.json"
+    if not path.exists():
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+
+def synthetic_author(author_id: str) -> Dict:
+    rng = random.Random(author_id)
+    return {
+        "id": f"https://openalex.org/{author_id}",
+        "display_name": f"Author {author_id}",
+        "works_count": rng.randint(5, 400),
+        "cited_by_count": rng.randint(10, 40000),
+        "summary_stats": {"h_index": rng.randint(1, 90)},
+        "x_concepts": [{"display_name": name, "score": round(rng.random(), 3)} for name in rng.sample(CONCEPTS, 5)],
+    }
+
+
+def synthetic_works(author_id: str) -> Dict:
+    rng = random.Random(f"works:{author_id}")
+    pool = [f"A9{rng.randint(0, 10 ** 9):010d}" for _ in range(20)]
+    results = []
+    for i in range(RECORDED_WORKS):
+        coauthors = rng.sample(pool, rng.randint(1, 6))
+        results.append({
+            "id": f"https://openalex.org/W{author_id[1:]}{i:03d}",
+            "title": f"Synthetic publication {i} by {author_id}",
+            "publication_year": 2024 - i // 8,
+            "publication_date": f"{2024 - i // 8}-0{1 + i % 9}-15",
+            "cited_by_count": rng.randint(0, 500),
+            "authorships": [{"author": {"id": f"https://openalex.org/{author_id}", "display_name": f"Author {author_id}"}}] + [
+                {"author": {"id": f"https://openalex.org/{c}", "display_name": f"Coauthor {c[-4:]}"},
+                 "institutions": [{"display_name": rng.choice(["Boston University", "MIT", "Harvard University"])}]}
+                for c in coauthors
+            ],
+        })
+    return {"meta": {"count": len(results)}, "results": results}
+
+
+def create_app(profile: FaultProfile) -> FastAPI:
+    app = FastAPI(title="Fake OpenAlex")
+
+    @app.get("/authors/{author_id}")
+    async def get_author(author_id: str):
+        failure = await profile.apply("openalex")
+        if failure is not None:
+            return failure
+        return JSONResponse(_read_fixture("authors", author_id) or synthetic_author(author_id))
+
+    @app.get("/works")
+    async def get_works(filter: str = "", per_page: int = Query(25, alias="per-page")):
+        failure = await profile.apply("openalex")
+        if failure is not None:
+            return failure
+        if not filter.startswith("author.id:"):
+            raise HTTPException(status_code=400, detail="Only filter=author.id:<id> is supported")
+        author_id = filter.split(":", 1)[1].rsplit("/", 1)[-1]
+        works = _read_fixture("works", author_id) or synthetic_works(author_id)
+        return JSONResponse({**works, "results": works["results"][:per_page]})
+
+    @app.get("/metrics")
+    async def metrics():
+        return PlainTextResponse(render_prometheus(), media_type="text/plain; version=0.0.4")
+
+    return app
+
+
+def record(limit: int):
+    """Save real OpenAlex responses for the first `limit` professors as fixtures"""
+    import requests
+
+    from app.openalex_service import _author_id
+    from app.professor_data import load_professors
+
+    (FIXTURES_DIR / "authors").mkdir(parents=True, exist_ok=True)
+    (FIXTURES_DIR / "works").mkdir(parents=True, exist_ok=True)
+    saved = 0
+    for oaid in load_professors()['oaid'].astype(str).head(limit):
+        author_id = _author_id(oaid.strip())
+        try:
+            author = requests.get(f"https://api.openalex.org/authors/{author_id}", timeout=30)
+            works = requests.get("https://api.openalex.org/works", timeout=30, params={
+                'filter': f'author.id:{author_id}', 'sort': 'publication_date:desc', 'per-page': RECORDED_WORKS
+            })
+            author.raise_for_status()
+            works.raise_for_status()
+        except Exception as e:
+            print(f"❌ {author_id}: {e}")
+            continue
+        (FIXTURES_DIR / "authors" / f"{author_id}.json").write_text(json.dumps(author.json()))
+        (FIXTURES_DIR / "works" / f"{author_id}.json").write_text(json.dumps(works.json()))
+        saved += 1
+    print(f"💾 Recorded {saved} authors to {FIXTURES_DIR}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+    serve = commands.add_parser("serve", help="run the fake server")
+    serve.add_argument("--host", default="127.0.0.1")
+    serve.add_argument("--port", type=int, default=8091)
+    add_fault_arguments(serve)
+    recorder = commands.add_parser("record", help="record fixtures from the real API")
+    recorder.add_argument("--limit", type=int, default=50, help="professors to record")
+    args = parser.parse_args()
+
+    if args.command == "record":
+        record(args.limit)
+        return
+
+    import uvicorn
+    uvicorn.run(create_app(profile_from_args(args)), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,318 @@
+"""
+Latency, throughput and memory of the API hot paths
+
+Every case runs in-process: HTTP cases go through the ASGI app with httpx's
+ASGITransport (middleware, routing and serialization included, no sockets),
+and the recommender cases call the functions directly. Gemini and OpenAlex are
+replaced by canned responses, so runs are repeatable offline and measure this
+code rather than the network.
+
+Each case reports p50/p95/p99 latency, throughput (sequential calls, or
+--concurrency in-flight requests for HTTP cases) and peak traced Python memory
+from a separate tracemalloc pass, so tracing does not skew the timings.
+Write results with --json and pass an earlier file to --compare to print deltas.
+Set CATALOG_PATH to run against a synthetic catalog (see synthetic_catalog.py,
+or catalog_scaling.py to sweep sizes).
+
+Run from backend/:
+    python -m benchmarks.hot_paths [--iterations 200] [--cases search course_detail]
+                                   [--concurrency 8] [--json results.json] [--compare old.json]
+"""
+
+import argparse
+import asyncio
+import json
+import platform
+import resource
+import subprocess
+import sys
+import time
+import tracemalloc
+from contextlib import ExitStack
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from typing import Callable, Dict, List, Optional
+from unittest import mock
+
+import httpx
+
+from app.catalog import Catalog, get_catalog
+from app.config import Config
+from app.course_index import get_course_index
+from app.hubs import get_hub_index
+from app.prerequisites import get_prerequisite_graph
+from app.trigram_index import get_trigram_index
+
+SEARCH_QUERIES = ["computer science", "CS 111", "organic chemistry", "machine learning", "writing", "financ", "psych"]
+CAREER_GOALS = ["machine learning engineer", "clinical psychologist", "financial analyst", "journalist", "marine biologist"]
+PROFESSOR_NAMES = ["Pak", "Chitkushev", "Vojtech"]
+DEPARTMENTS = ["Computer Science", "Psychiatry", "Pediatrics"]
+
+STUB_AUTHOR = {
+    "id": "https://openalex.org/A0000000001",
+    "display_name": "Benchmark Author",
+    "works_count": 120,
+    "cited_by_count": 4200,
+    "summary_stats": {"h_index": 31},
+    "x_concepts": [{"display_name": name} for name in ["Computer science", "Machine learning", "Statistics"]],
+}
+STUB_WORKS = {
+    "results": [
+        {
+            "title": f"Benchmark paper {i}",
+            "publication_year": 2020 + i % 5,
+            "cited_by_count": 10 * i,
+            "authorships": [
+                {"author": {"id": f"https://openalex.org/A00000001{j:02d}", "display_name": f"Coauthor {j}"},
+                 "institutions": [{"display_name": "Boston University"}]}
+                for j in range(i % 6 + 1)
+            ],
+        }
+        for i in range(50)
+    ]
+}
+STUB_MODEL_TEXT = '{"summary": "Benchmark answer", "courses": ["CAS CS 111", "CAS CS 112"]}'
+
+
+class StubHTTPResponse:
+    def __init__(self, payload: Dict):
+        self.payload = payload
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return self.payload
+
+
+def stub_openalex_get(url: str, params: Optional[Dict] = None, **kwargs) -> StubHTTPResponse:
+    return StubHTTPResponse(STUB_WORKS if url.endswith("/works") else STUB_AUTHOR)
+
+
+class StubGenerativeModel:
+    """Stands in for genai.GenerativeModel: fixed text, token counts, optional streaming"""
+
+    def __init__(self, model_name: str, *args, **kwargs):
+        self.model_name = model_name
+
+    def generate_content(self, prompt, generation_config=None, stream=False, **kwargs):
+        usage = SimpleNamespace(prompt_token_count=len(str(prompt)) // 4, candidates_token_count=len(STUB_MODEL_TEXT) // 4)
+        if stream:
+            return iter([SimpleNamespace(text=STUB_MODEL_TEXT, usage_metadata=usage)])
+        return SimpleNamespace(text=STUB_MODEL_TEXT, usage_metadata=usage)
+
+
+def stubbed_upstreams() -> ExitStack:
+    """Patch OpenAlex HTTP calls and Gemini models for the life of the returned stack"""
+    import google.generativeai as genai
+
+    from app import openalex_service
+
+    stack = ExitStack()
+    stack.enter_context(mock.patch.object(openalex_service.requests, "get", stub_openalex_get))
+    stack.enter_context(mock.patch.object(genai, "GenerativeModel", StubGenerativeModel))
+    stack.enter_context(mock.patch.object(Config, "GOOGLE_API_KEY", Config.GOOGLE_API_KEY or "benchmark"))
+    return stack
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    values = sorted(values)
+    return round(values[min(len(values) - 1, int(len(values) * fraction))], 3)
+
+
+def summarize(latencies_ms: List[float], wall_seconds: float, peak_bytes: int) -> Dict:
+    return {
+        "iterations": len(latencies_ms),
+        "p50_ms": percentile(latencies_ms, 0.50),
+        "p95_ms": percentile(latencies_ms, 0.95),
+        "p99_ms": percentile(latencies_ms, 0.99),
+        "mean_ms": round(sum(latencies_ms) / len(latencies_ms), 3),
+        "throughput_per_s": round(len(latencies_ms) / wall_seconds, 1) if wall_seconds else None,
+        "peak_traced_kb": round(peak_bytes / 1024, 1),
+    }
+
+
+# --- Cases -----------------------------------------------------------------
+# HTTP cases map an iteration number to (method, url, json body or None);
+# function cases map it to a zero-argument callable.
+
+def http_cases() -> Dict[str, Callable[[int], tuple]]:
+    courses = get_catalog().courses
+    course_ids = [courses[i]['id'] for i in range(0, len(courses), max(1, len(courses) // 50))]
+    course_codes = [courses[i]['code'].split('|')[0] for i in range(7, len(courses), max(1, len(courses) // 50))]
+    return {
+        "search": lambda i: ("GET", f"/api/courses/search/?q={SEARCH_QUERIES[i % len(SEARCH_QUERIES)]}", None),
+        "search_filtered": lambda i: ("GET", f"/api/courses/search/?q={SEARCH_QUERIES[i % len(SEARCH_QUERIES)]}&level=100&school=CAS", None),
+        "course_detail": lambda i: ("GET", f"/api/courses/{course_ids[i % len(course_ids)]}", None),
+        "course_by_code": lambda i: ("GET", f"/api/courses/{course_codes[i % len(course_codes)]}", None),
+        "course_similar": lambda i: ("GET", f"/api/courses/{course_ids[i % len(course_ids)]}/similar", None),
+        "facet_schools": lambda i: ("GET", "/api/schools/", None),
+        "facet_departments": lambda i: ("GET", "/api/departments/", None),
+        "facet_hub_areas": lambda i: ("GET", "/api/hub-areas/", None),
+        "facet_subjects": lambda i: ("GET", "/api/subjects/", None),
+        "smart_recommend_http": lambda i: ("POST", "/api/smart-recommend", {"career_goal": CAREER_GOALS[i % len(CAREER_GOALS)], "mode": "lsa"}),
+        "professors_by_department": lambda i: ("GET", f"/api/professors/?department={DEPARTMENTS[i % len(DEPARTMENTS)]}", None),
+        "professor_detail": lambda i: ("GET", f"/api/professors/{PROFESSOR_NAMES[i % len(PROFESSOR_NAMES)]}", None),
+        "gemini": lambda i: ("POST", "/api/gemini/", {"prompt": f"Benchmark prompt {i}"}),
+    }
+
+
+def function_cases() -> Dict[str, Callable[[int], Callable]]:
+    from app.smart_recommender import recommend_courses_fallback, recommend_courses_smart
+
+    catalog = get_catalog()
+    raw = catalog.path.read_bytes() if catalog.path else b""
+
+    def load_catalog():
+        # A cold reload: parse plus the derived indexes every request path needs
+        fresh = Catalog(catalog.path, raw)
+        get_course_index(fresh)
+        get_hub_index(fresh)
+        get_prerequisite_graph(fresh)
+        get_trigram_index(fresh)
+
+    return {
+        "catalog_parse": lambda i: lambda: Catalog(catalog.path, raw),
+        "catalog_load": lambda i: load_catalog,
+        "recommend_tfidf": lambda i: lambda: recommend_courses_smart(CAREER_GOALS[i % len(CAREER_GOALS)], mode="tfidf"),
+        "recommend_lsa": lambda i: lambda: recommend_courses_smart(CAREER_GOALS[i % len(CAREER_GOALS)], mode="lsa"),
+        "recommend_fallback": lambda i: lambda: recommend_courses_fallback(CAREER_GOALS[i % len(CAREER_GOALS)]),
+    }
+
+
+# Cold-load cases rebuild everything per call; a few iterations are plenty
+ITERATION_CAPS = {"catalog_parse": 10, "catalog_load": 5, "recommend_tfidf": 30}
+
+
+async def run_http_case(client: httpx.AsyncClient, request_for: Callable, iterations: int, concurrency: int) -> Dict:
+    async def call(i: int) -> float:
+        method, url, body = request_for(i)
+        started = time.perf_counter()
+        response = await client.request(method, url, json=body)
+        elapsed = (time.perf_counter() - started) * 1000
+        if response.status_code >= 400:
+            raise RuntimeError(f"{method} {url} returned {response.status_code}: {response.text[:200]}")
+        return elapsed
+
+    for i in range(min(3, iterations)):
+        await call(i)  # warm per-version memos and compressed payloads
+
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def bounded(i: int) -> float:
+        async with semaphore:
+            return await call(i)
+
+    started = time.perf_counter()
+    latencies = await asyncio.gather(*(bounded(i) for i in range(iterations)))
+    wall = time.perf_counter() - started
+
+    tracemalloc.start()
+    for i in range(min(5, iterations)):
+        await call(i)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return summarize(list(latencies), wall, peak)
+
+
+def run_function_case(fn_for: Callable, iterations: int) -> Dict:
+    fn_for(0)()  # warm
+
+    latencies = []
+    started = time.perf_counter()
+    for i in range(iterations):
+        fn = fn_for(i)
+        call_started = time.perf_counter()
+        fn()
+        latencies.append((time.perf_counter() - call_started) * 1000)
+    wall = time.perf_counter() - started
+
+    tracemalloc.start()
+    fn_for(0)()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return summarize(latencies, wall, peak)
+
+
+def git_revision() -> Optional[str]:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], stderr=subprocess.DEVNULL, text=True).strip()
+    except Exception:
+        return None
+
+
+async def run(case_names: Optional[List[str]], iterations: int, concurrency: int) -> Dict:
+    from app.main import app
+
+    catalog = get_catalog()
+    http = http_cases()
+    functions = function_cases()
+    selected = case_names or list(functions) + list(http)
+    unknown = [name for name in selected if name not in http and name not in functions]
+    if unknown:
+        raise SystemExit(f"Unknown cases: {', '.join(unknown)}. Available: {', '.join(list(functions) + list(http))}")
+
+    results = {
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "git_revision": git_revision(),
+        "python": platform.python_version(),
+        "courses": len(catalog.courses),
+        "catalog_version": catalog.version,
+        "iterations": iterations,
+        "concurrency": concurrency,
+        "cases": {},
+    }
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://benchmark") as client:
+        for name in selected:
+            count = min(iterations, ITERATION_CAPS.get(name, iterations))
+            if name in functions:
+                results["cases"][name] = run_function_case(functions[name], count)
+            else:
+                results["cases"][name] = await run_http_case(client, http[name], count, concurrency)
+            print(f"  {name:<28}p50 {results['cases'][name]['p50_ms']:>9} ms", file=sys.stderr)
+    # ru_maxrss is KiB on Linux
+    results["max_rss_mb"] = round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+    return results
+
+
+def print_table(results: Dict, baseline: Optional[Dict] = None):
+    print(f"\n{results['courses']} courses, {results['iterations']} iterations, concurrency {results['concurrency']}, "
+          f"max RSS {results['max_rss_mb']} MB")
+    header = f"{'case':<28}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'ops/s':>10}{'peak KB':>11}"
+    print(header + (f"{'p50 vs base':>13}" if baseline else ""))
+    for name, stats in results["cases"].items():
+        line = (f"{name:<28}{stats['p50_ms']:>10}{stats['p95_ms']:>10}{stats['p99_ms']:>10}"
+                f"{stats['throughput_per_s']:>10}{stats['peak_traced_kb']:>11}")
+        before = (baseline or {}).get("cases", {}).get(name)
+        if before and before["p50_ms"]:
+            line += f"{(stats['p50_ms'] / before['p50_ms'] - 1) * 100:>+12.1f}%"
+        print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cases", nargs="+", help="run only these cases (default: all)")
+    parser.add_argument("--iterations", type=int, default=200, help="calls per case (cold-load cases are capped)")
+    parser.add_argument("--concurrency", type=int, default=1, help="in-flight requests for HTTP cases")
+    parser.add_argument("--json", help="write results to this file")
+    parser.add_argument("--compare", help="earlier results file to compare p50 against")
+    args = parser.parse_args()
+
+    with stubbed_upstreams():
+        results = asyncio.run(run(args.cases, args.iterations, args.concurrency))
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+    print_table(results, baseline)
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"\n💾 Saved results to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+Import-time profile of the API process
+Imports app.main in fresh interpreters with -X importtime and reports the
+total, the slowest imports by cumulative time, and any heavy dependency that
+got pulled in at import (they should load on first use instead). Exits 1 when
+the best-of-N import exceeds --budget-ms or a heavy module is imported, so it
+can guard worker boot time in CI.
+
+Run from backend/:
+    python -m benchmarks.import_profile [--budget-ms 600] [--repeats 3] [--top 15] [--json profile.json]
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict, List
+
+BACKEND_DIR = Path(__file__).parent.parent
+TARGET_MODULE = "app.main"
+# Deferred until first use; importing any of them at boot is a regression
+HEAVY_MODULES = ["sklearn", "scipy", "pandas", "openpyxl", "google.generativeai"]
+
+
+def profile_once(module: str) -> List[Dict]:
+    """One fresh `import module`: [{"module", "self_us", "cumulative_us", "depth"}] in import order"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=BACKEND_DIR, capture_output=True, text=True, check=True
+    )
+    entries = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        entries.append({
+            "module": name.strip(),
+            "self_us": int(self_us),
+            "cumulative_us": int(cumulative_us),
+            "depth": (len(name) - len(name.lstrip())) // 2,
+        })
+    return entries
+
+
+def summarize(entries: List[Dict], module: str, top: int) -> Dict:
+    total = next(e["cumulative_us"] for e in reversed(entries) if e["module"] == module)
+    loaded = {e["module"] for e in entries}
+    heavy = [name for name in HEAVY_MODULES if name in loaded]
+    slowest = sorted(entries, key=lambda e: e["cumulative_us"], reverse=True)
+    return {
+        "total_ms": round(total / 1000, 1),
+        "modules": len(entries),
+        "heavy_modules": heavy,
+        "slowest": [{"module": e["module"], "cumulative_ms": round(e["cumulative_us"] / 1000, 1),
+                     "self_ms": round(e["self_us"] / 1000, 1)} for e in slowest[:top]],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--module", default=TARGET_MODULE)
+    parser.add_argument("--budget-ms", type=float, default=600, help="fail above this import time (best of --repeats)")
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--top", type=int, default=15, help="slowest imports to list")
+    parser.add_argument("--json", help="write the profile to this file")
+    args = parser.parse_args()
+
+    runs = [summarize(profile_once(args.module), args.module, args.top) for _ in range(args.repeats)]
+    best = min(runs, key=lambda r: r["total_ms"])
+    best["runs_ms"] = [r["total_ms"] for r in runs]
+    best["budget_ms"] = args.budget_ms
+
+    print(f"\n{args.module}: {best['total_ms']} ms best of {args.repeats} ({', '.join(map(str, best['runs_ms']))}), "
+          f"{best['modules']} modules, budget {args.budget_ms:g} ms")
+    print(f"{'module':<50}{'cumulative ms':>15}{'self ms':>10}")
+    for entry in best["slowest"]:
+        print(f"{entry['module'][:49]:<50}{entry['cumulative_ms']:>15}{entry['self_ms']:>10}")
+
+    failures = []
+    if best["total_ms"] > args.budget_ms:
+        failures.append(f"import took {best['total_ms']} ms, over the {args.budget_ms:g} ms budget")
+    if best["heavy_modules"]:
+        failures.append(f"heavy modules imported at startup: {', '.join(best['heavy_modules'])}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(best, f, indent=2)
+        print(f"\n💾 Saved profile to {args.json}")
+
+    if failures:
+        for failure in failures:
+            print(f"❌ {failure}")
+        sys.exit(1)
+    print("✅ Within budget")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,214 @@
+"""
+Concurrent load against a running API
+Drives a weighted mix of catalog, recommender, chatbot, Gemini, advisor and
+professor endpoints with closed-loop workers (--concurrency) or open-loop
+arrivals (--rate requests/second), then reports per-scenario status counts,
+latency percentiles and throughput, and the API's own metrics snapshot
+(admission sheds, coalesced calls). For offline runs point the API at the fakes
+(their responses are synthetic, so only latency and status numbers carry over):
+
+    python -m benchmarks.fake_openalex serve --latency lognormal:150,0.6 &
+    python -m benchmarks.fake_gemini --latency lognormal:800,0.4 --burst-every 60 --burst-length 10 &
+    OPENALEX_API=http://127.0.0.1:8091 GEMINI_API_ENDPOINT=http://127.0.0.1:8092 GOOGLE_API_KEY=fake \\
+        uvicorn app.main:app --port 8000 &
+
+Run from backend/:
+    python -m benchmarks.load_generator [--base-url http://127.0.0.1:8000] [--duration 60]
+        [--concurrency 32 | --rate 50] [--mix search=30,chatbot=10] [--json results.json]
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import time
+from collections import Counter, defaultdict
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional, Tuple
+
+import httpx
+
+from benchmarks.hot_paths import CAREER_GOALS, SEARCH_QUERIES, percentile
+
+CHAT_MESSAGES = [
+    "How many CS courses are there?",
+    "What are the prereqs for CAS CS 330?",
+    "How do I export my plan to PDF?",
+    "Which courses should I take to become a data scientist?",
+    "What's a good schedule for a pre-med sophomore?",
+    "Is it better to take linear algebra or discrete math first?",
+]
+STUDENT_INTERESTS = ["machine learning", "public health policy", "neuroscience", "behavioral economics"]
+
+DEFAULT_MIX = {
+    "search": 25, "course_detail": 20, "facets": 10, "smart_recommend": 10, "chatbot": 10,
+    "chatbot_stream": 5, "gemini": 5, "ai_advisor": 5, "professor_detail": 7, "cold_email": 3,
+}
+
+# Each scenario returns (method, path, JSON body or None, streamed?)
+Scenario = Callable[[random.Random, Dict], Tuple[str, str, Optional[Dict], bool]]
+
+SCENARIOS: Dict[str, Scenario] = {
+    "search": lambda rng, ctx: ("GET", f"/api/courses/search/?q={rng.choice(SEARCH_QUERIES)}", None, False),
+    "course_detail": lambda rng, ctx: ("GET", f"/api/courses/{rng.choice(ctx['course_ids'])}", None, False),
+    "facets": lambda rng, ctx: ("GET", rng.choice(["/api/schools/", "/api/departments/", "/api/hub-areas/", "/api/subjects/"]), None, False),
+    "smart_recommend": lambda rng, ctx: ("POST", "/api/smart-recommend", {"career_goal": rng.choice(CAREER_GOALS), "mode": "lsa"}, False),
+    "chatbot": lambda rng, ctx: ("POST", "/api/chatbot/", {"message": rng.choice(CHAT_MESSAGES), "history": []}, False),
+    "chatbot_stream": lambda rng, ctx: ("POST", "/api/chatbot/stream", {"message": rng.choice(CHAT_MESSAGES), "history": []}, True),
+    "gemini": lambda rng, ctx: ("POST", "/api/gemini/", {"prompt": f"Suggest a study plan for {rng.choice(CAREER_GOALS)}"}, False),
+    "ai_advisor": lambda rng, ctx: ("POST", "/api/ai-advisor/", {"career_goal": rng.choice(CAREER_GOALS)}, False),
+    "professor_detail": lambda rng, ctx: ("GET", f"/api/professors/{rng.choice(ctx['professors'])}", None, False),
+    "cold_email": lambda rng, ctx: ("POST", "/api/professors/cold-email", {
+        "professor_name": rng.choice(ctx['professors']), "student_interests": rng.choice(STUDENT_INTERESTS)
+    }, False),
+}
+
+
+def parse_mix(spec: Optional[str]) -> Dict[str, float]:
+    if not spec:
+        return dict(DEFAULT_MIX)
+    mix = {}
+    for item in spec.split(","):
+        name, _, weight = item.partition("=")
+        if name not in SCENARIOS:
+            raise SystemExit(f"Unknown scenario '{name}'. Available: {', '.join(SCENARIOS)}")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+async def load_context(client: httpx.AsyncClient) -> Dict:
+    """Course ids and professor names to draw requests from"""
+    courses = (await client.get("/api/courses/search/", params={"q": "introduction"})).json().get("courses", [])
+    professors = (await client.get("/api/professors/")).json().get("professors", [])
+    names = [p["emp_name"] for p in professors if p.get("emp_name")]
+    return {
+        "course_ids": [c["id"] for c in courses[:200]] or ["CAS CS 111"],
+        "professors": random.Random(0).sample(names, min(50, len(names))) or ["Pak"],
+    }
+
+
+class Recorder:
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.first_byte: Dict[str, List[float]] = defaultdict(list)
+        self.statuses: Dict[str, Counter] = defaultdict(Counter)
+
+    async def send(self, client: httpx.AsyncClient, name: str, request: Tuple):
+        method, path, body, streamed = request
+        started = time.perf_counter()
+        try:
+            async with client.stream(method, path, json=body) as response:
+                first = None
+                async for _ in response.aiter_raw():
+                    if first is None:
+                        first = time.perf_counter() - started
+                status = str(response.status_code)
+        except httpx.TimeoutException:
+            status, first = "timeout", None
+        except httpx.HTTPError as e:
+            status, first = type(e).__name__, None
+        self.latencies[name].append((time.perf_counter() - started) * 1000)
+        if streamed and first is not None:
+            self.first_byte[name].append(first * 1000)
+        self.statuses[name][status] += 1
+
+    def summary(self, wall_seconds: float) -> Dict:
+        scenarios = {}
+        for name, latencies in sorted(self.latencies.items()):
+            stats = {
+                "requests": len(latencies),
+                "statuses": dict(self.statuses[name]),
+                "p50_ms": percentile(latencies, 0.50),
+                "p95_ms": percentile(latencies, 0.95),
+                "p99_ms": percentile(latencies, 0.99),
+                "throughput_per_s": round(len(latencies) / wall_seconds, 2),
+            }
+            if self.first_byte[name]:
+                stats["first_byte_p50_ms"] = percentile(self.first_byte[name], 0.50)
+                stats["first_byte_p95_ms"] = percentile(self.first_byte[name], 0.95)
+            scenarios[name] = stats
+        total = sum(len(v) for v in self.latencies.values())
+        return {"requests": total, "throughput_per_s": round(total / wall_seconds, 2), "scenarios": scenarios}
+
+
+async def run(base_url: str, duration: float, concurrency: int, rate: Optional[float], mix: Dict[str, float],
+              timeout: float, seed: int) -> Dict:
+    rng = random.Random(seed)
+    names = list(mix)
+    weights = [mix[name] for name in names]
+    recorder = Recorder()
+    limits = httpx.Limits(max_connections=max(concurrency, 100), max_keepalive_connections=max(concurrency, 100))
+
+    async with httpx.AsyncClient(base_url=base_url, timeout=timeout, limits=limits) as client:
+        context = await load_context(client)
+
+        def next_request():
+            name = rng.choices(names, weights)[0]
+            return name, SCENARIOS[name](rng, context)
+
+        deadline = time.perf_counter() + duration
+        started = time.perf_counter()
+        if rate:
+            # Open loop: arrivals keep coming whether or not earlier requests finished
+            tasks = []
+            while time.perf_counter() < deadline:
+                tasks.append(asyncio.create_task(recorder.send(client, *next_request())))
+                await asyncio.sleep(rng.expovariate(rate))
+            await asyncio.gather(*tasks)
+        else:
+            async def worker():
+                while time.perf_counter() < deadline:
+                    await recorder.send(client, *next_request())
+            await asyncio.gather(*(worker() for _ in range(concurrency)))
+        wall = time.perf_counter() - started
+
+        try:
+            server_metrics = (await client.get("/api/metrics")).json()
+        except (httpx.HTTPError, ValueError):
+            server_metrics = None
+
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "base_url": base_url,
+        "duration_s": round(wall, 1),
+        "concurrency": None if rate else concurrency,
+        "rate_per_s": rate,
+        "mix": mix,
+        **recorder.summary(wall),
+        "server_metrics": server_metrics,
+    }
+
+
+def print_table(results: Dict):
+    load = f"rate {results['rate_per_s']}/s" if results["rate_per_s"] else f"concurrency {results['concurrency']}"
+    print(f"\n{results['requests']} requests in {results['duration_s']}s ({load}), {results['throughput_per_s']} req/s")
+    print(f"{'scenario':<18}{'reqs':>7}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}  statuses")
+    for name, stats in results["scenarios"].items():
+        statuses = " ".join(f"{code}:{count}" for code, count in sorted(stats["statuses"].items()))
+        print(f"{name:<18}{stats['requests']:>7}{stats['p50_ms']:>10}{stats['p95_ms']:>10}{stats['p99_ms']:>10}  {statuses}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--duration", type=float, default=60, help="seconds of load")
+    parser.add_argument("--concurrency", type=int, default=32, help="closed-loop workers")
+    parser.add_argument("--rate", type=float, default=None, help="open-loop arrivals per second (overrides --concurrency)")
+    parser.add_argument("--mix", help=f"scenario=weight,... from: {', '.join(SCENARIOS)}")
+    parser.add_argument("--timeout", type=float, default=30)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="write results to this file")
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args.base_url, args.duration, args.concurrency, args.rate, parse_mix(args.mix),
+                              args.timeout, args.seed))
+    print_table(results)
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"\n💾 Saved results to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
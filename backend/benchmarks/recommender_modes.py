@@ -0,0 +1,86 @@
+"""
+Compare recommendation modes (TF-IDF vs LSA) on quality and latency
+
+Quality is a proxy: each goal lists the subject codes (second token of the
+course code, e.g. "CS" in "CAS CS 111") a good answer should come from, and we
+report precision@k of the returned courses against that set.
+
+Run from backend/:
+    python -m benchmarks.recommender_modes [--repeats 20] [--json results.json]
+"""
+
+import argparse
+import json
+import statistics
+import time
+
+from app.smart_recommender import recommend_courses_smart
+
+LABELED_GOALS = [
+    ("machine learning engineer", {"CS", "DS", "EC", "BE", "MA"}),
+    ("data scientist", {"DS", "CS", "MA", "EC", "BA"}),
+    ("software engineer", {"CS", "EC", "EK", "DS"}),
+    ("clinical psychologist", {"PS", "NE", "SB", "HS"}),
+    ("financial analyst", {"FE", "AC", "EC", "BA", "MF"}),
+    ("marine biologist", {"BI", "EE", "ES"}),
+    ("journalist", {"JO", "CM", "EN", "WR"}),
+    ("public health researcher", {"EP", "SB", "PH", "HS", "GH", "PM"}),
+    ("music teacher", {"MU", "ME", "ED", "MH"}),
+    ("help people heal their minds", {"PS", "NE", "HS", "SB", "OT"}),
+]
+MODES = ["tfidf", "lsa"]
+
+
+def precision_at_k(courses, subjects) -> float:
+    if not courses:
+        return 0.0
+    hits = sum(1 for c in courses if len(c['code'].split()) >= 2 and c['code'].split()[1] in subjects)
+    return hits / len(courses)
+
+
+def run(repeats: int, k: int):
+    results = {}
+    for mode in MODES:
+        # Warm up: the LSA index is fitted on first use
+        recommend_courses_smart(LABELED_GOALS[0][0], k, None, mode)
+
+        latencies = []
+        precisions = []
+        for goal, subjects in LABELED_GOALS:
+            for _ in range(repeats):
+                started = time.perf_counter()
+                courses = recommend_courses_smart(goal, k, None, mode)
+                latencies.append((time.perf_counter() - started) * 1000)
+            precisions.append(precision_at_k(courses, subjects))
+
+        latencies.sort()
+        results[mode] = {
+            "precision_at_k": round(statistics.mean(precisions), 3),
+            "p50_ms": round(latencies[len(latencies) // 2], 2),
+            "p95_ms": round(latencies[int(len(latencies) * 0.95) - 1], 2),
+            "per_goal_precision": {goal: round(p, 3) for (goal, _), p in zip(LABELED_GOALS, precisions)},
+        }
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeats", type=int, default=20)
+    parser.add_argument("-k", type=int, default=9, help="recommendations per goal")
+    parser.add_argument("--json", help="write results to this file")
+    args = parser.parse_args()
+
+    results = run(args.repeats, args.k)
+
+    print(f"\n{'mode':<8}{'precision@' + str(args.k):>14}{'p50 ms':>10}{'p95 ms':>10}")
+    for mode, stats in results.items():
+        print(f"{mode:<8}{stats['precision_at_k']:>14}{stats['p50_ms']:>10}{stats['p95_ms']:>10}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"\n💾 Saved results to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,187 @@
+"""
+Synthetic course catalogs for scaling tests
+Writes <school>_all_courses.csv files in the exact schema
+MultiSchoolCourseProcessor reads: code, name, then one 0/1 column per Hub area,
+with the real header order. Everything is learned from the real CSVs in
+processing_csv/:
+- each synthetic school copies the subject mix and course-level spread of a
+  real school, under a new three-letter prefix (the real schools come first)
+- titles come from a per-subject word bigram chain over real titles, so the
+  vocabulary and title lengths match
+- hub flags are copied from the real course the row was modelled on, keeping
+  per-area frequencies by school and level and which areas co-occur
+
+Run from backend/:
+    python -m benchmarks.synthetic_catalog --courses 100000 --output /tmp/catalog_100k [--seed 0] [--process]
+
+--process also runs MultiSchoolCourseProcessor on the output, writing
+<output>/output/all_courses_data.json; start the API (or a benchmark) with
+CATALOG_PATH pointing at that file.
+"""
+
+import argparse
+import csv
+import os
+import random
+import string
+from collections import defaultdict
+from glob import glob
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+from app.catalog import BACKEND_DIR
+
+SOURCE_DIR = BACKEND_DIR / "processing_csv"
+CODE_TOKENS = 3
+MAX_TITLE_WORDS = 12
+
+
+class CatalogModel:
+    """What the generator learned from the real CSVs"""
+
+    def __init__(self, source_dir: Path = SOURCE_DIR):
+        self.header: List[str] = []
+        # school file key -> (prefix, [(subject, number, title, hub flags)])
+        self.schools: Dict[str, Tuple[str, List[Tuple[str, int, str, List[int]]]]] = {}
+        for path in sorted(glob(str(source_dir / "*_all_courses.csv"))):
+            key = os.path.basename(path).replace("_all_courses.csv", "")
+            with open(path, newline="", encoding="utf-8") as f:
+                reader = csv.reader(f)
+                header = next(reader)
+                self.header = self.header or header
+                rows = []
+                prefix = None
+                for row in reader:
+                    tokens = row[0].split()
+                    # Skip malformed rows (a few files have code "0")
+                    if len(tokens) != CODE_TOKENS or not tokens[2][:3].isdigit() or not row[1].strip():
+                        continue
+                    prefix = prefix or tokens[0]
+                    rows.append((tokens[1], int(tokens[2][:3]), row[1].strip(), [int(v or 0) for v in row[2:]]))
+            if rows:
+                self.schools[key] = (prefix, rows)
+
+        self.titles_by_subject: Dict[str, List[str]] = defaultdict(list)
+        for _, rows in self.schools.values():
+            for subject, _, title, _ in rows:
+                self.titles_by_subject[subject].append(title)
+        self.chains = {subject: self._bigrams(titles) for subject, titles in self.titles_by_subject.items()}
+
+    @staticmethod
+    def _bigrams(titles: List[str]) -> Dict[str, List[str]]:
+        chain = defaultdict(list)
+        for title in titles:
+            words = ["<s>"] + title.split() + ["</s>"]
+            for current, following in zip(words, words[1:]):
+                chain[current].append(following)
+        return chain
+
+    def title(self, subject: str, rng: random.Random) -> str:
+        chain = self.chains[subject]
+        words = []
+        word = rng.choice(chain["<s>"])
+        while word != "</s>" and len(words) < MAX_TITLE_WORDS:
+            words.append(word)
+            word = rng.choice(chain[word])
+        return " ".join(words) or rng.choice(self.titles_by_subject[subject])
+
+
+def _new_prefixes(count: int, taken: set, rng: random.Random) -> List[str]:
+    prefixes = []
+    while len(prefixes) < count:
+        prefix = "".join(rng.choice(string.ascii_uppercase) for _ in range(3))
+        if prefix not in taken:
+            taken.add(prefix)
+            prefixes.append(prefix)
+    return prefixes
+
+
+def generate(model: CatalogModel, total_courses: int, schools: int, seed: int) -> Dict[str, List[List]]:
+    """{school file key: CSV rows} with about total_courses rows across `schools` schools"""
+    rng = random.Random(seed)
+    real = list(model.schools.items())
+    taken = {prefix for prefix, _ in model.schools.values()}
+    # Real schools keep their prefixes; extra ones are clones of a real school's subject mix
+    plan = [(key, prefix, rows) for key, (prefix, rows) in real[:schools]]
+    for i, prefix in enumerate(_new_prefixes(max(0, schools - len(real)), taken, rng)):
+        _, (_, rows) = real[i % len(real)]
+        plan.append((f"synthetic{i + 1:03d}", prefix, rows))
+
+    real_sizes = [len(rows) for _, _, rows in plan]
+    scale = total_courses / sum(real_sizes)
+    output = {}
+    for (key, prefix, template_rows), real_size in zip(plan, real_sizes):
+        size = max(1, round(real_size * scale))
+        used = defaultdict(set)
+        rows = []
+        attempts = 0
+        while len(rows) < size and attempts < size * 20:
+            attempts += 1
+            subject, number, _, hubs = rng.choice(template_rows)
+            # Same hundreds level as the template course, new number
+            level = number // 100
+            candidate = level * 100 + rng.randint(0, 99)
+            if candidate < 100 or candidate in used[subject]:
+                candidate = rng.randint(100, 999)
+                if candidate in used[subject]:
+                    continue
+            used[subject].add(candidate)
+            rows.append([f"{prefix} {subject} {candidate}", model.title(subject, rng)] + list(hubs))
+        output[key] = rows
+    return output
+
+
+def write_csvs(model: CatalogModel, catalog: Dict[str, List[List]], output_dir: Path):
+    output_dir.mkdir(parents=True, exist_ok=True)
+    for old in glob(str(output_dir / "*_all_courses.csv")):
+        os.remove(old)
+    for key, rows in catalog.items():
+        with open(output_dir / f"{key}_all_courses.csv", "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(model.header)
+            writer.writerows(rows)
+
+
+def process(output_dir: Path) -> Path:
+    """Run the real processor over the generated CSVs; returns the JSON path"""
+    import sys
+    sys.path.insert(0, str(SOURCE_DIR))
+    from process_courses import MultiSchoolCourseProcessor
+
+    processor = MultiSchoolCourseProcessor(data_directory=str(output_dir), output_dir=str(output_dir / "output"))
+    for path in processor.find_school_files():
+        school_name, df = processor.load_school_data(path)
+        if school_name and df is not None:
+            processor.all_schools_data[school_name] = processor.process_school_data(school_name, df)
+    processor.save_as_json()
+    return output_dir / "output" / "all_courses_data.json"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    size = parser.add_mutually_exclusive_group()
+    size.add_argument("--courses", type=int, help="total courses to generate")
+    size.add_argument("--scale", type=float, default=10.0, help="multiple of the real catalog size (default 10)")
+    parser.add_argument("--schools", type=int, help="schools to spread them over (default keeps the real average school size)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", required=True, help="directory for the *_all_courses.csv files")
+    parser.add_argument("--process", action="store_true", help="also build output/all_courses_data.json")
+    args = parser.parse_args()
+
+    model = CatalogModel()
+    real_total = sum(len(rows) for _, rows in model.schools.values())
+    total = args.courses or round(real_total * args.scale)
+    schools = args.schools or max(1, round(total / (real_total / len(model.schools))))
+
+    catalog = generate(model, total, schools, args.seed)
+    output_dir = Path(args.output)
+    write_csvs(model, catalog, output_dir)
+    print(f"✅ Wrote {sum(len(rows) for rows in catalog.values()):,} courses in {len(catalog)} school files to {output_dir}")
+
+    if args.process:
+        json_path = process(output_dir)
+        print(f"💡 Use it with CATALOG_PATH={json_path.resolve()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+Latency and failure injection for the fake upstream servers
+
+A FaultProfile decides, per request, how long to wait and whether to fail:
+- latency: "fixed:MS", "uniform:LOW_MS,HIGH_MS" or "lognormal:MEDIAN_MS,SIGMA"
+- error_rate: fraction of requests answered with a 500
+- 429 bursts: for burst_length seconds out of every burst_every seconds, every
+  request gets 429 + Retry-After, the way a quota window runs dry
+"""
+
+import argparse
+import asyncio
+import random
+import time
+from typing import Optional, Tuple
+
+from fastapi.responses import JSONResponse
+
+from app.metrics import increment
+
+
+def parse_latency(spec: str) -> Tuple[str, Tuple[float, ...]]:
+    kind, _, values = spec.partition(":")
+    params = tuple(float(v) for v in values.split(",")) if values else ()
+    expected = {"fixed": 1, "uniform": 2, "lognormal": 2}
+    if kind not in expected or len(params) != expected[kind]:
+        raise argparse.ArgumentTypeError(
+            f"bad latency '{spec}': use fixed:MS, uniform:LOW_MS,HIGH_MS or lognormal:MEDIAN_MS,SIGMA"
+        )
+    return kind, params
+
+
+class FaultProfile:
+    def __init__(self, latency: str = "fixed:0", error_rate: float = 0.0,
+                 burst_every: float = 0.0, burst_length: float = 0.0, seed: Optional[int] = None):
+        self.latency_kind, self.latency_params = parse_latency(latency)
+        self.error_rate = error_rate
+        self.burst_every = burst_every
+        self.burst_length = burst_length
+        self.random = random.Random(seed)
+        self.started = time.monotonic()
+
+    def delay(self) -> float:
+        """Seconds to wait before answering one request"""
+        if self.latency_kind == "fixed":
+            ms = self.latency_params[0]
+        elif self.latency_kind == "uniform":
+            ms = self.random.uniform(*self.latency_params)
+        else:
+            median, sigma = self.latency_params
+            ms = median * self.random.lognormvariate(0, sigma)
+        return max(ms, 0.0) / 1000
+
+    def in_burst(self) -> bool:
+        if self.burst_every <= 0 or self.burst_length <= 0:
+            return False
+        return (time.monotonic() - self.started) % self.burst_every < self.burst_length
+
+    async def apply(self, upstream: str) -> Optional[JSONResponse]:
+        """Sleep for the sampled latency; return an error response to send instead, if any"""
+        await asyncio.sleep(self.delay())
+        if self.in_burst():
+            increment("fake_upstream_responses_total", upstream=upstream, outcome="rate_limited")
+            retry_after = self.burst_every - (time.monotonic() - self.started) % self.burst_every
+            return JSONResponse(
+                {"error": {"code": 429, "message": "Resource has been exhausted (e.g. check quota).", "status": "RESOURCE_EXHAUSTED"}},
+                status_code=429,
+                headers={"Retry-After": str(max(1, int(retry_after)))}
+            )
+        if self.random.random() < self.error_rate:
+            increment("fake_upstream_responses_total", upstream=upstream, outcome="error")
+            return JSONResponse(
+                {"error": {"code": 500, "message": "Injected upstream failure", "status": "INTERNAL"}},
+                status_code=500
+            )
+        increment("fake_upstream_responses_total", upstream=upstream, outcome="ok")
+        return None
+
+
+def add_fault_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument("--latency", default="fixed:0", type=str,
+                        help="fixed:MS, uniform:LOW_MS,HIGH_MS or lognormal:MEDIAN_MS,SIGMA (default fixed:0)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of requests answered with 500")
+    parser.add_argument("--burst-every", type=float, default=0.0, help="start a 429 burst every N seconds (0 = never)")
+    parser.add_argument("--burst-length", type=float, default=0.0, help="seconds each 429 burst lasts")
+    parser.add_argument("--seed", type=int, default=None)
+
+
+def profile_from_args(args) -> FaultProfile:
+    parse_latency(args.latency)
+    return FaultProfile(args.latency, args.error_rate, args.burst_every, args.burst_length, args.seed)
@@ -0,0 +1,172 @@
+"""
+Per-worker memory with and without the preloaded master
+Forks --workers children the way gunicorn does, has each serve the same mix of
+requests through the ASGI app (upstreams stubbed as in hot_paths), then reads
+its /proc/self/smaps_rollup. USS (private pages) is what each extra worker
+really costs; RSS also counts pages shared with the master and the other
+workers.
+
+- cold:    the master only imports the app; every worker loads the catalog,
+           builds its indexes and reads the professor table itself
+           (plain `uvicorn --workers N`, or gunicorn without preload_app)
+- preload: the master runs app.main.preload() and gc.freeze() before forking
+           (gunicorn.conf.py)
+
+"baseline" is a fresh interpreter that has only imported app.main.
+Linux only.
+
+Run from backend/:
+    python -m benchmarks.worker_memory [--workers 4] [--requests 40] [--modes cold preload] [--json memory.json]
+"""
+
+import argparse
+import asyncio
+import gc
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict, List
+
+BACKEND_DIR = Path(__file__).parent.parent
+WORKLOAD = ["search", "course_detail", "facet_schools", "facet_hub_areas", "smart_recommend_http",
+            "professors_by_department"]
+BASELINE_SCRIPT = "import app.main, json; from benchmarks.worker_memory import memory_kb; print(json.dumps(memory_kb()))"
+
+
+def memory_kb() -> Dict[str, int]:
+    """RSS, PSS and USS of this process from /proc/self/smaps_rollup, in KiB"""
+    fields = {}
+    with open("/proc/self/smaps_rollup") as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) == 3 and parts[2] == "kB":
+                fields[parts[0].rstrip(":")] = int(parts[1])
+    return {
+        "rss_kb": fields["Rss"],
+        "pss_kb": fields["Pss"],
+        "uss_kb": fields["Private_Clean"] + fields["Private_Dirty"],
+    }
+
+
+def serve_workload(requests_per_case: int):
+    """The same requests every worker handles before it is measured"""
+    import httpx
+
+    from app.main import app
+    from benchmarks.hot_paths import http_cases, stubbed_upstreams
+
+    async def run():
+        cases = http_cases()
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://benchmark") as client:
+            for name in WORKLOAD:
+                for i in range(requests_per_case):
+                    method, url, body = cases[name](i)
+                    response = await client.request(method, url, json=body)
+                    response.raise_for_status()
+
+    with stubbed_upstreams():
+        asyncio.run(run())
+
+
+def fork_workers(count: int, requests_per_case: int) -> List[Dict]:
+    """Fork workers that serve the workload, then report their memory over a pipe"""
+    pipes = []
+    for _ in range(count):
+        read_fd, write_fd = os.pipe()
+        pid = os.fork()
+        if pid == 0:
+            os.close(read_fd)
+            status = 0
+            try:
+                gc.enable()
+                serve_workload(requests_per_case)
+                result = memory_kb()
+            except Exception as e:
+                result = {"error": str(e)}
+                status = 1
+            with os.fdopen(write_fd, "w") as f:
+                json.dump(result, f)
+            os._exit(status)
+        os.close(write_fd)
+        pipes.append((pid, read_fd))
+
+    results = []
+    for pid, read_fd in pipes:
+        with os.fdopen(read_fd) as f:
+            results.append(json.loads(f.read() or '{"error": "no output"}'))
+        os.waitpid(pid, 0)
+    return results
+
+
+def run_mode(mode: str, workers: int, requests_per_case: int) -> Dict:
+    """One master per mode, in its own process so modes don't share state"""
+    read_fd, write_fd = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        os.close(read_fd)
+        gc.disable()
+        import app.main
+        if mode == "preload":
+            app.main.preload()
+        master = memory_kb()
+        result = {"master": master, "workers": fork_workers(workers, requests_per_case)}
+        with os.fdopen(write_fd, "w") as f:
+            json.dump(result, f)
+        os._exit(0)
+    os.close(write_fd)
+    with os.fdopen(read_fd) as f:
+        result = json.loads(f.read())
+    os.waitpid(pid, 0)
+    return result
+
+
+def baseline() -> Dict:
+    output = subprocess.run([sys.executable, "-c", BASELINE_SCRIPT], cwd=BACKEND_DIR,
+                            capture_output=True, text=True, check=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--requests", type=int, default=40, help="requests per workload case per worker")
+    parser.add_argument("--modes", nargs="+", choices=["cold", "preload"], default=["cold", "preload"])
+    parser.add_argument("--json", help="write results to this file")
+    args = parser.parse_args()
+    if not os.path.exists("/proc/self/smaps_rollup"):
+        raise SystemExit("❌ Needs Linux /proc/self/smaps_rollup")
+
+    results = {"workers": args.workers, "requests_per_case": args.requests, "baseline": baseline(), "modes": {}}
+    for mode in args.modes:
+        results["modes"][mode] = run_mode(mode, args.workers, args.requests)
+
+    def mb(kb: int) -> str:
+        return f"{kb / 1024:>10.1f}"
+
+    print(f"\n{'process':<22}{'RSS MB':>10}{'PSS MB':>10}{'USS MB':>10}")
+    base = results["baseline"]
+    print(f"{'baseline':<22}{mb(base['rss_kb'])}{mb(base['pss_kb'])}{mb(base['uss_kb'])}")
+    for mode, run in results["modes"].items():
+        master = run["master"]
+        print(f"{mode + ' master':<22}{mb(master['rss_kb'])}{mb(master['pss_kb'])}{mb(master['uss_kb'])}")
+        for i, worker in enumerate(run["workers"]):
+            if "error" in worker:
+                print(f"{f'{mode} worker {i}':<22}❌ {worker['error']}")
+                continue
+            print(f"{f'{mode} worker {i}':<22}{mb(worker['rss_kb'])}{mb(worker['pss_kb'])}{mb(worker['uss_kb'])}")
+        ok = [w for w in run["workers"] if "error" not in w]
+        if ok:
+            run["mean_worker_uss_mb"] = round(sum(w["uss_kb"] for w in ok) / len(ok) / 1024, 1)
+            print(f"{mode + ' mean worker USS':<22}{run['mean_worker_uss_mb']:>30.1f}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"\n💾 Saved results to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,33 @@
+"""
+Production server: gunicorn supervising uvicorn workers, with the app preloaded
+The master imports the app, loads the catalog, builds its indexes and reads the
+professor table once (app.main.preload), then forks the workers, which share
+those pages copy-on-write instead of each building a private copy. The dense
+LSA vectors are additionally memory-mapped from INDEX_CACHE_DIR.
+
+Run from backend/ (gunicorn picks this file up automatically):
+    gunicorn app.main:app
+    WEB_CONCURRENCY=8 BIND=0.0.0.0:8080 gunicorn app.main:app
+"""
+
+import gc
+import os
+
+bind = os.getenv("BIND", "0.0.0.0:8000")
+workers = int(os.getenv("WEB_CONCURRENCY", "4"))
+worker_class = "uvicorn.workers.UvicornWorker"
+preload_app = True
+
+# No collections in the master while it builds the shared state: a collection
+# leaves freed holes in pages that workers would later copy when reusing them
+gc.disable()
+
+
+def when_ready(server):
+    # Runs in the master after the app import and before the first fork
+    from app.main import preload
+    preload()
+
+
+def post_fork(server, worker):
+    gc.enable()
@@ -1,10 +1,211 @@
-import pandas as pd
 import numpy as np
+import argparse
+import hashlib
 import os
 import json
+import re
+import zlib
 from datetime import datetime
 from glob import glob
 
+# Per-school content hashes of the last build, kept next to the JSON output
+MANIFEST_FILENAME = "all_courses_manifest.json"
+# Bump when process_school_data's output changes, so older sections are not reused
+PROCESSOR_VERSION = 4
+
+def file_sha256(path):
+    """Content hash of a file"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def school_name_for(file_path):
+    return os.path.basename(file_path).replace('_all_courses.csv', '').upper()
+
+def co_occurrence(hub_matrix):
+    """Hᵀ H: courses satisfying both areas i and j (the diagonal is courses per area)"""
+    return (hub_matrix.T @ hub_matrix).tolist()
+
+def hubs_per_course_distribution(hub_matrix):
+    """{number of Hub areas: number of courses with that many}"""
+    counts = np.bincount(hub_matrix.sum(axis=1), minlength=1)
+    return {int(n): int(count) for n, count in enumerate(counts) if count}
+
+def double_counting_groups(hub_matrix, hub_names, codes):
+    """Courses that satisfy two or more Hub areas at once, grouped by the exact combination
+
+    Largest groups first; each course appears in exactly one group.
+    """
+    masks = hub_matrix.astype(np.int64) @ (np.int64(1) << np.arange(len(hub_names), dtype=np.int64))
+    multi = np.flatnonzero(hub_matrix.sum(axis=1) >= 2)
+    combos, inverse = np.unique(masks[multi], return_inverse=True)
+    groups = []
+    for position, mask in enumerate(combos):
+        rows = multi[inverse == position]
+        groups.append({
+            'hub_areas': [name for bit, name in enumerate(hub_names) if (int(mask) >> bit) & 1],
+            'courses': [codes[row] for row in rows]
+        })
+    groups.sort(key=lambda group: (-len(group['courses']), group['hub_areas']))
+    return groups
+
+# Near-duplicate detection: MinHash over title character 3-grams, LSH with
+# DUPLICATE_BANDS bands of MINHASH_PERMUTATIONS / DUPLICATE_BANDS rows each
+MINHASH_PERMUTATIONS = 64
+DUPLICATE_BANDS = 16
+MINHASH_SEED = 1
+MINHASH_PRIME = (1 << 31) - 1
+# Verified title similarity (exact Jaccard of 3-gram sets) for a duplicate pair
+DUPLICATE_SIMILARITY = 0.9
+# Titles used with this many different course numbers ("Directed Study") are generic
+GENERIC_TITLE_NUMBERS = 4
+# Buckets bigger than this are linked to their first member instead of pairwise
+MAX_BUCKET_PAIRS = 50
+# Titles made only of these words name a kind of course, not a course
+GENERIC_TITLE_WORDS = {
+    "independent", "ind", "directed", "study", "studies", "research", "thesis", "dissertation", "advisement",
+    "internship", "practicum", "seminar", "topics", "topic", "special", "current", "senior", "junior",
+    "graduate", "undergraduate", "phd", "doctoral", "master", "masters", "s", "project", "projects", "work",
+    "reading", "readings", "tutorial", "honors", "capstone", "field", "experience", "continuing", "student",
+    "status", "in", "of", "and", "the", "for", "a"
+}
+TITLE_NUMBERS = re.compile(r"^(\d+|i{1,3}|iv|v|vi{1,3}|ix|x)$")
+# First digit of graduate course numbers
+GRADUATE_LEVEL = "5"
+# "CAS CS 111", "CAS AR 100A"; malformed rows (a few files have code "0") are never grouped
+COURSE_CODE = re.compile(r"^[A-Z]{2,}\s+[A-Z]{2}\s+\d{3}[A-Z]?$")
+
+def normalize_title(title):
+    return " ".join(re.sub(r"[^a-z0-9 ]+", " ", str(title).lower()).split())
+
+def title_shingles(title):
+    padded = f" {normalize_title(title)} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+def split_code(code):
+    """(school, subject, number) of the first listing of a course code"""
+    tokens = str(code).split('|')[0].split()
+    return tuple((tokens + ['', '', ''])[:3])
+
+def parses(code):
+    return bool(COURSE_CODE.match(str(code).split('|')[0].strip()))
+
+def could_be_listings(a, b):
+    """Whether two (school, subject, number) codes can name one course
+    
+    Either the same subject and number (one course offered by two schools), or
+    two subjects of one school, both undergraduate or both graduate (a
+    cross-listing). A shared title alone is not enough: CAS MA 242 and
+    ENG BE 601 are both "Linear Algebra".
+    """
+    if a[1] == b[1]:
+        return a[2] == b[2]
+    return a[0] == b[0] and (a[2][:1] >= GRADUATE_LEVEL) == (b[2][:1] >= GRADUATE_LEVEL)
+
+def minhash_signatures(shingle_sets):
+    """MINHASH_PERMUTATIONS min-hashes per set (rows of empty sets stay at MINHASH_PRIME)"""
+    owners = np.repeat(np.arange(len(shingle_sets)), [len(shingles) for shingles in shingle_sets])
+    values = np.array([zlib.crc32(shingle.encode('utf-8')) for shingles in shingle_sets for shingle in sorted(shingles)],
+                      dtype=np.int64) % MINHASH_PRIME
+    rng = np.random.default_rng(MINHASH_SEED)
+    a = rng.integers(1, MINHASH_PRIME, MINHASH_PERMUTATIONS, dtype=np.int64)
+    b = rng.integers(0, MINHASH_PRIME, MINHASH_PERMUTATIONS, dtype=np.int64)
+    
+    signatures = np.full((len(shingle_sets), MINHASH_PERMUTATIONS), MINHASH_PRIME, dtype=np.int64)
+    # Hash all shingles under a few permutations at a time to bound memory
+    chunk = max(1, (1 << 24) // max(len(values), 1))
+    for start in range(0, MINHASH_PERMUTATIONS, chunk):
+        hashed = (a[start:start + chunk, None] * values[None, :] + b[start:start + chunk, None]) % MINHASH_PRIME
+        for row, permutation in enumerate(range(start, min(start + chunk, MINHASH_PERMUTATIONS))):
+            np.minimum.at(signatures[:, permutation], owners, hashed[row])
+    return signatures
+
+def lsh_candidate_pairs(signatures, usable):
+    """Pairs of rows whose signatures agree on at least one whole band"""
+    rows_per_band = signatures.shape[1] // DUPLICATE_BANDS
+    multipliers = np.random.default_rng(MINHASH_SEED).integers(1, 1 << 62, rows_per_band, dtype=np.int64).astype(np.uint64)
+    candidates = np.flatnonzero(usable)
+    pairs = set()
+    for band in range(DUPLICATE_BANDS):
+        columns = slice(band * rows_per_band, (band + 1) * rows_per_band)
+        keys = (signatures[candidates, columns].astype(np.uint64) * multipliers).sum(axis=1)
+        order = np.argsort(keys, kind='stable')
+        sorted_keys = keys[order]
+        boundaries = np.flatnonzero(np.diff(sorted_keys)) + 1
+        for bucket in np.split(candidates[order], boundaries):
+            if len(bucket) < 2:
+                continue
+            bucket = sorted(bucket.tolist())
+            if len(bucket) <= MAX_BUCKET_PAIRS:
+                pairs.update((x, y) for i, x in enumerate(bucket) for y in bucket[i + 1:])
+            else:
+                pairs.update((bucket[0], y) for y in bucket[1:])
+    return pairs
+
+def find_duplicate_groups(courses):
+    """Group cross-listed and near-duplicate courses; returns a group id per course (None if unique)
+    
+    A candidate pair from MinHash/LSH is a duplicate when its titles' 3-gram
+    Jaccard is at least DUPLICATE_SIMILARITY, the titles carry the same
+    numbers ("Biochemistry 1" is not "Biochemistry 2"), and the codes look
+    like listings of one course (see could_be_listings; the same subject under
+    another number is a sequence or a level variant). Generic titles and rows
+    whose code does not parse are never grouped. Group ids follow catalog order.
+    """
+    titles = [normalize_title(course['name']) for course in courses]
+    codes = [split_code(course['code']) for course in courses]
+    shingles = [title_shingles(course['name']) if parses(course['code']) else set() for course in courses]
+    title_numbers = [frozenset(token for token in title.split() if TITLE_NUMBERS.match(token)) for title in titles]
+    
+    numbers_by_title = {}
+    for title, (_, _, number) in zip(titles, codes):
+        numbers_by_title.setdefault(title, set()).add(number)
+    generic = [len(numbers_by_title[title]) >= GENERIC_TITLE_NUMBERS or set(title.split()) <= GENERIC_TITLE_WORDS
+               for title in titles]
+    
+    parent = list(range(len(courses)))
+    # (school, subject) -> number of every member, per group root
+    listings = [{code[:2]: code[2]} for code in codes]
+    def find(row):
+        while parent[row] != row:
+            parent[row] = parent[parent[row]]
+            row = parent[row]
+        return row
+    
+    usable = np.array([bool(s) for s in shingles])
+    for x, y in sorted(lsh_candidate_pairs(minhash_signatures(shingles), usable)):
+        if not could_be_listings(codes[x], codes[y]):
+            continue
+        if codes[x] != codes[y]:
+            if generic[x] or generic[y] or title_numbers[x] != title_numbers[y]:
+                continue
+        if len(shingles[x] & shingles[y]) < DUPLICATE_SIMILARITY * len(shingles[x] | shingles[y]):
+            continue
+        root_x, root_y = find(x), find(y)
+        if root_x == root_y:
+            continue
+        # Never join two numbers of one subject, even through a third course
+        if any(listings[root_y].get(key, number) != number for key, number in listings[root_x].items()):
+            continue
+        parent[root_x] = root_y
+        listings[root_y].update(listings[root_x])
+        listings[root_x] = None
+    
+    roots = [find(row) for row in range(len(courses))]
+    sizes = {}
+    for root in roots:
+        sizes[root] = sizes.get(root, 0) + 1
+    group_ids = {}
+    groups = []
+    for root in roots:
+        if sizes[root] < 2:
+            groups.append(None)
+        else:
+            groups.append(group_ids.setdefault(root, len(group_ids)))
+    return groups
+
 class MultiSchoolCourseProcessor:
     def __init__(self, data_directory=".", output_dir="output"):
         self.data_directory = data_directory
@@ -17,7 +218,8 @@ class MultiSchoolCourseProcessor:
     def find_school_files(self):
         """Find all school course files in the directory"""
         pattern = os.path.join(self.data_directory, "*_all_courses.csv")
-        school_files = glob(pattern)
+        # Sorted, so school order and duplicate_group ids don't depend on the filesystem
+        school_files = sorted(glob(pattern))
         print(f"📁 Found {len(school_files)} school files:")
         for file in school_files:
             print(f"   {os.path.basename(file)}")
@@ -25,8 +227,10 @@ class MultiSchoolCourseProcessor:
     
     def load_school_data(self, file_path):
         """Load course data for a single school"""
+        # pandas is only needed once a school has changed; no-op rebuilds skip the import
+        import pandas as pd
         try:
-            school_name = os.path.basename(file_path).replace('_all_courses.csv', '').upper()
+            school_name = school_name_for(file_path)
             print(f"\n📁 Loading {school_name} courses from {os.path.basename(file_path)}")
             
             df = pd.read_csv(file_path)
@@ -42,30 +246,25 @@ class MultiSchoolCourseProcessor:
         # Identify HUB columns
         hub_columns = [col for col in df.columns if col not in ['code', 'name']]
         
+        # Course x HUB 0/1 matrix; every statistic below is a reduction or product of it
+        hub_matrix = (df[hub_columns].fillna(0).to_numpy() == 1).astype(np.int64)
+        
         # Calculate statistics
-        hub_counts = {}
-        for hub in hub_columns:
-            count = df[hub].sum()
-            hub_counts[hub] = int(count)
+        hub_counts = dict(zip(hub_columns, hub_matrix.sum(axis=0).tolist()))
         
         # Courses per HUB count
-        df['hub_count'] = df[hub_columns].sum(axis=1)
-        hub_distribution = df['hub_count'].value_counts().sort_index().to_dict()
+        hubs_per_course = hub_matrix.sum(axis=1)
+        hub_distribution = hubs_per_course_distribution(hub_matrix)
         
         # Convert to dictionary for JSON
         courses_data = []
-        for _, row in df.iterrows():
+        for code, name, row in zip(df['code'], df['name'], hub_matrix):
             course_info = {
-                'code': row['code'],
-                'name': row['name'],
-                'hub_areas': {}
+                'code': code,
+                'name': name,
+                # Add HUB areas that this course fulfills
+                'hub_areas': {hub_columns[col]: True for col in np.flatnonzero(row)}
             }
-            
-            # Add HUB areas that this course fulfills
-            for hub in hub_columns:
-                if row[hub] == 1:
-                    course_info['hub_areas'][hub] = True
-            
             courses_data.append(course_info)
         
         school_data = {
@@ -75,7 +274,9 @@ class MultiSchoolCourseProcessor:
             'hub_statistics': {
                 'courses_per_area': hub_counts,
                 'distribution': hub_distribution,
-                'average_hubs_per_course': round(df['hub_count'].mean(), 2)
+                'average_hubs_per_course': round(float(hubs_per_course.mean()), 2),
+                # Rows and columns follow courses_per_area
+                'co_occurrence': co_occurrence(hub_matrix)
             },
             'courses': courses_data
         }
@@ -154,13 +355,67 @@ class MultiSchoolCourseProcessor:
         
         return summary
     
+    def build_hub_analytics(self):
+        """Catalog-wide HUB tables from the course x HUB matrix of every school combined
+        
+        Rebuilt from the processed sections, so schools reused by an incremental
+        build are included without re-reading their CSVs.
+        """
+        hub_names = []
+        for school_data in self.all_schools_data.values():
+            for hub in school_data['hub_statistics']['courses_per_area']:
+                if hub not in hub_names:
+                    hub_names.append(hub)
+        column = {hub: col for col, hub in enumerate(hub_names)}
+        
+        schools = list(self.all_schools_data)
+        courses = [(school_row, course) for school_row, school_data in enumerate(self.all_schools_data.values())
+                   for course in school_data['courses']]
+        hub_matrix = np.zeros((len(courses), len(hub_names)), dtype=np.int64)
+        school_matrix = np.zeros((len(courses), len(schools)), dtype=np.int64)
+        for row, (school_row, course) in enumerate(courses):
+            hub_matrix[row, [column[hub] for hub in course['hub_areas']]] = 1
+            school_matrix[row, school_row] = 1
+        codes = [course['code'] for _, course in courses]
+        
+        return {
+            'hub_areas': hub_names,
+            'courses_per_area': hub_matrix.sum(axis=0).tolist(),
+            'hubs_per_course': hubs_per_course_distribution(hub_matrix),
+            # co_occurrence[i][j]: courses satisfying both hub_areas[i] and hub_areas[j]
+            'co_occurrence': co_occurrence(hub_matrix),
+            'schools': schools,
+            # school_area_counts[s][i]: courses in schools[s] satisfying hub_areas[i]
+            'school_area_counts': (school_matrix.T @ hub_matrix).tolist(),
+            'double_counting': double_counting_groups(hub_matrix, hub_names, codes)
+        }
+    
+    def assign_duplicate_groups(self):
+        """Tag courses with a catalog-wide duplicate_group id; returns (groups, courses in groups)
+        
+        Recomputed over every school on each save, since a group can span schools.
+        """
+        courses = [course for school_data in self.all_schools_data.values() for course in school_data['courses']]
+        groups = find_duplicate_groups(courses)
+        for course, group in zip(courses, groups):
+            course.pop('duplicate_group', None)
+            if group is not None:
+                course['duplicate_group'] = group
+        grouped = [group for group in groups if group is not None]
+        print(f"🪞 Found {len(set(grouped))} duplicate groups covering {len(grouped)} courses")
+        return len(set(grouped)), len(grouped)
+    
     def save_as_json(self, filename="all_courses_data.json"):
         """Save all data as JSON"""
+        duplicate_groups, duplicate_courses = self.assign_duplicate_groups()
         output_data = {
             'metadata': {
                 'generated_at': datetime.now().isoformat(),
                 'total_schools': len(self.all_schools_data),
-                'total_courses': sum(school['total_courses'] for school in self.all_schools_data.values())
+                'total_courses': sum(school['total_courses'] for school in self.all_schools_data.values()),
+                'hub_analytics': self.build_hub_analytics(),
+                'duplicate_groups': duplicate_groups,
+                'duplicate_courses': duplicate_courses
             },
             'schools': self.all_schools_data
         }
@@ -176,8 +431,45 @@ class MultiSchoolCourseProcessor:
             print(f"❌ Error saving JSON: {e}")
             return False
     
-    def run_full_processing(self):
-        """Run the complete multi-school processing pipeline"""
+    def load_previous_build(self, filename="all_courses_data.json"):
+        """Manifest entries and processed sections of the last build, if it is still intact
+
+        Returns ({}, {}) when there is no manifest, it was written by another
+        PROCESSOR_VERSION, or the JSON output was changed after it was written.
+        """
+        manifest_path = os.path.join(self.output_dir, MANIFEST_FILENAME)
+        output_path = os.path.join(self.output_dir, filename)
+        try:
+            with open(manifest_path, encoding='utf-8') as f:
+                manifest = json.load(f)
+            if manifest.get('processor_version') != PROCESSOR_VERSION:
+                return {}, {}
+            if manifest.get('output_sha256') != file_sha256(output_path):
+                return {}, {}
+            with open(output_path, encoding='utf-8') as f:
+                sections = json.load(f)['schools']
+            return manifest['schools'], sections
+        except (OSError, ValueError, KeyError):
+            return {}, {}
+    
+    def save_manifest(self, school_hashes, filename="all_courses_data.json"):
+        """Record the content hash of every school file that went into the JSON output"""
+        manifest = {
+            'processor_version': PROCESSOR_VERSION,
+            'output': filename,
+            'output_sha256': file_sha256(os.path.join(self.output_dir, filename)),
+            'schools': school_hashes
+        }
+        with open(os.path.join(self.output_dir, MANIFEST_FILENAME), 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, indent=2)
+    
+    def run_full_processing(self, incremental=True):
+        """Run the complete multi-school processing pipeline
+        
+        With incremental=True, schools whose CSV has the same content hash as in
+        the last build reuse their processed section from the existing JSON;
+        only changed or new files are re-read and processed.
+        """
         print("🎯 MULTI-SCHOOL COURSE HUB ANALYZER")
         print("=" * 60)
         
@@ -187,17 +479,41 @@ class MultiSchoolCourseProcessor:
             print("❌ No school files found!")
             return False
         
+        previous_hashes, previous_sections = self.load_previous_build() if incremental else ({}, {})
+        school_hashes = {}
+        processed = []
+        
         # Process each school
         for file_path in school_files:
+            digest = file_sha256(file_path)
+            school_name = school_name_for(file_path)
+            previous = previous_hashes.get(school_name)
+            if previous and previous['sha256'] == digest and school_name in previous_sections:
+                print(f"\n⏭️  {school_name} unchanged, reusing its processed courses")
+                self.all_schools_data[school_name] = previous_sections[school_name]
+                school_hashes[school_name] = previous
+                continue
+            
             school_name, df = self.load_school_data(file_path)
             if school_name and df is not None:
                 school_data = self.process_school_data(school_name, df)
                 self.all_schools_data[school_name] = school_data
+                school_hashes[school_name] = {'file': os.path.basename(file_path), 'sha256': digest}
+                processed.append(school_name)
         
         if not self.all_schools_data:
             print("❌ No school data processed successfully!")
             return False
         
+        removed = [school for school in previous_sections if school not in self.all_schools_data]
+        if previous_sections and not processed and not removed:
+            # Leaving the file alone keeps the catalog version, so the API keeps its indexes
+            print("\n✅ No school files changed since the last build; output left as is")
+            return True
+        if previous_sections:
+            print(f"\n🔁 Reprocessed {len(processed)} of {len(school_files)} schools"
+                  + (f", dropped {', '.join(removed)}" if removed else ""))
+        
         # Generate summaries
         self.generate_school_summary()
         
@@ -213,7 +529,8 @@ class MultiSchoolCourseProcessor:
             self.find_courses_by_hub(hub_areas)
         
         # Save as JSON
-        self.save_as_json()
+        if self.save_as_json():
+            self.save_manifest(school_hashes)
         
         print("\n" + "=" * 60)
         print("✅ MULTI-SCHOOL PROCESSING COMPLETE!")
@@ -224,11 +541,15 @@ class MultiSchoolCourseProcessor:
 
 def main():
     """Main function to run the multi-school processor"""
+    parser = argparse.ArgumentParser(description="Build output/all_courses_data.json from the school CSVs")
+    parser.add_argument("--full", action="store_true", help="reprocess every school, ignoring the manifest")
+    args = parser.parse_args()
+    
     # Create processor instance
     processor = MultiSchoolCourseProcessor(data_directory=".", output_dir="output")
     
     # Run full processing pipeline
-    success = processor.run_full_processing()
+    success = processor.run_full_processing(incremental=not args.full)
     
     if success:
         print("\n🎉 All schools processed successfully!")
@@ -0,0 +1,38 @@
+"""
+Shared fixtures: small in-memory catalogs built from course dicts, so each
+test controls exactly which courses, codes and Hub areas exist.
+"""
+
+import json
+from typing import Dict, List
+
+import pytest
+
+from app.catalog import Catalog
+
+
+def make_catalog(schools: Dict[str, List[Dict]]) -> Catalog:
+    """A catalog with no file behind it (derived arrays stay in memory)"""
+    data = {
+        "metadata": {"total_schools": len(schools), "total_courses": sum(len(c) for c in schools.values())},
+        "schools": {name: {"courses": [{"hub_areas": {}, **course} for course in courses]}
+                    for name, courses in schools.items()},
+    }
+    return Catalog(None, json.dumps(data).encode("utf-8"))
+
+
+@pytest.fixture
+def catalog() -> Catalog:
+    return make_catalog({
+        "CAS": [
+            {"code": "CAS CS 111", "name": "Introduction to Computer Science 1"},
+            {"code": "CAS CS 112", "name": "Introduction to Computer Science 2"},
+            {"code": "CAS MA 123", "name": "Calculus I"},
+            {"code": "CAS AA 221", "name": "Catastrophe and Memory", "duplicate_group": 0},
+            {"code": "CAS HI 221", "name": "Catastrophe and Memory", "duplicate_group": 0},
+        ],
+        "ENG": [
+            {"code": "ENG EK 125", "name": "Introduction to Programming for Engineers"},
+            {"code": "ENG EC 327 | ENG EC 527", "name": "Introduction to Software Engineering"},
+        ],
+    })
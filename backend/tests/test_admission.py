@@ -0,0 +1,101 @@
+import asyncio
+
+import pytest
+
+from app.admission import AdmissionLimiter, Overloaded
+from app.streaming import sse_response
+
+
+def test_queue_full_is_shed():
+    async def run():
+        limiter = AdmissionLimiter("test", 1, 1, 5)
+        await limiter.acquire()
+        waiter = asyncio.ensure_future(limiter.acquire())
+        await asyncio.sleep(0)
+        with pytest.raises(Overloaded) as excinfo:
+            await limiter.acquire()
+        assert excinfo.value.reason == "queue_full"
+        limiter.release()
+        await waiter
+        assert limiter.active == 1
+
+    asyncio.run(run())
+
+
+def test_deadline_is_shed_and_leaves_the_queue():
+    async def run():
+        limiter = AdmissionLimiter("test", 1, 4, 0.01)
+        await limiter.acquire()
+        with pytest.raises(Overloaded) as excinfo:
+            await limiter.acquire()
+        assert excinfo.value.reason == "deadline"
+        assert excinfo.value.retry_after == 1
+        limiter.release()
+        assert limiter.active == 0
+
+    asyncio.run(run())
+
+
+def test_released_slot_goes_to_the_oldest_waiter():
+    async def run():
+        limiter = AdmissionLimiter("test", 1, 4, 5)
+        await limiter.acquire()
+        order = []
+
+        async def wait(name):
+            await limiter.acquire()
+            order.append(name)
+
+        waiters = [asyncio.ensure_future(wait(name)) for name in ("first", "second")]
+        await asyncio.sleep(0)
+        limiter.release()
+        await asyncio.sleep(0.01)
+        assert order == ["first"]
+        limiter.release()
+        await asyncio.gather(*waiters)
+        assert order == ["first", "second"]
+        limiter.release()
+        assert limiter.active == 0
+
+    asyncio.run(run())
+
+
+async def never_iterated():
+    raise AssertionError("body should not be iterated")
+    yield
+
+
+def call_response(send, receive):
+    async def run():
+        limiter = AdmissionLimiter("test", 1, 1, 5)
+        await limiter.acquire()
+        response = sse_response(never_iterated(), on_close=limiter.release)
+        scope = {"type": "http", "method": "GET", "path": "/api/chatbot/stream", "headers": []}
+        try:
+            await response(scope, receive, send)
+        except Exception:
+            # The send error, possibly wrapped by Starlette's task group
+            pass
+        return limiter.active
+
+    return asyncio.run(run())
+
+
+def test_slot_released_when_the_send_fails_before_the_body():
+    async def send(message):
+        raise OSError("connection reset")
+
+    async def receive():
+        await asyncio.sleep(10)
+
+    assert call_response(send, receive) == 0
+
+
+def test_slot_released_when_the_client_disconnects_before_the_body():
+    async def send(message):
+        await asyncio.sleep(10)
+
+    async def receive():
+        return {"type": "http.disconnect"}
+
+    assert call_response(send, receive) == 0
@@ -0,0 +1,57 @@
+import numpy as np
+
+from app.ann_index import IVFIndex
+from app.course_vectors import normalize_rows
+
+
+def unit_vectors(n=400, dims=16, seed=0):
+    return normalize_rows(np.random.default_rng(seed).normal(size=(n, dims))).astype(np.float32)
+
+
+def exact_top(vectors, query, k):
+    return np.argsort(-(vectors @ query), kind='stable')[:k]
+
+
+def test_every_row_is_in_exactly_one_list():
+    index = IVFIndex.build(unit_vectors(), nlist=20)
+    assert index.nlist == 20
+    assert sorted(index.list_rows.tolist()) == list(range(400))
+    assert index.list_offsets[-1] == 400
+
+
+def test_probing_every_list_is_exact():
+    vectors = unit_vectors()
+    index = IVFIndex.build(vectors, nlist=20)
+    query = vectors[7]
+    rows, scores = index.search(query, 10, nprobe=index.nlist)
+    assert rows.tolist() == exact_top(vectors, query, 10).tolist()
+    assert np.all(np.diff(scores) <= 0)
+
+
+def test_recall_with_a_few_probes():
+    vectors = unit_vectors()
+    index = IVFIndex.build(vectors, nlist=20)
+    queries = unit_vectors(50, seed=1)
+    hits = sum(len(set(index.search(q, 10, nprobe=8)[0].tolist()) & set(exact_top(vectors, q, 10).tolist()))
+               for q in queries)
+    assert hits / (10 * len(queries)) >= 0.8
+
+
+def test_allowed_mask_filters_rows():
+    vectors = unit_vectors()
+    index = IVFIndex.build(vectors, nlist=20)
+    allowed = np.zeros(len(vectors), dtype=bool)
+    allowed[::3] = True
+    rows, _ = index.search(vectors[0], 10, nprobe=index.nlist, allowed=allowed)
+    assert len(rows) == 10 and allowed[rows].all()
+
+
+def test_load_rejects_another_catalog_version(tmp_path):
+    vectors = unit_vectors()
+    index = IVFIndex.build(vectors, nlist=20)
+    path = tmp_path / "ann.npz"
+    index.save(path, "v1")
+    loaded = IVFIndex.load(path, vectors, "v1")
+    assert np.array_equal(loaded.list_rows, index.list_rows)
+    assert IVFIndex.load(path, vectors, "v2") is None
+    assert IVFIndex.load(path, vectors[:10], "v1") is None
@@ -0,0 +1,50 @@
+import threading
+
+from tests.conftest import make_catalog
+
+
+def test_slow_build_does_not_block_other_keys():
+    catalog = make_catalog({"CAS": [{"code": "CAS CS 111", "name": "Introduction to Computer Science 1"}]})
+    started, release = threading.Event(), threading.Event()
+    builds = []
+
+    def slow():
+        builds.append("slow")
+        started.set()
+        release.wait(5)
+        return "slow"
+
+    def wait_for_slow():
+        results.append(catalog.memo("slow", slow))
+
+    results = []
+    threads = [threading.Thread(target=wait_for_slow) for _ in range(3)]
+    threads[0].start()
+    assert started.wait(5)
+    for thread in threads[1:]:
+        thread.start()
+
+    # Other keys, memoized or payloads, are served while the slow build runs
+    served = []
+
+    def other_keys():
+        served.append(catalog.memo("fast", lambda: "fast"))
+        served.append(catalog.payload_variants("body", lambda: {"ok": True})["identity"])
+
+    other = threading.Thread(target=other_keys)
+    other.start()
+    other.join(2)
+    assert served == ["fast", b'{"ok":true}']
+
+    release.set()
+    for thread in threads:
+        thread.join(5)
+    assert results == ["slow"] * 3
+    assert builds == ["slow"]
+
+
+def test_builders_can_use_other_memoized_values():
+    catalog = make_catalog({})
+    inner = lambda: catalog.memo("inner", lambda: 1)
+    assert catalog.memo("outer", lambda: inner() + 1) == 2
+    assert catalog.memo("self", lambda: catalog.memo("self", lambda: 3) + 1) == 4
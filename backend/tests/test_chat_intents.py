@@ -0,0 +1,59 @@
+import pytest
+
+from app.chat_intents import NAVIGATION_ANSWERS, answer_locally
+
+
+@pytest.mark.parametrize("message", [
+    "Is CS 111 hard?",
+    "Can you explain what CS 112 is about and how it compares to CS 111?",
+    "Compare MA 123 vs CS 111",
+    "Should I take CS 111?",
+    "What is the best way to prepare for CS 112?",
+    "What are the prerequisites for CS 112 and MA 123?",
+])
+def test_open_questions_go_to_the_model(catalog, message):
+    assert answer_locally(message, catalog) is None
+
+
+@pytest.mark.parametrize("message", [
+    "What is CS 111?",
+    "what's cs111",
+    "CAS CS 111?",
+    "Tell me about CAS CS 111",
+    "Can you tell me about the course CS 111?",
+])
+def test_course_lookup(catalog, message):
+    answer = answer_locally(message, catalog)
+    assert answer["intent"] == "course_info"
+    assert "Introduction to Computer Science 1" in answer["response"]
+
+
+@pytest.mark.parametrize("message", [
+    "prerequisites for CS 112",
+    "What are the prerequisites for CAS CS 112?",
+    "CS 112 prereqs",
+    "What do I need before taking CS 112?",
+])
+def test_prerequisite_lookup(catalog, message):
+    answer = answer_locally(message, catalog)
+    assert answer["intent"] == "prerequisites"
+    assert answer["response"].startswith("**CAS CS 112**")
+
+
+def test_unknown_code_is_not_answered(catalog):
+    assert answer_locally("What is CS 999?", catalog) is None
+
+
+def test_count_and_list(catalog):
+    count = answer_locally("How many CS courses are there?", catalog)
+    assert count["intent"] == "count"
+    assert "**2**" in count["response"]
+
+    listing = answer_locally("List the CS courses", catalog)
+    assert listing["intent"] == "list"
+    assert "CAS CS 111" in listing["response"] and "CAS MA 123" not in listing["response"]
+
+
+def test_navigation(catalog):
+    answer = answer_locally("How do I export my plan to PDF?", catalog)
+    assert answer == {"response": NAVIGATION_ANSWERS["export"], "intent": "navigation"}
@@ -0,0 +1,41 @@
+from app.course_index import CourseIndex, code_aliases, get_course_index, normalize_code
+
+
+def test_normalize_code():
+    assert normalize_code(" cas_cs-111 ") == "CAS CS 111"
+
+
+def test_cross_listed_code_is_split_into_aliases():
+    assert code_aliases("ENG EC 327 | ENG EC 527") == ["ENG EC 327", "ENG EC 527"]
+
+
+def test_lookup_by_id_code_and_alias(catalog):
+    index = get_course_index(catalog)
+    assert index.lookup("CAS_CAS_CS_111") == 0
+    assert index.lookup("cas cs 112") == 1
+    assert index.lookup("ENG EC 527") == 6
+    assert index.lookup("ENG_ENG_EC_327_ENG_EC_527") == 6
+
+
+def test_lookup_falls_back_to_earliest_prefix_match(catalog):
+    index = get_course_index(catalog)
+    assert index.lookup("CAS CS") == 0
+    assert index.lookup("EK 1") == 5
+    assert index.lookup("ZZ 999") is None
+
+
+def test_resolve_accepts_school_less_code_but_not_partial(catalog):
+    index = get_course_index(catalog)
+    assert index.resolve("CS 111") == 0
+    assert index.resolve("221") == 3
+    assert index.resolve("CS 11") is None
+
+
+def test_first_course_wins_on_duplicate_codes():
+    index = CourseIndex([{"id": "a", "code": "CAS CS 332"}, {"id": "b", "code": "CAS CS 332"}])
+    assert index.find_code("CAS CS 332") == 0
+    assert index.find_prefix("CS 3") == 0
+
+
+def test_index_is_memoized_per_catalog(catalog):
+    assert get_course_index(catalog) is get_course_index(catalog)
@@ -0,0 +1,93 @@
+import json
+from urllib.parse import quote
+
+import numpy as np
+from fastapi.testclient import TestClient
+
+from app import course_neighbors
+from app.catalog import Catalog
+from app.config import Config
+from app.course_neighbors import NeighborGraph, build_neighbor_tables, get_neighbor_graph, graph_path, similarity_text
+from app.main import app
+
+TEXTS = [
+    "CS Introduction to Computer Science",
+    "CS Introduction to Programming",
+    "CH Organic Chemistry",
+    "CH Physical Chemistry",
+    "BI Molecular Biology",
+    "EC Microeconomics",
+]
+
+
+def test_similarity_text_drops_school_and_number():
+    assert similarity_text({"code": "ENG EC 327 | ENG EK 327", "name": "Software"}) == "EC EK Software"
+
+
+def test_blocked_build_matches_a_single_block():
+    whole = build_neighbor_tables(TEXTS, k=3, block_rows=len(TEXTS))
+    blocked = build_neighbor_tables(TEXTS, k=3, block_rows=1)
+    assert np.array_equal(whole[0], blocked[0])
+    assert np.array_equal(whole[1], blocked[1])
+
+
+def test_neighbors_exclude_self_and_pad_with_minus_one():
+    neighbors, scores = build_neighbor_tables(TEXTS, k=3)
+    assert neighbors[2, 0] == 3 and neighbors[0, 0] == 1
+    for row in range(len(TEXTS)):
+        assert row not in neighbors[row].tolist()
+    # Microeconomics shares no term with anything
+    assert neighbors[5].tolist() == [-1, -1, -1]
+    graph = NeighborGraph(neighbors, scores)
+    assert graph.similar(5) == []
+    assert [row for row, _ in graph.similar(2)][0] == 3
+
+
+def test_similar_endpoint_skips_own_cross_listings():
+    client = TestClient(app)
+    response = client.get(f"/api/courses/{quote('CAS AA 221')}/similar", params={"limit": 5})
+    assert response.status_code == 200
+    codes = [course["code"] for course in response.json()["similar"]]
+    assert 0 < len(codes) <= 5
+    assert "CAS HI 221" not in codes and "CAS AA 221" not in codes
+    assert client.get("/api/courses/XXX%20YY%20999/similar").status_code == 404
+
+
+def catalog_file(tmp_path, monkeypatch):
+    monkeypatch.setattr(Config, "INDEX_CACHE_DIR", str(tmp_path / "index_cache"))
+    courses = [{"code": f"CAS {text.split()[0]} {100 + i}", "name": text.split(" ", 1)[1], "hub_areas": {}}
+               for i, text in enumerate(TEXTS)]
+    path = tmp_path / "courses.json"
+    path.write_text(json.dumps({"metadata": {}, "schools": {"CAS": {"courses": courses}}}))
+    return path
+
+
+def no_rebuild(monkeypatch):
+    def fail(*args, **kwargs):
+        raise AssertionError("tables should be mapped from the index cache")
+
+    monkeypatch.setattr(course_neighbors, "build_neighbor_tables", fail)
+    monkeypatch.setattr(NeighborGraph, "load", fail)
+
+
+def test_cached_tables_are_used_before_building(tmp_path, monkeypatch):
+    path = catalog_file(tmp_path, monkeypatch)
+    built = get_neighbor_graph(Catalog(path, path.read_bytes()))
+
+    no_rebuild(monkeypatch)
+    cached = get_neighbor_graph(Catalog(path, path.read_bytes()))
+    assert isinstance(cached.neighbors, np.memmap)
+    assert np.array_equal(cached.neighbors, built.neighbors)
+    assert np.array_equal(cached.scores, built.scores)
+
+
+def test_a_new_prebuilt_graph_replaces_cached_tables(tmp_path, monkeypatch):
+    path = catalog_file(tmp_path, monkeypatch)
+    catalog = Catalog(path, path.read_bytes())
+    assert get_neighbor_graph(catalog).k == course_neighbors.K_NEIGHBORS
+
+    NeighborGraph(*build_neighbor_tables(TEXTS, k=2)).save(graph_path(catalog), catalog.version)
+    assert get_neighbor_graph(Catalog(path, path.read_bytes())).k == 2
+
+    no_rebuild(monkeypatch)
+    assert get_neighbor_graph(Catalog(path, path.read_bytes())).k == 2
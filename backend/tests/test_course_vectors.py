@@ -0,0 +1,49 @@
+import json
+
+import numpy as np
+import pytest
+
+from app import course_vectors
+from app.catalog import Catalog
+from app.config import Config
+from app.course_vectors import LSA_PARAMS_HASH, get_lsa_index
+
+COURSES = [
+    {"code": f"CAS XX {100 + i}", "name": name, "hub_areas": {}}
+    for i, name in enumerate([
+        "Introduction to Machine Learning", "Deep Learning", "Organic Chemistry", "Physical Chemistry",
+        "Molecular Biology", "Cell Biology", "Microeconomics", "Macroeconomics", "Software Engineering",
+        "Data Structures and Algorithms", "Probability and Statistics", "Linear Algebra",
+    ])
+]
+
+
+@pytest.fixture
+def catalog_file(tmp_path, monkeypatch):
+    monkeypatch.setattr(Config, "INDEX_CACHE_DIR", str(tmp_path / "index_cache"))
+    path = tmp_path / "courses.json"
+    path.write_text(json.dumps({"metadata": {}, "schools": {"CAS": {"courses": COURSES}}}))
+    return path
+
+
+def test_second_catalog_loads_arrays_without_fitting(catalog_file, monkeypatch):
+    first = get_lsa_index(Catalog(catalog_file, catalog_file.read_bytes()))
+    cached = sorted(p.name.split("-")[0] for p in (catalog_file.parent / "index_cache").iterdir())
+    assert cached == [f"lsa_{name}_{LSA_PARAMS_HASH}" for name in ("idf", "projection", "terms", "vectors")]
+
+    def refit(texts):
+        raise AssertionError("cached arrays should be loaded, not refitted")
+
+    monkeypatch.setattr(course_vectors, "fit_lsa", refit)
+    second = get_lsa_index(Catalog(catalog_file, catalog_file.read_bytes()))
+    assert isinstance(second.vectors, np.memmap)
+    for query in ["machine learning", "chemistry", "unknown words"]:
+        assert np.allclose(first.embed(query), second.embed(query))
+    assert np.allclose(first.scores("biology"), second.scores("biology"))
+
+
+def test_scores_rank_matching_courses_first(catalog_file):
+    index = get_lsa_index(Catalog(catalog_file, catalog_file.read_bytes()))
+    best = np.argsort(-index.scores("chemistry"))[:2]
+    assert {COURSES[row]["name"] for row in best} == {"Organic Chemistry", "Physical Chemistry"}
+    assert not index.embed("zzzz").any()
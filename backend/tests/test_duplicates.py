@@ -0,0 +1,81 @@
+from fastapi.testclient import TestClient
+
+from app.duplicates import get_duplicate_index
+from app.main import app
+from processing_csv.process_courses import find_duplicate_groups
+
+
+def courses(*pairs):
+    return [{"code": code, "name": name} for code, name in pairs]
+
+
+def test_cross_listings_and_school_copies_are_grouped():
+    groups = find_duplicate_groups(courses(
+        ("CAS AA 221", "Catastrophe and Memory"),
+        ("CAS HI 221", "Catastrophe and Memory"),
+        ("CAS MA 113", "Elementary Statistics"),
+        ("MET MA 113", "Elementary Statistics"),
+        ("CAS CS 111", "Introduction to Computer Science 1"),
+    ))
+    assert groups == [0, 0, 1, 1, None]
+
+
+def test_sequences_and_level_variants_stay_apart():
+    groups = find_duplicate_groups(courses(
+        ("CAS CH 101", "General Chemistry 1"),
+        ("CAS CH 102", "General Chemistry 2"),
+        ("CAS EC 101", "Introductory Microeconomic Analysis"),
+        ("CAS EC 501", "Introductory Microeconomic Analysis"),
+        # A cross-listing of one must not pull the other into its group
+        ("CAS PO 101", "Introductory Microeconomic Analysis"),
+    ))
+    assert groups[:2] == [None, None]
+    assert groups[2] != groups[3]
+    assert groups[4] is not None and groups[4] in (groups[2], groups[3])
+
+
+def test_a_shared_title_alone_is_not_a_listing():
+    groups = find_duplicate_groups(courses(
+        ("CAS MA 242", "Linear Algebra"),
+        ("ENG BE 601", "Linear Algebra"),
+        # Undergraduate and graduate versions in one school
+        ("QST BA 223", "Business Modeling with Spreadsheets"),
+        ("QST IS 879", "Business Modeling with Spreadsheets"),
+        # Same school and level, another subject and number: a cross-listing
+        ("CAS HI 209", "The Reformation"),
+        ("CAS RN 310", "The Reformation"),
+    ))
+    assert groups == [None, None, None, None, 0, 0]
+
+
+def test_malformed_codes_are_never_grouped():
+    groups = find_duplicate_groups(courses(("0", "0"), ("0", "0"), ("0", "0"), ("CAS CS 111", "Introduction")))
+    assert groups == [None, None, None, None]
+
+
+def test_generic_titles_are_never_grouped():
+    groups = find_duplicate_groups(courses(
+        ("CAS CS 491", "Directed Study"),
+        ("CAS MA 491", "Directed Study"),
+        ("CAS BI 491", "Directed Study"),
+    ))
+    assert groups == [None, None, None]
+
+
+def test_duplicate_index_collapses_to_the_first_listing(catalog):
+    duplicates = get_duplicate_index(catalog)
+    aa, hi = 3, 4
+    assert duplicates.canonical[hi] == aa
+    assert duplicates.collapse([hi, 0, aa, 1]).tolist() == [hi, 0, 1]
+    assert duplicates.unique_count(range(len(catalog.courses))) == len(catalog.courses) - 1
+    assert duplicates.also_listed_as(hi) == ["CAS AA 221"]
+    assert duplicates.also_listed_as(0) == []
+
+
+def test_search_collapses_cross_listings():
+    client = TestClient(app)
+    collapsed = client.get("/api/courses/search/", params={"q": "catastrophe and memory"}).json()["courses"]
+    everything = client.get("/api/courses/search/", params={"q": "catastrophe and memory", "collapse": "false"}).json()["courses"]
+    assert len(collapsed) < len(everything)
+    first = collapsed[0]
+    assert sorted([first["code"]] + first["also_listed_as"]) == sorted(course["code"] for course in everything)
@@ -0,0 +1,43 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+
+
+@pytest.fixture(scope="module")
+def client():
+    return TestClient(app)
+
+
+def test_on_the_fly_gzip_gets_its_own_etag(client):
+    url = "/api/courses/search/?q=history"
+    gzipped = client.get(url, headers={"Accept-Encoding": "gzip"})
+    plain = client.get(url, headers={"Accept-Encoding": "identity"})
+
+    assert gzipped.headers["content-encoding"] == "gzip"
+    assert "content-encoding" not in plain.headers
+    assert gzipped.headers["etag"] == plain.headers["etag"][:-1] + '-gzip"'
+    assert "Accept-Encoding" in gzipped.headers["vary"]
+    assert "Accept-Encoding" in plain.headers["vary"]
+
+
+def test_gzip_etag_revalidates(client):
+    url = "/api/courses/search/?q=history"
+    etag = client.get(url, headers={"Accept-Encoding": "gzip"}).headers["etag"]
+    response = client.get(url, headers={"Accept-Encoding": "gzip", "If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.headers["etag"] == etag
+
+
+def test_precompressed_variant_keeps_a_single_suffix(client):
+    response = client.get("/api/courses/", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["etag"].endswith('-gzip"')
+    assert not response.headers["etag"].endswith('-gzip-gzip"')
+    assert response.headers["vary"].lower().count("accept-encoding") == 1
+
+
+def test_small_responses_still_vary(client):
+    response = client.get("/api/courses/search/?q=zzzz-no-match", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in response.headers
+    assert "Accept-Encoding" in response.headers["vary"]
@@ -0,0 +1,45 @@
+import numpy as np
+from fastapi.testclient import TestClient
+
+from app.main import app
+from processing_csv.process_courses import co_occurrence, double_counting_groups, hubs_per_course_distribution
+
+HUBS = ["A", "B", "C"]
+CODES = ["X 1", "X 2", "X 3", "X 4", "X 5"]
+MATRIX = np.array([
+    [1, 1, 0],
+    [1, 1, 0],
+    [0, 1, 1],
+    [1, 0, 0],
+    [0, 0, 0],
+])
+
+
+def test_co_occurrence_counts_pairs_with_areas_on_the_diagonal():
+    assert co_occurrence(MATRIX) == [[3, 2, 0], [2, 3, 1], [0, 1, 1]]
+
+
+def test_hubs_per_course_distribution():
+    assert hubs_per_course_distribution(MATRIX) == {0: 1, 1: 1, 2: 3}
+
+
+def test_double_counting_groups_largest_first():
+    assert double_counting_groups(MATRIX, HUBS, CODES) == [
+        {"hub_areas": ["A", "B"], "courses": ["X 1", "X 2"]},
+        {"hub_areas": ["B", "C"], "courses": ["X 3"]},
+    ]
+
+
+def test_analytics_endpoints_agree_with_the_catalog():
+    client = TestClient(app)
+    analytics = client.get("/api/hub-analytics/").json()
+    size = len(analytics["hub_areas"])
+    matrix = np.array(analytics["co_occurrence"])
+    assert matrix.shape == (size, size)
+    assert np.array_equal(matrix, matrix.T)
+    assert np.diag(matrix).tolist() == analytics["courses_per_area"]
+
+    school = client.get("/api/hub-analytics/cas").json()
+    assert school["school"] == "CAS"
+    assert np.diag(school["co_occurrence"]).tolist() == school["courses_per_area"]
+    assert client.get("/api/hub-analytics/nope").status_code == 404
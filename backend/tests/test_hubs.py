@@ -0,0 +1,122 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from app.hubs import get_hub_index, hub_progress, solve_hub_cover
+from app.main import app
+from tests.conftest import make_catalog
+
+AREAS = ["A1", "A2", "A3", "A4", "A5", "A6"]
+
+
+def hubs(*numbers):
+    return {f"A{n}": True for n in numbers}
+
+
+@pytest.fixture
+def cover_catalog():
+    # Greedy takes the widest course first and then needs two more;
+    # the optimum is the two three-area courses
+    return make_catalog({
+        "CAS": [
+            {"code": "CAS XX 101", "name": "Wide", "hub_areas": hubs(2, 3, 4, 5)},
+            {"code": "CAS XX 102", "name": "Left", "hub_areas": hubs(1, 2, 3)},
+            {"code": "CAS XX 103", "name": "Right", "hub_areas": hubs(4, 5, 6)},
+            {"code": "CAS XX 104", "name": "Left again", "hub_areas": hubs(1, 2, 3)},
+        ],
+        "ENG": [
+            {"code": "ENG XX 501", "name": "Graduate", "hub_areas": hubs(1, 2, 3, 4, 5, 6)},
+        ],
+    })
+
+
+def codes(result):
+    return sorted(course["code"] for course in result["courses"])
+
+
+def test_exact_cover_beats_greedy(cover_catalog):
+    greedy = solve_hub_cover(cover_catalog, AREAS, school_filters=["CAS"], mode="greedy")
+    exact = solve_hub_cover(cover_catalog, AREAS, school_filters=["CAS"], mode="exact")
+    assert greedy["mode"] == "greedy" and greedy["total_courses"] == 3
+    assert exact["mode"] == "exact"
+    assert codes(exact) == ["CAS XX 102", "CAS XX 103"]
+    assert exact["covered"] == AREAS
+    # Interchangeable courses are offered as alternatives
+    assert [c["alternatives"] for c in exact["courses"] if c["code"] == "CAS XX 102"] == [["CAS XX 104"]]
+
+
+def test_graduate_courses_cost_more(cover_catalog):
+    result = solve_hub_cover(cover_catalog, AREAS, mode="exact")
+    # The graduate course covering everything costs as much as two undergraduate courses
+    assert result["total_cost"] == 2.0
+
+
+def test_completed_courses_and_unknown_areas(cover_catalog):
+    result = solve_hub_cover(cover_catalog, ["a1", "A4", "Not A Hub"], school_filters=["CAS"],
+                             completed=["CAS XX 102"])
+    assert result["already_satisfied"] == ["A1"]
+    assert result["unknown_hub_areas"] == ["Not A Hub"]
+    assert result["covered"] == ["A4"]
+    assert "CAS XX 102" not in codes(result)
+
+
+def test_uncoverable_areas_are_reported():
+    catalog = make_catalog({"CAS": [{"code": "CAS XX 101", "name": "One", "hub_areas": hubs(1)},
+                                    {"code": "CAS XX 102", "name": "Two", "hub_areas": hubs(2)}]})
+    result = solve_hub_cover(catalog, ["A1", "A2"], school_filters=["ENG"])
+    assert result["courses"] == [] and result["uncoverable"] == ["A1", "A2"]
+
+
+def test_hub_index_masks(cover_catalog):
+    index = get_hub_index(cover_catalog)
+    assert index.hub_names == AREAS
+    assert index.names(index.masks[0]) == ["A2", "A3", "A4", "A5"]
+    assert index.costs[4] == 2.0
+
+
+@pytest.mark.parametrize("body", [
+    {"hub_areas": ["Critical Thinking", 3]},
+    {"hub_areas": "Critical Thinking"},
+    {"hub_areas": ["Critical Thinking"], "school_filters": "CAS"},
+    {"hub_areas": ["Critical Thinking"], "school_filters": [None]},
+    {"hub_areas": ["Critical Thinking"], "completed": [{"code": "CAS WR 120"}]},
+])
+def test_solve_rejects_malformed_bodies(body):
+    assert TestClient(app).post("/api/hub-coverage/solve", json=body).status_code == 400
+
+
+def test_solve_endpoint():
+    response = TestClient(app).post("/api/hub-coverage/solve", json={
+        "hub_areas": ["Critical Thinking", "Ethical Reasoning"], "school_filters": ["CAS"], "mode": "exact"})
+    assert response.status_code == 200
+    assert response.json()["covered"] == ["Critical Thinking", "Ethical Reasoning"]
+
+
+def test_progress_counts_each_plan(cover_catalog):
+    first, second = hub_progress(cover_catalog, [["CAS XX 102", "XX 103", "ZZ 999"], ["CAS XX 101", "CAS XX 101"]])
+    assert first["covered"] == AREAS and first["coverage_percentage"] == 100.0
+    assert first["unknown_courses"] == ["ZZ 999"]
+    assert second["courses_counted"] == 1
+    assert second["missing"] == ["A1", "A6"]
+    assert second["counts"]["A2"] == 1
+
+
+def test_progress_reports_unknown_hub_areas(cover_catalog):
+    result, = hub_progress(cover_catalog, [["CAS XX 102"]], ["a1", "A6", "Not A Hub"])
+    assert result["covered"] == ["A1"] and result["missing"] == ["A6"]
+    assert result["unknown_hub_areas"] == ["Not A Hub"]
+
+
+def test_progress_with_only_unknown_areas_is_not_complete(cover_catalog):
+    result, = hub_progress(cover_catalog, [["CAS XX 102"]], ["Not A Hub"])
+    assert result["coverage_percentage"] == 0.0
+    assert result["covered"] == [] and result["unknown_hub_areas"] == ["Not A Hub"]
+
+
+@pytest.mark.parametrize("url, body", [
+    ("/api/hub-progress", {"courses": ["CAS WR 120", 7]}),
+    ("/api/hub-progress", {"courses": ["CAS WR 120"], "hub_areas": "Critical Thinking"}),
+    ("/api/hub-progress/batch", {"plans": [{"id": 1, "courses": [None]}]}),
+    ("/api/hub-progress/batch", {"plans": [{"id": 1, "courses": []}], "hub_areas": [1]}),
+])
+def test_progress_rejects_malformed_bodies(url, body):
+    assert TestClient(app).post(url, json=body).status_code == 400
@@ -0,0 +1,93 @@
+import json
+
+import pytest
+
+from processing_csv import process_courses
+from processing_csv.process_courses import MANIFEST_FILENAME, MultiSchoolCourseProcessor
+
+HEADER = "code,name,Aesthetic Exploration,Scientific Inquiry I\n"
+SCHOOLS = {
+    "cas": ["CAS AH 111,Introduction to Art History,1,0", "CAS BI 108,Biology 2,0,1"],
+    "eng": ["ENG EK 125,Introduction to Programming for Engineers,0,1"],
+}
+
+
+@pytest.fixture
+def school_dir(tmp_path):
+    for prefix, rows in SCHOOLS.items():
+        (tmp_path / f"{prefix}_all_courses.csv").write_text(HEADER + "\n".join(rows) + "\n")
+    return tmp_path
+
+
+def build(directory, incremental=True):
+    """Run the pipeline; returns the school names it had to load from CSV"""
+    processor = MultiSchoolCourseProcessor(data_directory=str(directory), output_dir=str(directory / "output"))
+    loaded = []
+    load = processor.load_school_data
+
+    def spy(file_path):
+        school_name, df = load(file_path)
+        loaded.append(school_name)
+        return school_name, df
+
+    processor.load_school_data = spy
+    assert processor.run_full_processing(incremental=incremental)
+    return sorted(loaded)
+
+
+def schools(directory):
+    return json.loads((directory / "output" / "all_courses_data.json").read_text())["schools"]
+
+
+def test_unchanged_files_are_not_reprocessed_or_rewritten(school_dir):
+    assert build(school_dir) == ["CAS", "ENG"]
+    output = school_dir / "output" / "all_courses_data.json"
+    before = output.read_bytes()
+
+    assert build(school_dir) == []
+    assert output.read_bytes() == before
+
+
+def test_only_the_changed_school_is_reprocessed(school_dir):
+    build(school_dir)
+    with open(school_dir / "eng_all_courses.csv", "a") as f:
+        f.write("ENG EK 131,Introduction to Engineering,1,0\n")
+
+    assert build(school_dir) == ["ENG"]
+    incremental = schools(school_dir)
+    assert [c["code"] for c in incremental["ENG"]["courses"]] == ["ENG EK 125", "ENG EK 131"]
+
+    build(school_dir, incremental=False)
+    assert schools(school_dir) == incremental
+
+
+def test_removed_school_is_dropped(school_dir):
+    build(school_dir)
+    (school_dir / "eng_all_courses.csv").unlink()
+
+    assert build(school_dir) == []
+    assert list(schools(school_dir)) == ["CAS"]
+
+
+def test_stale_manifest_forces_a_full_rebuild(school_dir, monkeypatch):
+    build(school_dir)
+    monkeypatch.setattr(process_courses, "PROCESSOR_VERSION", process_courses.PROCESSOR_VERSION + 1)
+    assert build(school_dir) == ["CAS", "ENG"]
+
+    manifest = json.loads((school_dir / "output" / MANIFEST_FILENAME).read_text())
+    assert manifest["processor_version"] == process_courses.PROCESSOR_VERSION
+    assert build(school_dir) == []
+
+
+def test_edited_output_forces_a_full_rebuild(school_dir):
+    build(school_dir)
+    output = school_dir / "output" / "all_courses_data.json"
+    output.write_text(output.read_text().replace("Biology 2", "Biology II"))
+    assert build(school_dir) == ["CAS", "ENG"]
+
+
+def test_school_order_does_not_depend_on_glob_order(school_dir, monkeypatch):
+    listed = process_courses.glob
+    monkeypatch.setattr(process_courses, "glob", lambda pattern: sorted(listed(pattern), reverse=True))
+    build(school_dir)
+    assert list(schools(school_dir)) == ["CAS", "ENG"]
@@ -0,0 +1,86 @@
+from app.catalog import get_catalog
+from app.course_index import get_course_index
+from app.prerequisites import (PrerequisiteGraph, get_prerequisite_graph, load_supplementary_prerequisites,
+                               parse_prerequisites)
+from tests.conftest import make_catalog
+
+
+def test_parses_codes_in_catalog_prerequisite_text():
+    text = "Covers recursion. Prerequisites: CAS CS 111 and CAS MA 123; or consent of instructor. BU Hub: QR2"
+    assert parse_prerequisites(text) == {"required": ["CS 111", "MA 123"], "recommended": []}
+
+
+def test_recommended_and_lower_case_codes():
+    text = "Prerequisites: cs112; recommended: CAS MA 242."
+    assert parse_prerequisites(text) == {"required": ["CS 112"], "recommended": ["MA 242"]}
+
+
+def test_no_prerequisites():
+    assert parse_prerequisites("Prerequisites: None. BU Hub: Critical Thinking") == {"required": [], "recommended": []}
+    assert parse_prerequisites("Data structures and algorithms.") == {"required": [], "recommended": []}
+    assert parse_prerequisites("") == {"required": [], "recommended": []}
+
+
+def chain_catalog():
+    return make_catalog({"CAS": [
+        {"code": "CAS CS 111", "name": "Intro 1"},
+        {"code": "CAS CS 112", "name": "Intro 2", "description": "Prerequisites: CAS CS 111."},
+        {"code": "CAS CS 210", "name": "Systems", "prerequisites": {"required": ["CS 112"], "recommended": ["CS 999"]}},
+        {"code": "CAS XX 101", "name": "Loop A", "prerequisites": {"required": ["XX 102"]}},
+        {"code": "CAS XX 102", "name": "Loop B", "prerequisites": {"required": ["XX 101"]}},
+    ]})
+
+
+def test_graph_edges_ancestors_and_cycles():
+    graph = get_prerequisite_graph(chain_catalog())
+    assert graph.edge_sources == {"catalog": 3, "parsed": 1, "supplementary": 0}
+    assert graph.codes(graph.ancestor_rows(2)) == ["CAS CS 111", "CAS CS 112"]
+    assert graph.codes(graph.dependent_rows(0)) == ["CAS CS 112"]
+    assert graph.prerequisite_codes(2) == {"required": ["CAS CS 112"], "recommended": ["CS 999"]}
+    assert sorted(graph.cyclic) == [3, 4]
+    assert graph.cycles() == [["CAS XX 101", "CAS XX 102"]]
+
+
+def test_validate_plan_needs_prerequisites_in_earlier_semesters():
+    graph = get_prerequisite_graph(chain_catalog())
+    result = graph.validate_plan([
+        {"name": "Fall", "courses": ["CS 111", "CS 112"]},
+        {"name": "Spring", "courses": ["CS 112", "CS 210", "ZZ 999"]},
+    ])
+    assert not result["valid"]
+    assert [(i["code"], i["semester"], i["missing_prerequisites"]) for i in result["issues"]] == [
+        ("CAS CS 112", "Fall", ["CAS CS 111"]),
+    ]
+    assert result["duplicates"] == [{"code": "CAS CS 112", "semester": "Spring"}]
+    assert result["unknown_courses"] == [{"code": "ZZ 999", "semester": "Spring"}]
+
+
+def test_completed_courses_satisfy_prerequisites():
+    graph = get_prerequisite_graph(chain_catalog())
+    result = graph.validate_plan([{"courses": ["CS 210"]}], completed=["CS 111", "CS 112"])
+    assert result["valid"]
+    assert result["semesters"] == [{"name": "Semester 1", "course_count": 1, "issues": 0}]
+
+
+def test_real_catalog_prerequisites_all_resolve():
+    """Every prerequisite the shipped data lists becomes an edge of the shipped catalog's graph"""
+    catalog = get_catalog()
+    index = get_course_index(catalog)
+    graph = PrerequisiteGraph(catalog.courses, index, load_supplementary_prerequisites())
+
+    parsed = sum(len(set(p["required"])) + len(set(p["recommended"]))
+                 for p in (parse_prerequisites(c.get("description", "")) for c in catalog.courses
+                           if not c.get("prerequisites")))
+    listed = sum(len(p.get("required", [])) + len(p.get("recommended", []))
+                 for code, p in load_supplementary_prerequisites().items() if index.resolve(code) is not None)
+    assert graph.unresolved == {}
+    assert graph.edge_sources["parsed"] == parsed
+    assert graph.edge_sources["supplementary"] == listed > 0
+
+
+def test_unresolved_required_prerequisite_is_reported_unverified():
+    catalog = make_catalog({"CAS": [{"code": "CAS CS 330", "name": "Algorithms",
+                                     "prerequisites": {"required": ["CS 999"]}}]})
+    issues = get_prerequisite_graph(catalog).validate_plan([{"courses": ["CS 330"]}])["issues"]
+    assert issues == [{"code": "CAS CS 330", "semester": "Semester 1", "missing_prerequisites": [],
+                       "unverified_prerequisites": ["CS 999"]}]
@@ -0,0 +1,116 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from app.singleflight import AsyncSingleFlight, SingleFlight
+
+
+def test_threads_share_one_call():
+    flight = SingleFlight("test")
+    calls = []
+    release = threading.Event()
+
+    def work(x):
+        calls.append(x)
+        release.wait(5)
+        return x * 2
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(flight.do("k", work, 21))) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    while flight.in_flight() == 0:
+        time.sleep(0.001)
+    time.sleep(0.05)
+    release.set()
+    for thread in threads:
+        thread.join(5)
+    assert results == [42] * 5
+    assert len(calls) == 1
+    assert flight.in_flight() == 0
+
+
+def test_threads_share_the_error():
+    flight = SingleFlight("test")
+    with pytest.raises(ValueError):
+        flight.do("k", lambda: (_ for _ in ()).throw(ValueError("boom")))
+    assert flight.in_flight() == 0
+
+
+def test_async_callers_share_one_call():
+    async def main():
+        flight = AsyncSingleFlight("test")
+        calls = 0
+
+        async def work():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return {"answer": 42}
+
+        results = await asyncio.gather(*(flight.do("k", work) for _ in range(4)))
+        assert calls == 1
+        assert all(result is results[0] for result in results)
+        await asyncio.sleep(0)
+        assert flight.in_flight() == 0
+        # Nothing is cached once the call has finished
+        await flight.do("k", work)
+        assert calls == 2
+
+    asyncio.run(main())
+
+
+def test_cancelled_first_caller_does_not_cancel_the_others():
+    async def main():
+        flight = AsyncSingleFlight("test")
+        started = asyncio.Event()
+
+        async def work():
+            started.set()
+            await asyncio.sleep(0.05)
+            return "done"
+
+        first = asyncio.create_task(flight.do("k", work))
+        await started.wait()
+        second = asyncio.create_task(flight.do("k", work))
+        await asyncio.sleep(0)
+        first.cancel()
+        assert await second == "done"
+        with pytest.raises(asyncio.CancelledError):
+            await first
+
+    asyncio.run(main())
+
+
+def test_call_finishes_when_every_caller_is_cancelled():
+    async def main():
+        flight = AsyncSingleFlight("test")
+        finished = asyncio.Event()
+
+        async def work():
+            await asyncio.sleep(0.02)
+            finished.set()
+
+        caller = asyncio.create_task(flight.do("k", work))
+        await asyncio.sleep(0.005)
+        caller.cancel()
+        await asyncio.wait_for(finished.wait(), 1)
+
+    asyncio.run(main())
+
+
+def test_async_callers_share_the_error():
+    async def main():
+        flight = AsyncSingleFlight("test")
+
+        async def work():
+            await asyncio.sleep(0.01)
+            raise ValueError("boom")
+
+        results = await asyncio.gather(flight.do("k", work), flight.do("k", work), return_exceptions=True)
+        assert all(isinstance(result, ValueError) for result in results)
+        assert results[0] is results[1]
+
+    asyncio.run(main())
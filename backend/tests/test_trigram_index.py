@@ -0,0 +1,50 @@
+from app import smart_recommender
+from app.trigram_index import TrigramIndex, trigrams, words
+
+COURSES = [
+    {"code": "CAS PS 101", "name": "General Psychology"},
+    {"code": "CAS CS 542", "name": "Machine Learning"},
+    {"code": "CAS CS 111", "name": "Introduction to Computer Science"},
+    {"code": "CAS PS 371", "name": "Psychology of Learning"},
+]
+
+
+def test_words_and_trigrams():
+    assert words("Intro to the Machine-Learning") == ["intro", "machine", "learning"]
+    assert trigrams("cs") == ["$cs", "cs$"]
+
+
+def test_misspelled_word_still_matches():
+    scores = TrigramIndex(COURSES).scores(["pyschology"])
+    assert scores[0] > 0 and scores[3] > 0
+    assert scores[1] == 0 and scores[2] == 0
+
+
+def test_phrase_needs_every_word():
+    scores = TrigramIndex(COURSES).phrase_scores("machin learning")
+    assert scores[1] > 0.5
+    assert scores[3] == 0
+
+
+def test_each_phrase_counts_once():
+    index = TrigramIndex(COURSES)
+    assert index.scores(["Learning", "learning"])[1] == index.scores(["learning"])[1] == 1.0
+
+
+def test_intro_rows():
+    assert TrigramIndex(COURSES).intro_rows.tolist() == [0, 2]
+
+
+def test_fallback_scores_stay_on_the_ranked_scale():
+    recommendations = smart_recommender.recommend_courses_fallback("machin learning engineer", 9)
+    scores = [course["match_score"] for course in recommendations]
+    assert recommendations
+    assert all(0 < score <= 1 for score in scores)
+    assert scores == sorted(scores, reverse=True)
+    # Not flattened to one floor value
+    assert max(scores) > smart_recommender.MIN_MATCH_SCORE["lsa"]
+
+
+def test_fallback_without_matches_returns_intro_courses_at_zero():
+    recommendations = smart_recommender.recommend_courses_fallback("zzzqqq", 3)
+    assert [course["match_score"] for course in recommendations] == [0.0, 0.0, 0.0]
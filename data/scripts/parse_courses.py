@@ -1,38 +1,12 @@
 import json
 import re
-from typing import Dict, List
+import sys
+from pathlib import Path
+from typing import List
 
-def parse_prerequisites(text: str) -> Dict[str, List[str]]:
-    """Parse prerequisite text into structured format."""
-    if not text or 'prerequisite' not in text.lower():
-        return {"required": [], "recommended": []}
-    
-    # Extract prerequisite section
-    prereq_match = re.search(r'prerequisite[s]?:([^.]+)', text, re.IGNORECASE)
-    if not prereq_match:
-        return {"required": [], "recommended": []}
-    
-    prereq_text = prereq_match.group(1)
-    
-    # Find all course codes (CS 111, CS 112, MA 242, etc.)
-    pattern = r'(?:CAS\s*)?([A-Z]{2})\s*(\d{3})'
-    matches = re.findall(pattern, prereq_text, re.IGNORECASE)
-    
-    # Format courses
-    courses = [f"{dept} {num}" for dept, num in matches]
-    courses = list(dict.fromkeys(courses))  # Remove duplicates
-    
-    # Separate required vs recommended
-    required = []
-    recommended = []
-    
-    for course in courses:
-        if re.search(r'recommend.*?' + re.escape(course), text, re.IGNORECASE):
-            recommended.append(course)
-        else:
-            required.append(course)
-    
-    return {"required": required, "recommended": recommended}
+# One set of prerequisite text rules for this script and the API's prerequisite graph
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "backend"))
+from app.prerequisites import parse_prerequisites  # noqa: E402
 
 def parse_hub_requirements(text: str) -> List[str]:
     """Extract BU Hub requirements."""